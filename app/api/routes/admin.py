@@ -0,0 +1,34 @@
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from app.core.config import VideoSettings
+from app.schemas.webhook_schema import WebhookDeliveryResponse
+from app.services.webhook_service import WebhookService
+from app import ErrorResponse, SuccessResponse
+from typing import List, Optional, Union
+
+
+def require_admin_key(x_admin_key: Optional[str] = Header(default=None)):
+    # No key configured means the admin routes are off, not open
+    if not VideoSettings.ADMIN_API_KEY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, VideoSettings.ADMIN_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid admin key.")
+
+
+router = APIRouter(dependencies=[Depends(require_admin_key)])
+
+
+@router.get("/webhooks/dead-letters", response_model=List[WebhookDeliveryResponse])
+async def list_dead_webhooks():
+    dead_letters = await run_in_threadpool(WebhookService.list_dead_letters)
+    return JSONResponse(status_code=200, content=[delivery.model_dump(mode="json") for delivery in dead_letters])
+
+
+@router.post("/webhooks/{delivery_id}/retry", response_model=Union[SuccessResponse, ErrorResponse])
+async def retry_dead_webhook(delivery_id: str):
+    if not await run_in_threadpool(WebhookService.retry_dead_letter, delivery_id):
+        return JSONResponse(status_code=404, content=ErrorResponse(message="Dead-lettered webhook not found.").model_dump())
+    response = SuccessResponse(message="Webhook queued for delivery again.", data={"delivery_id": delivery_id})
+    return JSONResponse(status_code=200, content=response.model_dump())
@@ -1,6 +1,11 @@
-from fastapi import APIRouter, BackgroundTasks
-from app.schemas.video_schema import VideoEditRequest
-from app.services.video_service import VideoService
+import ffmpeg
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+from app.schemas.video_schema import VideoEditRequest, VideoUploadRequest
+from app.schemas.job_schema import JobStatusResponse
+from app.services.job_service import JobService
+from app.services.media_probe_service import MediaProbeService
+from app.services.upload_service import MultipartUpload, UploadService
 from app import ErrorResponse, SuccessResponse
 from fastapi.responses import JSONResponse
 from typing import Union
@@ -8,10 +13,56 @@ from typing import Union
 router = APIRouter()
 
 @router.post("/edit", response_model=Union[SuccessResponse, ErrorResponse])
-async def edit_video(request: VideoEditRequest, background_tasks: BackgroundTasks):
+async def edit_video(request: VideoEditRequest):
     try:
-        background_tasks.add_task(VideoService.handle_edit, request)
-        response = SuccessResponse(message="Video editing has started and will be processed in the background.")
+        job_id = await run_in_threadpool(JobService.enqueue, request)
+        response = SuccessResponse(message="Video editing has been queued and will be processed in the background.", data={"job_id": job_id})
         return JSONResponse(status_code=200, content=response.model_dump())
     except Exception:
-        return JSONResponse(status_code=400, content=ErrorResponse(message="Unable to procede the request.").model_dump())
\ No newline at end of file
+        return JSONResponse(status_code=400, content=ErrorResponse(message="Unable to procede the request.").model_dump())
+
+
+@router.post("/edit/upload", response_model=Union[SuccessResponse, ErrorResponse])
+async def edit_uploaded_video(request: Request):
+    """
+    multipart/form-data with a `file` part holding the video and a `request` part
+    holding the VideoEditRequest options as JSON (video_url not needed). The body
+    is streamed to disk as it arrives and checked before the job is queued.
+    """
+    upload_path = UploadService.new_upload_path()
+    try:
+        upload = MultipartUpload(request.headers.get("content-type", ""), upload_path)
+        try:
+            async for chunk in request.stream():
+                await run_in_threadpool(upload.write, chunk)
+            upload.finish()
+        finally:
+            upload.close()
+        UploadService.LOGGER.info(f"Received upload {upload.sha256} ({upload.file_size} bytes) at {upload_path}")
+
+        edit_request = VideoUploadRequest.model_validate_json(upload.fields.get("request", "{}"))
+        media_info = await run_in_threadpool(MediaProbeService.probe, upload_path, False)
+        MediaProbeService.check_limits(media_info)
+        job_id = await run_in_threadpool(JobService.enqueue, edit_request, upload_path)
+        response = SuccessResponse(
+            message="Video editing has been queued and will be processed in the background.",
+            data={"job_id": job_id, "sha256": upload.sha256, "size": upload.file_size}
+        )
+        return JSONResponse(status_code=200, content=response.model_dump())
+    except ffmpeg.Error:
+        UploadService.discard(upload_path)
+        return JSONResponse(status_code=400, content=ErrorResponse(message="Uploaded file is not a readable video.").model_dump())
+    except ValueError as e:
+        UploadService.discard(upload_path)
+        return JSONResponse(status_code=400, content=ErrorResponse(message=str(e)).model_dump())
+    except Exception:
+        UploadService.discard(upload_path)
+        return JSONResponse(status_code=400, content=ErrorResponse(message="Unable to procede the request.").model_dump())
+
+
+@router.get("/jobs/{job_id}", response_model=Union[JobStatusResponse, ErrorResponse])
+async def get_job_status(job_id: str):
+    job_status = await run_in_threadpool(JobService.get_status, job_id)
+    if job_status is None:
+        return JSONResponse(status_code=404, content=ErrorResponse(message="Job not found.").model_dump())
+    return JSONResponse(status_code=200, content=job_status.model_dump(mode="json"))
@@ -1,5 +1,10 @@
 import os
 from typing import List, Dict
+from dotenv import load_dotenv
+
+# Read here rather than in main.py: every process (API, job workers, the standalone
+# dispatcher) imports this module before anything reads the environment
+load_dotenv()
 
 class VideoSettings:
     BASE_URL = os.getenv("API_URL", "")
@@ -60,13 +65,119 @@ class VideoSettings:
     VIDEO_FILE = "video.mp4"
     TEMP_CLIPS_DIR = "temp/clips"
     OUTPUT_DIR = "output"
-    TEMP_AUDIO_FILE_PATH = "temp/audio.wav"
     TEMP_SRT_FILE_PATH = "temp/output.srt"
     TEMP_ASS_FILE_PATH = "temp/output.ass"
+    TEMP_SHARED_AUDIO_FILE_PATH = "temp/audio.m4a"
 
     MAX_WORDS_PER_SUBTITLE = 4 
 
+    # Accepted sources, checked against the remote header before downloading and again on the file
+    MIN_VIDEO_DURATION_SECONDS = 30
+    MAX_VIDEO_DURATION_SECONDS = 7 * 60
+    MAX_SOURCE_BYTES = int(os.getenv("MAX_SOURCE_BYTES", str(2 * 1024 ** 3)))
+    # Longest side, in pixels
+    MAX_SOURCE_DIMENSION = 4096
+    # Seconds ffprobe may wait on the remote server during pre-flight
+    PREFLIGHT_TIMEOUT = 15
+
+    # Ranged downloader: large sources are fetched as parallel byte ranges over a pooled session
+    DOWNLOAD_SEGMENTS = int(os.getenv("DOWNLOAD_SEGMENTS", "4"))
+    DOWNLOAD_MIN_SEGMENT_BYTES = 8 * 1024 ** 2
+    DOWNLOAD_CHUNK_BYTES = 1024 ** 2
+    DOWNLOAD_MAX_RETRIES = 3
+    DOWNLOAD_TIMEOUT = 15
+    DOWNLOAD_POOL_SIZE = 16
+
+    # "tracking" follows the subject over time, "static" keeps the window found on the first frame
+    CROP_MODE = os.getenv("CROP_MODE", "tracking")
+    # Faces are detected on frames downscaled to this width
+    DETECTION_WIDTH = 320
+    # Shared analysis pass: one low resolution, low frame rate grayscale decode per source
+    ANALYSIS_FPS = 2
+    ANALYSIS_WIDTH = 320
+    ANALYSIS_BATCH_SIZE = 32
+    # Mean absolute frame difference (0-255) above which a scene cut is reported
+    SCENE_CUT_THRESHOLD = 30
+    # Moving average length, in samples, applied to the subject path
+    TRACKING_SMOOTHING_WINDOW = 7
+    TRACKING_COMMAND_INTERVAL = 0.1
+
+    # "smart" re-encodes only the partial GOPs at the cut points, "keyframe" stream copies from the previous keyframe
+    TRIM_MODE = os.getenv("TRIM_MODE", "smart")
+    SMART_TRIM_PRESET = "veryfast"
+    SMART_TRIM_CRF = 18
+
+    # "multi_output" renders every ratio from one decode, "single_pass" fuses crop and
+    # subtitle burn into one encode per ratio, "two_pass" keeps the intermediate clip
+    RENDER_MODE = os.getenv("RENDER_MODE", "multi_output")
+    # single_pass mode: how many aspect ratios are encoded at the same time
+    RENDER_CONCURRENCY = int(os.getenv("RENDER_CONCURRENCY", "2"))
+
     WHISPER_MODEL = "base"
+    WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cpu")
+    WHISPER_SAMPLE_RATE = 16000
+    # Decode the audio from the bytes being downloaded instead of re-reading the file afterwards
+    STREAM_AUDIO_DURING_DOWNLOAD = os.getenv("STREAM_AUDIO_DURING_DOWNLOAD", "true").lower() == "true"
+    # Number of model instances kept per process, each concurrent transcription needs its own
+    WHISPER_POOL_SIZE = int(os.getenv("WHISPER_POOL_SIZE", "1"))
+    # Extra keyword arguments for whisper.transcribe, part of the transcript cache key
+    WHISPER_DECODE_OPTIONS: Dict = {}
+
+    # Kept out of media/, which is served publicly: jobs hold webhook URLs and customer metadata
+    DATABASE_URL = os.getenv("DATABASE_URL") or "sqlite:///data/clipcatch.db"
+
+    # Job queue: worker processes run the pipeline, the API only enqueues
+    JOB_WORKER_PROCESSES = int(os.getenv("JOB_WORKER_PROCESSES", "2"))
+    # Set to false when the workers run separately with `python -m app.workers.job_worker`
+    RUN_EMBEDDED_WORKERS = os.getenv("RUN_EMBEDDED_WORKERS", "true").lower() == "true"
+    JOB_POLL_INTERVAL = 1.0
+    JOB_HEARTBEAT_SECONDS = 15
+    JOB_STALE_AFTER_SECONDS = 120
+    JOB_MAX_ATTEMPTS = 2
+    JOB_SHUTDOWN_TIMEOUT = 30
+    # Minimum seconds between two progress writes for the same job
+    JOB_PROGRESS_INTERVAL = 1.0
+
+    # Webhook outbox: callbacks are stored and sent by the dispatcher, with retries and a dead-letter list
+    RUN_WEBHOOK_DISPATCHER = os.getenv("RUN_WEBHOOK_DISPATCHER", "true").lower() == "true"
+    WEBHOOK_TIMEOUT = 10
+    WEBHOOK_MAX_ATTEMPTS = 8
+    WEBHOOK_BACKOFF_BASE = 5
+    WEBHOOK_BACKOFF_MAX = 3600
+    WEBHOOK_POLL_INTERVAL = 1.0
+    WEBHOOK_CONCURRENCY = 8
+    # X-Admin-Key for the /api/admin routes (dead-letter list and retry), unset disables them
+    ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "")
+
+    # Downloaded sources, shared between jobs (kept outside the public media folder)
+    SOURCE_CACHE_DIR = os.getenv("SOURCE_CACHE_DIR", "cache/sources")
+    # Direct uploads wait here until a worker moves them into the job folder
+    UPLOAD_DIR = os.getenv("UPLOAD_DIR", "cache/uploads")
+    SOURCE_CACHE_MAX_BYTES = int(os.getenv("SOURCE_CACHE_MAX_BYTES", str(20 * 1024 ** 3)))
+    TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", "cache/transcripts")
+    TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(512 * 1024 ** 2)))
+    # "gemini" asks the LLM, "local" uses the in-process highlighter, "auto" asks Gemini
+    # and falls back to local when it hasn't answered within HIGHLIGHT_LATENCY_BUDGET seconds
+    HIGHLIGHT_ENGINES = ["local", "gemini", "auto"]
+    DEFAULT_HIGHLIGHT_ENGINE = os.getenv("DEFAULT_HIGHLIGHT_ENGINE", "gemini")
+    HIGHLIGHT_LATENCY_BUDGET = float(os.getenv("HIGHLIGHT_LATENCY_BUDGET", "8"))
+    # Compact transcripts longer than this are split into chunks analysed concurrently
+    GEMINI_CHUNK_CHARS = 6000
+    GEMINI_MAX_CONCURRENCY = 4
+    # A sentence sent to Gemini is cut after this many words so timestamps stay precise
+    GEMINI_MAX_SENTENCE_WORDS = 40
+    # Shared Gemini client: per attempt timeout, overall deadline, backoff and circuit breaker
+    GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "")
+    GEMINI_REQUEST_TIMEOUT = 20
+    GEMINI_DEADLINE = float(os.getenv("GEMINI_DEADLINE", "45"))
+    GEMINI_MAX_RETRIES = 3
+    GEMINI_BACKOFF_BASE = 0.5
+    GEMINI_BACKOFF_MAX = 8
+    GEMINI_BREAKER_THRESHOLD = 5
+    GEMINI_BREAKER_COOLDOWN = 60
+    GEMINI_CACHE_DIR = os.getenv("GEMINI_CACHE_DIR", "cache/gemini")
+    GEMINI_CACHE_MAX_BYTES = int(os.getenv("GEMINI_CACHE_MAX_BYTES", str(64 * 1024 ** 2)))
+    GEMINI_CACHE_TTL_SECONDS = int(os.getenv("GEMINI_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
 
     STATIC_DIR = os.path.abspath(
         os.path.join(os.path.dirname(__file__), "..", "..", "static")
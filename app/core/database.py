@@ -0,0 +1,30 @@
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.core.config import VideoSettings
+
+DATABASE_URL = VideoSettings.DATABASE_URL
+
+if DATABASE_URL.startswith("sqlite:///"):
+    os.makedirs(os.path.dirname(os.path.abspath(DATABASE_URL.removeprefix("sqlite:///"))), exist_ok=True)
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False, "timeout": 30})
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets the API process enqueue while worker processes hold read transactions
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+else:
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+Base = declarative_base()
+
+
+def init_db():
+    # Import the models so they are registered on Base before creating the tables
+    from app.models import video_models  # noqa: F401
+    Base.metadata.create_all(bind=engine)
@@ -3,4 +3,8 @@ class CustomError(Exception):
     def __init__(self, message: str, status_code: int = 400):
         self.message = message
         self.status_code = status_code
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+
+class VideoEditFailed(CustomError):
+    """Raised by VideoService.handle_edit after the failure webhook was queued, so the job is marked failed."""
@@ -1,20 +1,35 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import FileResponse
-from app.api.routes import video_edit
+from app.api.routes import admin, video_edit
 from fastapi.responses import JSONResponse
 from pathlib import Path
 from fastapi.staticfiles import StaticFiles
 from app.utils.file_opearations_utils import build_directory_tree
-from dotenv import load_dotenv
+from app.core.config import VideoSettings
+from app.core.database import init_db
+from app.workers.job_worker import JobWorkerPool
+from app.workers.webhook_dispatcher import WebhookDispatcher
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    if VideoSettings.RUN_EMBEDDED_WORKERS:
+        JobWorkerPool.start()
+    if VideoSettings.RUN_WEBHOOK_DISPATCHER:
+        WebhookDispatcher.start()
+    yield
+    await WebhookDispatcher.stop()
+    JobWorkerPool.stop()
+
 
 clipcatch_app = FastAPI(
     title="ClipCatch API",
-    version="2.0.3"
+    version="2.0.3",
+    lifespan=lifespan
 )
-load_dotenv()
 
 MEDIA_DIR = Path("media")
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -30,6 +45,7 @@ LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
 
 clipcatch_app.include_router(video_edit.router, prefix="/api/video", tags=["Video Editor"])
+clipcatch_app.include_router(admin.router, prefix="/api/admin", tags=["Admin"], include_in_schema=False)
 clipcatch_app.mount("/fonts", StaticFiles(directory="static/fonts"), name="fonts")
 clipcatch_app.mount("/media", StaticFiles(directory="media"), name="media")
 
@@ -0,0 +1,175 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# (start seconds, end seconds, text) of one subtitle line
+Cue = Tuple[float, float, str]
+# (text, start seconds, end seconds) of one word
+Word = Tuple[str, float, float]
+
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    """HH:MM:SS,mmm for SRT, HH:MM:SS.mmm for WebVTT."""
+    millis = max(int(round(seconds * 1000)), 0)
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02}:{minutes:02}:{secs:02}{separator}{millis:03}"
+
+
+class Transcript:
+    """
+    Whisper output held as flat columns instead of nested dicts.
+
+    Every word is stored once in `text`, separated by single spaces, and
+    located by its character offsets; word and segment timings live in
+    float arrays. Segment i owns the words segment_first_word[i] up to
+    segment_first_word[i + 1]. Stages pass this object around; SRT, WebVTT,
+    ASS and prompt text are only produced from it where they leave the pipeline.
+    """
+
+    __slots__ = (
+        "language", "text", "text_start", "text_end", "word_start", "word_end",
+        "segment_start", "segment_end", "segment_first_word",
+    )
+
+    def __init__(self, language: Optional[str] = None):
+        self.language = language
+        self.text = ""
+        self.text_start = array("I")
+        self.text_end = array("I")
+        self.word_start = array("d")
+        self.word_end = array("d")
+        self.segment_start = array("d")
+        self.segment_end = array("d")
+        self.segment_first_word = array("I", [0])
+
+    @classmethod
+    def build(cls, segments: Iterable[Tuple[float, float, Sequence[Word]]], language: Optional[str] = None) -> "Transcript":
+        transcript = cls(language)
+        parts: List[str] = []
+        position = 0
+        for segment_start, segment_end, words in segments:
+            words = [(text.strip(), start, end) for text, start, end in words if text.strip()]
+            if not words:
+                continue
+            for text, start, end in words:
+                if parts:
+                    parts.append(" ")
+                    position += 1
+                parts.append(text)
+                transcript.text_start.append(position)
+                position += len(text)
+                transcript.text_end.append(position)
+                transcript.word_start.append(start)
+                transcript.word_end.append(max(end, start))
+            transcript.segment_start.append(segment_start)
+            transcript.segment_end.append(segment_end)
+            transcript.segment_first_word.append(len(transcript.word_start))
+        transcript.text = "".join(parts)
+        return transcript
+
+    @staticmethod
+    def spread_words(start: float, end: float, text: str) -> List[Word]:
+        """Evenly timed words, only for segments that came without word timings."""
+        words = text.split()
+        if not words:
+            return []
+        step = (end - start) / len(words)
+        return [(word, start + i * step, start + (i + 1) * step) for i, word in enumerate(words)]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Transcript":
+        """From a whisper_timestamped result, or the to_dict() form kept in the transcript cache."""
+        return cls.build(
+            (
+                (
+                    segment["start"],
+                    segment["end"],
+                    [(word["text"], word["start"], word["end"]) for word in segment.get("words") or []]
+                    or cls.spread_words(segment["start"], segment["end"], segment.get("text", "")),
+                )
+                for segment in data.get("segments", [])
+            ),
+            language=data.get("language"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "language": self.language,
+            "segments": [
+                {
+                    "start": self.segment_start[i],
+                    "end": self.segment_end[i],
+                    "text": self.segment_text(i),
+                    "words": [
+                        {"text": self.word(w), "start": self.word_start[w], "end": self.word_end[w]}
+                        for w in self.segment_words(i)
+                    ],
+                }
+                for i in range(self.segment_count)
+            ],
+        }
+
+    def __len__(self) -> int:
+        return len(self.word_start)
+
+    @property
+    def segment_count(self) -> int:
+        return len(self.segment_start)
+
+    def word(self, index: int) -> str:
+        return self.text[self.text_start[index]:self.text_end[index]]
+
+    def segment_words(self, index: int) -> range:
+        return range(self.segment_first_word[index], self.segment_first_word[index + 1])
+
+    def segment_text(self, index: int) -> str:
+        words = self.segment_words(index)
+        return self.text[self.text_start[words.start]:self.text_end[words.stop - 1]]
+
+    def clip(self, start_time: float, end_time: Optional[float] = None) -> "Transcript":
+        """
+        Keeps what was said inside [start_time, end_time], shifted so start_time
+        becomes 0, matching a video that was trimmed to that window.
+        """
+        def clip_word(index: int) -> Optional[Word]:
+            start = max(self.word_start[index], start_time)
+            end = self.word_end[index] if end_time is None else min(self.word_end[index], end_time)
+            if end <= start:
+                return None
+            return self.word(index), start - start_time, end - start_time
+
+        segments = []
+        for i in range(self.segment_count):
+            words = [word for word in map(clip_word, self.segment_words(i)) if word is not None]
+            if words:
+                segments.append((words[0][1], words[-1][2], words))
+        return Transcript.build(segments, language=self.language)
+
+    def cues(self, max_words: int) -> Iterator[Cue]:
+        """
+        Subtitle lines of at most max_words words, never spanning two segments.
+        Each line starts when its first word is spoken and ends with its last one.
+        """
+        for i in range(self.segment_count):
+            words = self.segment_words(i)
+            for first in range(words.start, words.stop, max_words):
+                last = min(first + max_words, words.stop) - 1
+                yield (
+                    self.word_start[first],
+                    max(self.word_end[last], self.word_start[first]),
+                    self.text[self.text_start[first]:self.text_end[last]],
+                )
+
+    def to_srt(self, max_words: int) -> str:
+        return "".join(
+            f"{index}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{text}\n\n"
+            for index, (start, end, text) in enumerate(self.cues(max_words), start=1)
+        )
+
+    def to_vtt(self, max_words: int) -> str:
+        return "WEBVTT\n\n" + "".join(
+            f"{format_timestamp(start, '.')} --> {format_timestamp(end, '.')}\n{text}\n\n"
+            for start, end, text in self.cues(max_words)
+        )
@@ -0,0 +1,92 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Float, Integer, String, Text
+from app.core.database import Base
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobStage:
+    DOWNLOAD = "download"
+    SRT = "srt"
+    ANALYSIS = "analysis"
+    GEMINI = "gemini"
+    TRIM = "trim"
+    ASS = "ass"
+    CROP = "crop"
+    BURN = "burn"
+
+
+class WebhookStatus:
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    # Dead letters: gave up after WEBHOOK_MAX_ATTEMPTS or a non-retryable response
+    DEAD = "dead"
+
+
+class VideoJob(Base):
+    __tablename__ = "video_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    status = Column(String(16), nullable=False, default=JobStatus.QUEUED, index=True)
+    # Serialized VideoEditRequest, replayed by the worker that claims the job
+    payload = Column(Text, nullable=False)
+    # Direct uploads: path of the uploaded file, used instead of downloading video_url
+    source_path = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(64), nullable=True)
+    error = Column(Text, nullable=True)
+    stage = Column(String(16), nullable=True)
+    # JSON object of {stage: {"started_at": iso, "finished_at": iso}}
+    stages = Column(Text, nullable=False, default="{}")
+    progress = Column(Float, nullable=True)
+    eta_seconds = Column(Float, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class SourceCacheBlob(Base):
+    """A downloaded source stored once under its content hash."""
+    __tablename__ = "source_cache_blobs"
+
+    content_hash = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_accessed_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class SourceCacheAlias(Base):
+    """Maps a URL and its HTTP validators (ETag / Last-Modified) to a cached blob."""
+    __tablename__ = "source_cache_aliases"
+
+    url_key = Column(String(64), primary_key=True)
+    url = Column(Text, nullable=False)
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(64), nullable=True)
+    content_hash = Column(String(64), nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class WebhookDelivery(Base):
+    """Outbox row for one webhook callback, sent by the dispatcher independently of the job."""
+    __tablename__ = "webhook_deliveries"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_id = Column(String(36), nullable=True, index=True)
+    url = Column(Text, nullable=False)
+    # Serialized WebhookVideoResponse
+    payload = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default=WebhookStatus.PENDING, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    # Next send time; also the lease expiry while a dispatcher is sending it
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    delivered_at = Column(DateTime, nullable=True)
@@ -0,0 +1,24 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Dict, Optional
+
+
+class StageTiming(BaseModel):
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    stage: Optional[str] = None
+    # Progress of the current stage in percent, only reported by ffmpeg stages
+    progress: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    stages: Dict[str, StageTiming] = {}
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,43 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, Tuple
+
+
+class AudioLayout(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    codec: str
+    channels: int
+    channel_layout: Optional[str] = None
+    sample_rate: int
+
+
+class MediaInfo(BaseModel):
+    """Everything the pipeline needs to know about a source, read with a single ffprobe call."""
+    model_config = ConfigDict(frozen=True)
+
+    path: str
+    format_name: str
+    duration: float
+    size_bytes: Optional[int] = None
+    start_time: float = 0.0
+    # Coded frame size, before rotation is applied
+    width: int
+    height: int
+    rotation: int = 0
+    fps: float
+    video_codec: str
+    pix_fmt: Optional[str] = None
+    # Codec profile and level as ffprobe names them, e.g. "High" and 40 for H.264 level 4.0
+    profile: Optional[str] = None
+    level: Optional[int] = None
+    # Video keyframe times in seconds, relative to start_time; None when the probe skipped the index
+    keyframes: Optional[Tuple[float, ...]] = None
+    audio: Optional[AudioLayout] = None
+
+    @property
+    def display_width(self) -> int:
+        return self.height if self.rotation % 180 else self.width
+
+    @property
+    def display_height(self) -> int:
+        return self.width if self.rotation % 180 else self.height
@@ -17,6 +17,7 @@ class VideoEditRequest(BaseModel):
     # highlighted_words: Optional[Union[Dict[str, Optional[str]], List[str]]] = {}
     highlight_colors: Optional[List[str]] = []
     is_full_video_edit: Optional[bool] = True
+    highlight_engine: str = VideoSettings.DEFAULT_HIGHLIGHT_ENGINE
     
     # It will be sent as it is in the webhook the goal is to identify the reuqest
     metadata: Optional[Dict[str, Any]] = {}
@@ -98,6 +99,12 @@ class VideoEditRequest(BaseModel):
                     raise ValueError(f"Invalid color format: {color}. It must be in the format &HXXXXXX&")
         return v
 
+    @field_validator('highlight_engine')
+    def validate_highlight_engine(cls, v):
+        if v not in VideoSettings.HIGHLIGHT_ENGINES:
+            raise ValueError(f"Unsupported highlight engine '{v}'. Supported engines: {VideoSettings.HIGHLIGHT_ENGINES}")
+        return v
+
     @field_validator('is_full_video_edit')
     def validate_is_full_video_edit(cls, v):
         if not isinstance(v, bool):
@@ -122,11 +129,17 @@ class VideoEditRequest(BaseModel):
                     "&H00FF00&",
                     "&H0000FF&"
                 ],
-                "is_full_video_edit": True
+                "is_full_video_edit": True,
+                "highlight_engine": "auto"
             }
         }
 
 
+class VideoUploadRequest(VideoEditRequest):
+    """Options sent as the `request` form field of a direct upload, the video itself is the `file` part."""
+    video_url: Optional[str] = None
+
+
 class WebhookVideo(BaseModel):
     video_url: str
     aspect_ratio: str
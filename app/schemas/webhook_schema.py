@@ -0,0 +1,15 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+
+class WebhookDeliveryResponse(BaseModel):
+    id: str
+    job_id: Optional[str] = None
+    url: str
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    next_attempt_at: datetime
+    delivered_at: Optional[datetime] = None
@@ -0,0 +1,82 @@
+import os, uuid, unicodedata
+from typing import Dict, Iterable
+
+from app.core.config import VideoSettings
+from app.models.transcript import Cue, Transcript
+
+
+class AssRenderer:
+    """
+    Renders the ASS subtitles of one job for every aspect ratio.
+
+    The dialogue lines and their highlight tags are built once from the cues;
+    only the style header (font and size) differs between ratios, so each
+    variant is the header plus the shared events. Files are written to a temp
+    name and renamed into place, so a render never reads a half-written file.
+    """
+
+    DIALOGUE_TEMPLATE = "Dialogue: 0,{start},{end},Default,,0,0,0,,{text}\n"
+
+    def __init__(self, cues: Iterable[Cue], highlighted_words: Dict[str, str]):
+        # One color override tag per highlighted word instead of one per occurrence, keyed
+        # like the subtitle words so Gemini's spelling and punctuation don't matter
+        self.highlight_tags = {
+            self.clean_word(word): f"{{\\1c&H{self.rgb_to_ass_bgr(color)}&}}" for word, color in highlighted_words.items()
+        }
+        self.events = "".join(
+            self.DIALOGUE_TEMPLATE.format(
+                start=self.format_timestamp(start),
+                end=self.format_timestamp(end),
+                text=self.highlight(text),
+            )
+            for start, end, text in cues
+        )
+
+    @classmethod
+    def from_transcript(cls, transcript: Transcript, max_words: int, highlighted_words: Dict[str, str]) -> "AssRenderer":
+        return cls(transcript.cues(max_words), highlighted_words)
+
+    @staticmethod
+    def format_timestamp(seconds: float) -> str:
+        """H:MM:SS.cc, ASS times are in centiseconds."""
+        centiseconds = max(int(round(seconds * 100)), 0)
+        h, centiseconds = divmod(centiseconds, 360_000)
+        m, centiseconds = divmod(centiseconds, 6000)
+        s, cs = divmod(centiseconds, 100)
+        return f"{h:01}:{m:02}:{s:02}.{cs:02}"
+
+    @staticmethod
+    def rgb_to_ass_bgr(color: str) -> str:
+        """Convert #RRGGBB or &HRRGGBB& (the request's color format, RGB order) to BGR hex for ASS color format"""
+        color = color.strip().upper()
+        color = (color[2:] if color.startswith("&H") else color).strip("#&")
+        r, g, b = color[0:2], color[2:4], color[4:6]
+        return f"{b}{g}{r}"
+
+    @staticmethod
+    def clean_word(word: str) -> str:
+        """Lowercase letters, combining marks and digits of a word, dropping punctuation."""
+        # Not \W: it would also strip the vowel signs of Devanagari and similar scripts
+        return "".join(ch for ch in word if unicodedata.category(ch)[0] in "LMN").lower()
+
+    def highlight(self, text: str) -> str:
+        words = []
+        for word in text.split():
+            tag = self.highlight_tags.get(self.clean_word(word))
+            words.append(f"{tag}{word}{{\\r}}" if tag else word)
+        return " ".join(words)
+
+    def render(self, selected_font: str, font_size: int) -> str:
+        return VideoSettings.generate_ass_header(selected_font, font_size) + self.events
+
+    def write(self, ass_file_path: str, selected_font: str, font_size: int) -> str:
+        os.makedirs(os.path.dirname(ass_file_path) or ".", exist_ok=True)
+        temp_path = f"{ass_file_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(self.render(selected_font, font_size))
+            os.replace(temp_path, ass_file_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return ass_file_path
@@ -0,0 +1,97 @@
+import threading
+import ffmpeg
+import numpy as np
+from typing import Optional
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+
+
+def pcm_to_float32(pcm: bytes) -> np.ndarray:
+    # Same scaling as whisper.load_audio, so transcript cache keys stay stable
+    return np.frombuffer(pcm, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+class AudioService:
+    LOGGER = LogManager.get_logger("audio_service")
+
+    @classmethod
+    def pcm_output_kwargs(cls):
+        return dict(format='s16le', acodec='pcm_s16le', ac=1, ar=VideoSettings.WHISPER_SAMPLE_RATE)
+
+    @classmethod
+    def extract_audio(cls, video_path: str) -> np.ndarray:
+        """Decodes the audio track straight into a mono float32 buffer for Whisper, without a temp file."""
+        out, _ = (
+            ffmpeg
+            .input(video_path)
+            .output('pipe:', **cls.pcm_output_kwargs())
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+        return pcm_to_float32(out)
+
+
+class StreamingAudioExtractor:
+    """
+    Decodes audio from the source bytes while they are still being downloaded.
+
+    The downloader feeds every chunk to ffmpeg's stdin and the PCM output is
+    collected on a reader thread. Containers that can't be decoded from a
+    non-seekable stream (MP4 with the moov atom at the end) make ffmpeg exit
+    early; finish() then returns None and the caller falls back to
+    AudioService.extract_audio on the downloaded file.
+    """
+    LOGGER = LogManager.get_logger("audio_service")
+
+    def __init__(self):
+        self._pcm = bytearray()
+        self._stderr = b""
+        self._failed = False
+        self._process = (
+            ffmpeg
+            .input('pipe:0')
+            .output('pipe:1', **AudioService.pcm_output_kwargs())
+            .global_args('-loglevel', 'error')
+            .run_async(pipe_stdin=True, pipe_stdout=True, pipe_stderr=True)
+        )
+        self._stdout_thread = threading.Thread(target=self._read_stdout, daemon=True)
+        self._stderr_thread = threading.Thread(target=self._read_stderr, daemon=True)
+        self._stdout_thread.start()
+        self._stderr_thread.start()
+
+    def _read_stdout(self):
+        for chunk in iter(lambda: self._process.stdout.read(65536), b""):
+            self._pcm.extend(chunk)
+
+    def _read_stderr(self):
+        self._stderr = self._process.stderr.read()
+
+    def feed(self, chunk: bytes):
+        if self._failed:
+            return
+        try:
+            self._process.stdin.write(chunk)
+        except (BrokenPipeError, OSError):
+            # ffmpeg gave up on this container, stop feeding and let the caller fall back
+            self._failed = True
+
+    def abort(self):
+        self._failed = True
+        self._process.kill()
+        self._close()
+
+    def _close(self):
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.wait()
+        self._stdout_thread.join()
+        self._stderr_thread.join()
+
+    def finish(self) -> Optional[np.ndarray]:
+        self._close()
+        if self._failed or self._process.returncode != 0 or not self._pcm:
+            self.LOGGER.info(f"Streaming audio extraction unavailable, falling back to the file: {self._stderr.decode(errors='ignore')[:300]}")
+            return None
+        return pcm_to_float32(bytes(self._pcm))
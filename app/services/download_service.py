@@ -0,0 +1,219 @@
+import os, time, hashlib, threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Callable, List, NamedTuple, Optional
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+
+
+class RemoteSource(NamedTuple):
+    """What a HEAD request tells about the source, shared by the source cache and the downloader."""
+    size: Optional[int]
+    accepts_ranges: bool
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class _RangeIgnored(Exception):
+    """A ranged request got a full 200 response, the server doesn't honour Range after all."""
+
+
+class _Segment:
+    """Byte range [start, end] of the source; end is None when the size is unknown."""
+    __slots__ = ("start", "end", "written")
+
+    def __init__(self, start: int, end: Optional[int]):
+        self.start = start
+        self.end = end
+        self.written = 0
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None and self.start + self.written > self.end
+
+
+class DownloadService:
+    """
+    Downloads sources over a pooled HTTP session, shared by every job of the process.
+
+    Large sources served with Accept-Ranges are split into DOWNLOAD_SEGMENTS byte
+    ranges fetched in parallel straight into their offset of the destination file.
+    A segment that fails is retried from the last byte it wrote. The file is
+    hashed, and handed to on_chunk, strictly in order as soon as a contiguous
+    prefix is available, so streaming consumers see the same bytes as a
+    sequential download.
+    """
+    LOGGER = LogManager.get_logger("download_service")
+
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+
+    @classmethod
+    def session(cls) -> requests.Session:
+        # Created lazily, worker processes are spawned and must build their own
+        with cls._session_lock:
+            if cls._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=VideoSettings.DOWNLOAD_POOL_SIZE, pool_maxsize=VideoSettings.DOWNLOAD_POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                cls._session = session
+            return cls._session
+
+    @classmethod
+    def head(cls, video_url: str) -> RemoteSource:
+        """
+        Size, range support and validators of video_url. Origins that reject HEAD (presigned
+        S3 URLs answer 403, others 405) get an unknown source, downloaded with one plain GET.
+        """
+        try:
+            with cls.session().head(video_url, allow_redirects=True, timeout=VideoSettings.DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                headers = response.headers
+        except requests.RequestException as e:
+            cls.LOGGER.info(f"HEAD request failed for {video_url} ({e}), size and range support unknown.")
+            return RemoteSource(size=None, accepts_ranges=False, etag=None, last_modified=None)
+        return RemoteSource(
+            size=int(headers["Content-Length"]) if headers.get("Content-Length", "").isdigit() else None,
+            accepts_ranges=headers.get("Accept-Ranges", "").lower() == "bytes",
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+
+    @classmethod
+    def plan_segments(cls, size: Optional[int], accepts_ranges: bool) -> List[_Segment]:
+        if not size or not accepts_ranges:
+            return [_Segment(0, size - 1 if size else None)]
+        count = max(1, min(VideoSettings.DOWNLOAD_SEGMENTS, size // VideoSettings.DOWNLOAD_MIN_SEGMENT_BYTES))
+        step = -(-size // count)
+        return [_Segment(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+    @classmethod
+    def _fetch_segment(cls, url: str, fd: int, segment: _Segment, accepts_ranges: bool, condition: threading.Condition, cancelled: threading.Event):
+        attempt = 0
+        while True:
+            headers = {}
+            if accepts_ranges:
+                end = "" if segment.end is None else segment.end
+                headers["Range"] = f"bytes={segment.start + segment.written}-{end}"
+            try:
+                with cls.session().get(url, headers=headers, stream=True, timeout=VideoSettings.DOWNLOAD_TIMEOUT) as response:
+                    response.raise_for_status()
+                    if accepts_ranges and response.status_code != 206:
+                        raise _RangeIgnored()
+                    for chunk in response.iter_content(chunk_size=VideoSettings.DOWNLOAD_CHUNK_BYTES):
+                        if cancelled.is_set():
+                            return
+                        if segment.end is not None:
+                            chunk = chunk[:segment.end + 1 - segment.start - segment.written]
+                        offset = segment.start + segment.written
+                        if offset + len(chunk) > VideoSettings.MAX_SOURCE_BYTES:
+                            raise ValueError(f"Video is larger than {VideoSettings.MAX_SOURCE_BYTES} bytes.")
+                        os.pwrite(fd, chunk, offset)
+                        with condition:
+                            segment.written += len(chunk)
+                            condition.notify_all()
+                        if segment.complete:
+                            break
+                if segment.end is not None and not segment.complete:
+                    raise requests.ConnectionError("Connection closed before the segment was complete.")
+                # Unknown size: the body ended, mark the segment as finished
+                with condition:
+                    segment.end = segment.start + segment.written - 1
+                    condition.notify_all()
+                return
+            except (requests.RequestException, OSError) as e:
+                attempt += 1
+                # Without range support the bytes already written can't be resumed
+                if attempt > VideoSettings.DOWNLOAD_MAX_RETRIES or (not accepts_ranges and segment.written):
+                    raise
+                cls.LOGGER.info(f"Segment {segment.start}-{segment.end} failed at +{segment.written} bytes ({e}), retry {attempt}")
+                time.sleep(min(2 ** attempt, 10))
+
+    @classmethod
+    def _run_segments(
+        cls,
+        video_url: str,
+        fd: int,
+        segments: List[_Segment],
+        accepts_ranges: bool,
+        size: Optional[int],
+        sha256,
+        fed: int,
+        on_chunk: Optional[Callable[[bytes], None]],
+        on_progress: Optional[Callable[[float], None]],
+    ) -> int:
+        """Fetches the segments in parallel, hashing and feeding the contiguous prefix past fed. Returns the new fed."""
+        condition = threading.Condition()
+        cancelled = threading.Event()
+        with ThreadPoolExecutor(max_workers=len(segments), thread_name_prefix="download") as executor:
+            futures = [
+                executor.submit(cls._fetch_segment, video_url, fd, segment, accepts_ranges, condition, cancelled)
+                for segment in segments
+            ]
+            try:
+                while True:
+                    with condition:
+                        condition.wait(timeout=0.5)
+                        # Length of the prefix written without gaps
+                        contiguous = 0
+                        for segment in segments:
+                            contiguous = segment.start + segment.written
+                            if not segment.complete:
+                                break
+
+                    while fed < contiguous:
+                        chunk = os.pread(fd, min(contiguous - fed, VideoSettings.DOWNLOAD_CHUNK_BYTES), fed)
+                        sha256.update(chunk)
+                        if on_chunk:
+                            on_chunk(chunk)
+                        fed += len(chunk)
+                    if on_progress and size:
+                        on_progress(fed / size * 100)
+
+                    failed = next((f for f in futures if f.done() and f.exception()), None)
+                    if failed:
+                        raise failed.exception()
+                    if all(s.complete for s in segments) and fed > segments[-1].end:
+                        return fed
+            except BaseException:
+                cancelled.set()
+                raise
+
+    @classmethod
+    def download(
+        cls,
+        video_url: str,
+        path: str,
+        on_chunk: Optional[Callable[[bytes], None]] = None,
+        on_progress: Optional[Callable[[float], None]] = None,
+        remote: Optional[RemoteSource] = None,
+    ) -> str:
+        """Downloads video_url into path and returns the SHA-256 of its bytes. remote skips the HEAD request."""
+        started = time.monotonic()
+        size, accepts_ranges, _, _ = remote or cls.head(video_url)
+        if size and size > VideoSettings.MAX_SOURCE_BYTES:
+            raise ValueError(f"Video is larger than {VideoSettings.MAX_SOURCE_BYTES} bytes.")
+
+        segments = cls.plan_segments(size, accepts_ranges)
+        sha256 = hashlib.sha256()
+        fed = 0
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            try:
+                fed = cls._run_segments(video_url, fd, segments, accepts_ranges, size, sha256, fed, on_chunk, on_progress)
+            except _RangeIgnored:
+                # Advertised Accept-Ranges but answered 200: restart as one sequential stream. The
+                # prefix already hashed is the same bytes again, so feeding resumes after it.
+                cls.LOGGER.info(f"{video_url} ignored the Range header, downloading it as a single stream.")
+                segments = cls.plan_segments(size, accepts_ranges=False)
+                fed = cls._run_segments(video_url, fd, segments, False, size, sha256, fed, on_chunk, on_progress)
+        finally:
+            os.close(fd)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        cls.LOGGER.info(f"Downloaded {fed} bytes in {elapsed:.1f}s ({fed / elapsed / 1024 ** 2:.1f} MiB/s, {len(segments)} segments)")
+        return sha256.hexdigest()
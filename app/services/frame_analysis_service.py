@@ -0,0 +1,229 @@
+import os, threading
+import ffmpeg
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+from app.schemas.media_schema import MediaInfo
+from .media_probe_service import MediaProbeService
+
+
+class AnalysisContext:
+    """Geometry of the analysis pass, shared with every analyzer."""
+    __slots__ = ("source_width", "source_height", "frame_width", "frame_height", "fps")
+
+    def __init__(self, source_width: int, source_height: int, frame_width: int, frame_height: int, fps: float):
+        self.source_width = source_width
+        self.source_height = source_height
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.fps = fps
+
+
+class FrameAnalyzer:
+    """
+    Base class for analyzers fed by the shared analysis pass.
+
+    process() receives batches of grayscale frames as a (N, H, W) uint8 array with
+    their timestamps in seconds; result() returns the JSON-friendly summary once
+    the whole source has been read.
+    """
+    name: str = ""
+
+    def __init__(self, context: AnalysisContext):
+        self.context = context
+
+    def process(self, frames: np.ndarray, times: np.ndarray):
+        raise NotImplementedError
+
+    def result(self) -> Any:
+        raise NotImplementedError
+
+
+class FrameAnalysisService:
+    LOGGER = LogManager.get_logger("frame_analysis_service")
+
+    _analyzers: Dict[str, Type[FrameAnalyzer]] = {}
+    _cache: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def register(cls, analyzer_cls: Type[FrameAnalyzer]) -> Type[FrameAnalyzer]:
+        """Class decorator adding an analyzer to every analysis pass."""
+        cls._analyzers[analyzer_cls.name] = analyzer_cls
+        return analyzer_cls
+
+    @classmethod
+    def analyze(cls, video_path: str, media_info: Optional[MediaInfo] = None) -> Dict[str, Any]:
+        """
+        Decodes the source once at ANALYSIS_FPS and ANALYSIS_WIDTH, feeds the frames
+        to every registered analyzer and returns their results keyed by name.
+        Results are cached per source file, so all renders of a job share one pass.
+        """
+        stat = os.stat(video_path)
+        key = (os.path.abspath(video_path), stat.st_mtime_ns, stat.st_size)
+        with cls._lock:
+            if key in cls._cache:
+                return cls._cache[key]
+
+        results = cls._run(video_path, media_info or MediaProbeService.probe(video_path))
+        with cls._lock:
+            if len(cls._cache) >= 8:
+                cls._cache.pop(next(iter(cls._cache)))
+            cls._cache[key] = results
+        return results
+
+    @classmethod
+    def _run(cls, video_path: str, media_info: MediaInfo) -> Dict[str, Any]:
+        # ffmpeg applies the rotation while decoding, so frames come out in display orientation
+        width, height = media_info.display_width, media_info.display_height
+
+        frame_width = min(VideoSettings.ANALYSIS_WIDTH, width)
+        frame_height = max(int(round(height * frame_width / width / 2)) * 2, 2)
+        fps = VideoSettings.ANALYSIS_FPS
+        context = AnalysisContext(width, height, frame_width, frame_height, fps)
+        analyzers = [analyzer_cls(context) for analyzer_cls in cls._analyzers.values()]
+
+        process = (
+            ffmpeg
+            .input(video_path)
+            .filter('fps', fps=fps)
+            .filter('scale', frame_width, frame_height)
+            .output('pipe:', format='rawvideo', pix_fmt='gray')
+            .global_args('-loglevel', 'error')
+            .run_async(pipe_stdout=True)
+        )
+
+        frame_size = frame_width * frame_height
+        batch_bytes = frame_size * VideoSettings.ANALYSIS_BATCH_SIZE
+        frame_index = 0
+        while True:
+            buffer = process.stdout.read(batch_bytes)
+            count = len(buffer) // frame_size
+            if count == 0:
+                break
+            frames = np.frombuffer(buffer[:count * frame_size], np.uint8).reshape(count, frame_height, frame_width)
+            times = (np.arange(count) + frame_index) / fps
+            for analyzer in analyzers:
+                analyzer.process(frames, times)
+            frame_index += count
+            if len(buffer) < batch_bytes:
+                break
+        process.wait()
+
+        cls.LOGGER.info(f"Analysed {frame_index} frames of {video_path} with {[a.name for a in analyzers]}")
+        results: Dict[str, Any] = {
+            "source": {"width": width, "height": height, "fps": fps, "frames": frame_index},
+        }
+        for analyzer in analyzers:
+            results[analyzer.name] = analyzer.result()
+        return results
+
+
+@FrameAnalysisService.register
+class FaceCenterAnalyzer(FrameAnalyzer):
+    """Centre of the largest face per frame, in source pixels (None when no face)."""
+    name = "face_centers"
+
+    def __init__(self, context: AnalysisContext):
+        super().__init__(context)
+        self.times: List[float] = []
+        self.centers_x: List[Optional[float]] = []
+        self.centers_y: List[Optional[float]] = []
+
+    def process(self, frames: np.ndarray, times: np.ndarray):
+        # Imported lazily to avoid a cycle, the tracking service reads these results
+        from .subject_tracking_service import SubjectTrackingService
+
+        scale_x = self.context.source_width / self.context.frame_width
+        scale_y = self.context.source_height / self.context.frame_height
+        for frame, t in zip(frames, times):
+            center = SubjectTrackingService.detect_face_center(frame)
+            self.times.append(float(t))
+            self.centers_x.append(center[0] * scale_x if center else None)
+            self.centers_y.append(center[1] * scale_y if center else None)
+
+    def result(self):
+        return {"times": self.times, "x": self.centers_x, "y": self.centers_y}
+
+
+class _FrameDifferenceAnalyzer(FrameAnalyzer):
+    """Mean absolute difference between consecutive frames, carried across batches."""
+
+    def __init__(self, context: AnalysisContext):
+        super().__init__(context)
+        self._previous: Optional[np.ndarray] = None
+
+    def frame_differences(self, frames: np.ndarray) -> np.ndarray:
+        current = frames.astype(np.int16)
+        if self._previous is None:
+            previous = np.concatenate([current[:1], current[:-1]])
+        else:
+            previous = np.concatenate([self._previous[None], current[:-1]])
+        self._previous = current[-1]
+        return np.abs(current - previous).mean(axis=(1, 2))
+
+
+@FrameAnalysisService.register
+class SceneCutAnalyzer(_FrameDifferenceAnalyzer):
+    """Timestamps where consecutive frames differ by more than SCENE_CUT_THRESHOLD."""
+    name = "scene_cuts"
+
+    def __init__(self, context: AnalysisContext):
+        super().__init__(context)
+        self.cuts: List[float] = []
+
+    def process(self, frames: np.ndarray, times: np.ndarray):
+        differences = self.frame_differences(frames)
+        self.cuts.extend(float(t) for t in times[differences > VideoSettings.SCENE_CUT_THRESHOLD])
+
+    def result(self):
+        return self.cuts
+
+
+@FrameAnalysisService.register
+class MotionEnergyAnalyzer(_FrameDifferenceAnalyzer):
+    """Per-frame motion energy (mean absolute pixel change) and its average."""
+    name = "motion_energy"
+
+    def __init__(self, context: AnalysisContext):
+        super().__init__(context)
+        self.energy: List[float] = []
+
+    def process(self, frames: np.ndarray, times: np.ndarray):
+        self.energy.extend(self.frame_differences(frames).round(3).tolist())
+
+    def result(self):
+        return {"values": self.energy, "mean": float(np.mean(self.energy)) if self.energy else 0.0}
+
+
+@FrameAnalysisService.register
+class ThumbnailAnalyzer(FrameAnalyzer):
+    """Picks the sharpest, well exposed frame as the thumbnail timestamp."""
+    name = "thumbnail"
+
+    def __init__(self, context: AnalysisContext):
+        super().__init__(context)
+        self.best_time: Optional[float] = None
+        self.best_score = -1.0
+
+    def process(self, frames: np.ndarray, times: np.ndarray):
+        f = frames.astype(np.float32)
+        # Laplacian variance over the whole batch at once as the sharpness measure
+        laplacian = (
+            4 * f[:, 1:-1, 1:-1]
+            - f[:, :-2, 1:-1] - f[:, 2:, 1:-1]
+            - f[:, 1:-1, :-2] - f[:, 1:-1, 2:]
+        )
+        sharpness = laplacian.var(axis=(1, 2))
+        exposure = 1 - np.abs(f.mean(axis=(1, 2)) - 128) / 128
+        scores = sharpness * exposure
+
+        best = int(np.argmax(scores))
+        if scores[best] > self.best_score:
+            self.best_score = float(scores[best])
+            self.best_time = float(times[best])
+
+    def result(self):
+        return {"time": self.best_time, "score": self.best_score}
@@ -0,0 +1,148 @@
+import os, time, random, asyncio, threading
+import google.generativeai as genai
+from typing import List, Optional
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+
+
+class GeminiUnavailable(Exception):
+    """Raised when Gemini can't answer in time, or the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency. After `threshold` consecutive failures the
+    breaker opens and every call is rejected for `cooldown` seconds; then one trial
+    call is let through and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> bool:
+        """Returns True when this failure opened the breaker."""
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._failures >= self.threshold:
+                newly_opened = self._opened_at is None
+                self._opened_at = time.monotonic()
+                return newly_opened
+            return False
+
+
+class GeminiClient:
+    """
+    One Gemini client per process, shared by every job and thread.
+
+    genai is configured once and the model object reused. Requests run as
+    coroutines on a background event loop, so retries wait with asyncio.sleep
+    instead of blocking a worker thread, every call is bounded by a deadline,
+    and the circuit breaker skips the network entirely while Gemini keeps failing.
+    """
+    LOGGER = LogManager.get_logger("gemini_client")
+
+    _instance: Optional["GeminiClient"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, model_name: str):
+        options = {}
+        if VideoSettings.GEMINI_API_ENDPOINT:
+            # Lets tests point the SDK at a local stub of the API
+            options = {"transport": "rest", "client_options": {"api_endpoint": VideoSettings.GEMINI_API_ENDPOINT}}
+        genai.configure(api_key=os.getenv('GEMINI_API_KEY'), **options)
+        self.model = genai.GenerativeModel(model_name)
+        self.rest_transport = bool(VideoSettings.GEMINI_API_ENDPOINT)
+        self.breaker = CircuitBreaker(VideoSettings.GEMINI_BREAKER_THRESHOLD, VideoSettings.GEMINI_BREAKER_COOLDOWN)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="gemini-client", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def shared(cls, model_name: str) -> "GeminiClient":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(model_name)
+            return cls._instance
+
+    def generate(self, prompt: str, deadline: Optional[float] = None) -> str:
+        """Blocking entry point for worker threads, returns the response text or raises GeminiUnavailable."""
+        deadline = deadline or VideoSettings.GEMINI_DEADLINE
+        future = asyncio.run_coroutine_threadsafe(self.generate_async(prompt, deadline), self._loop)
+        return future.result()
+
+    def generate_many(self, prompts: List[str], deadline: Optional[float] = None) -> List[Optional[str]]:
+        """Sends the prompts concurrently (GEMINI_MAX_CONCURRENCY at a time), None for those that failed."""
+        deadline = deadline or VideoSettings.GEMINI_DEADLINE
+
+        async def run_all():
+            semaphore = asyncio.Semaphore(VideoSettings.GEMINI_MAX_CONCURRENCY)
+
+            async def run_one(prompt: str) -> Optional[str]:
+                async with semaphore:
+                    try:
+                        return await self.generate_async(prompt, deadline)
+                    except GeminiUnavailable as e:
+                        self.LOGGER.error(str(e))
+                        return None
+
+            return await asyncio.gather(*(run_one(prompt) for prompt in prompts))
+
+        return asyncio.run_coroutine_threadsafe(run_all(), self._loop).result()
+
+    async def _request(self, prompt: str) -> str:
+        if self.rest_transport:
+            # The SDK's async client needs gRPC, the REST transport runs the blocking call off the loop
+            response = await asyncio.get_running_loop().run_in_executor(None, self.model.generate_content, prompt)
+        else:
+            response = await self.model.generate_content_async(prompt)
+        return response.text.strip()
+
+    async def generate_async(self, prompt: str, deadline: float) -> str:
+        if not self.breaker.allow():
+            raise GeminiUnavailable("Circuit breaker is open, skipping Gemini.")
+
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + deadline
+        last_error: Optional[Exception] = None
+        for attempt in range(1, VideoSettings.GEMINI_MAX_RETRIES + 1):
+            remaining = expires_at - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                text = await asyncio.wait_for(self._request(prompt), timeout=min(remaining, VideoSettings.GEMINI_REQUEST_TIMEOUT))
+                self.breaker.record_success()
+                self.LOGGER.info(f"Response received on attempt {attempt}")
+                return text
+            except Exception as e:
+                last_error = e
+                self.LOGGER.warning(f"Attempt {attempt} failed: {e!r}")
+            if attempt < VideoSettings.GEMINI_MAX_RETRIES:
+                # Exponential backoff with full jitter, capped by what is left of the deadline
+                backoff = random.uniform(0, min(VideoSettings.GEMINI_BACKOFF_MAX, VideoSettings.GEMINI_BACKOFF_BASE * 2 ** attempt))
+                await asyncio.sleep(min(backoff, max(expires_at - loop.time(), 0)))
+
+        if self.breaker.record_failure():
+            self.LOGGER.error(f"Gemini keeps failing, circuit opened for {VideoSettings.GEMINI_BREAKER_COOLDOWN}s.")
+        raise GeminiUnavailable(f"No response from Gemini: {last_error!r}")
@@ -1,16 +1,32 @@
-import time, os, json, re
-import google.generativeai as genai
-from typing import List, Union
+import json, re, hashlib
+from collections import Counter
+from typing import Any, List, Optional, Tuple, Union
 from pydantic import ValidationError
 from app.schemas.ai_model import ColoredWord, AdvancedSRTResponse
 from app.config.logger import LogManager
+from app.core.config import VideoSettings
+from app.utils.disk_cache import DiskCache
+from app.models.transcript import Cue, format_timestamp
+from .gemini_client import GeminiClient
 
 class GeminiService:
     LOGGER = LogManager.get_logger("gemini_service")
 
+    MODEL_NAME = 'models/gemini-1.5-flash'
+    # Bump when a prompt template changes, cached responses of the old prompt are then ignored
+    BASIC_PROMPT_VERSION = 2
+    ADVANCED_PROMPT_VERSION = 2
+
+    RESPONSE_CACHE = DiskCache(
+        name="gemini",
+        directory=VideoSettings.GEMINI_CACHE_DIR,
+        max_bytes=VideoSettings.GEMINI_CACHE_MAX_BYTES,
+        ttl_seconds=VideoSettings.GEMINI_CACHE_TTL_SECONDS,
+    )
+
     BASIC_PROMPT_TEMPLATE = """
     You are given two inputs:
-    1. The content of a subtitle file (in .srt format).
+    1. A video transcript, one sentence per line.
     2. A list of colors.
 
     Your task is to:
@@ -49,8 +65,8 @@ class GeminiService:
     Only include words that appear in the subtitle text.
 
 
-    Subtitle content:
-    {srt_content}
+    Transcript:
+    {transcript}
 
 
     Color list:
@@ -60,7 +76,7 @@ class GeminiService:
 
     ADVANCED_PROMPT_TEMPLATE = """
     You are given two inputs:
-    1. The content of a subtitle file (in .srt format).
+    1. A video transcript, one sentence per line, each prefixed with its [start - end] time.
     2. A list of colors.
 
     Your tasks are:
@@ -85,9 +101,10 @@ class GeminiService:
         - Pale pastels or low-contrast colors (e.g., #CCCCCC, #FFFFE0)
     - All colors must be highly legible on a black background.
 
-    3. Determine the **active speech range** from the subtitle:
-    - Identify the timestamp of the first subtitle that contains real spoken dialogue (skip silent intros or music cues).
-    - Identify the timestamp of the last subtitle that includes meaningful dialogue (ignore end credits, silence, or outro music).
+    3. Determine the **active speech range** from the transcript:
+    - Use the start time of the first line that contains real spoken dialogue (skip silent intros or music cues).
+    - Use the end time of the last line that includes meaningful dialogue (ignore end credits, silence, or outro music).
+    - Copy the times exactly as written in the transcript.
 
     Use the examples above as guidance. Think emotionally and visually.
 
@@ -104,102 +121,197 @@ class GeminiService:
     }}
 
 
-    Subtitle content:
-    {srt_content}
+    Transcript:
+    {transcript}
 
 
     Color list:
     {colors}
     """
 
-    def __init__(self, max_retries: int = 3, retry_delay: int = 2):
-        api_key = os.getenv('GEMINI_API_KEY')
-        genai.configure(api_key=api_key)
-
-        self.model = genai.GenerativeModel('models/gemini-1.5-flash')
-        self.max_retries = max_retries
-        self.retry_delay = retry_delay
+    def __init__(self):
+        # Cheap: the configured SDK, model and event loop are shared by the whole process
+        self.client = GeminiClient.shared(self.MODEL_NAME)
+
+    @classmethod
+    def make_cache_key(cls, mode: str, prompt_version: int, cues: List[Cue], color_list: List[str]) -> str:
+        # Millisecond timestamps, the precision the prompt carries, so float noise can't change the key
+        transcript = [[format_timestamp(start), format_timestamp(end), " ".join(text.split())] for start, end, text in cues]
+        key = json.dumps([mode, prompt_version, cls.MODEL_NAME, list(color_list), transcript], ensure_ascii=False)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def compact_sentences(cls, cues: List[Cue]) -> List[Tuple[str, str, str]]:
+        """
+        Merges the short subtitle cues back into sentences, so the prompt carries one
+        SRT-style timestamp pair per sentence instead of a time line every few words.
+        """
+        sentences = []
+        start, end, words = None, None, []
+        for cue_start, cue_end, text in cues:
+            if not text.strip():
+                continue
+            cue_start, cue_end = format_timestamp(cue_start), format_timestamp(cue_end)
+            if start is None:
+                start = cue_start
+            end = cue_end
+            words.extend(text.split())
+            if text[-1] in ".!?…" or len(words) >= VideoSettings.GEMINI_MAX_SENTENCE_WORDS:
+                sentences.append((start, end, " ".join(words)))
+                start, end, words = None, None, []
+        if words:
+            sentences.append((start, end, " ".join(words)))
+        return sentences
+
+    @classmethod
+    def format_transcript(cls, sentences: List[Tuple[str, str, str]], with_timestamps: bool) -> str:
+        if with_timestamps:
+            return "\n".join(f"[{start} - {end}] {text}" for start, end, text in sentences)
+        return "\n".join(text for _, _, text in sentences)
+
+    @classmethod
+    def chunk_sentences(cls, sentences: List[Tuple[str, str, str]]) -> List[List[Tuple[str, str, str]]]:
+        chunks, current, size = [], [], 0
+        for sentence in sentences:
+            if current and size + len(sentence[2]) > VideoSettings.GEMINI_CHUNK_CHARS:
+                chunks.append(current)
+                current, size = [], 0
+            current.append(sentence)
+            size += len(sentence[2]) + 1
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @classmethod
+    def merge_colored_words(cls, chunk_words: List[List[ColoredWord]], color_list: List[str]) -> List[ColoredWord]:
+        """
+        Merges the words of every chunk in transcript order, keeping each word once.
+        A word colored differently by several chunks gets its most frequent color,
+        ties going to the color listed first, so the result doesn't depend on timing.
+        """
+        order: List[str] = []
+        spelling = {}
+        votes = {}
+        for words in chunk_words:
+            for cw in words:
+                key = cw.word.strip().lower()
+                if not key:
+                    continue
+                if key not in votes:
+                    order.append(key)
+                    spelling[key] = cw.word.strip()
+                    votes[key] = Counter()
+                votes[key][cw.color] += 1
+
+        rank = {color: index for index, color in enumerate(color_list)}
+        merged = []
+        for key in order:
+            color = min(votes[key].items(), key=lambda item: (-item[1], rank.get(item[0], len(rank)), item[0]))[0]
+            merged.append(ColoredWord(word=spelling[key], color=color))
+        return merged
+
+    @staticmethod
+    def _clean_response(response: str) -> str:
+        # Remove surrounding code block markers if present
+        return re.sub(r"^```(?:json)?|```$", "", response.strip(), flags=re.MULTILINE).strip()
 
-    def _generate_with_retry(self, prompt: str) -> str:
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                response = self.model.generate_content(prompt)
-                return response.text.strip()
-            except Exception as e:
-                if attempt == self.max_retries:
-                    return f"Error after {self.max_retries} retries: {str(e)}"
-                else:
-                    self.LOGGER.debug(f"Attempt {attempt} failed: {e}. Retrying in {self.retry_delay} seconds...")
-                    time.sleep(self.retry_delay)
-
-    def _generate_with_retry(self, prompt: str) -> str:
-        self.LOGGER.info("Generating content with retry logic")
-        for attempt in range(1, self.max_retries + 1):
+    def _analyze_chunks(self, template: str, transcripts: List[str], color_list: List[str]) -> List[Any]:
+        """Sends one prompt per transcript chunk concurrently and returns the parsed JSON replies (None on failure)."""
+        colors_json = json.dumps(color_list, ensure_ascii=False)
+        if len(transcripts) > 1:
+            self.LOGGER.info("Analysing %d transcript chunks concurrently", len(transcripts))
+        responses = self.client.generate_many([template.format(transcript=transcript, colors=colors_json) for transcript in transcripts])
+
+        replies = []
+        for response in responses:
+            if response is None:
+                replies.append(None)
+                continue
+            self.LOGGER.debug("Raw response: %s", response)
+            cleaned = self._clean_response(response)
             try:
-                self.LOGGER.debug("Attempt %d: Sending prompt to Gemini model", attempt)
-                response = self.model.generate_content(prompt)
-                self.LOGGER.info("Response received successfully on attempt %d", attempt)
-                return response.text.strip()
-            except Exception as e:
-                self.LOGGER.warning("Attempt %d failed: %s", attempt, str(e))
-                if attempt == self.max_retries:
-                    self.LOGGER.error("Max retries reached. Returning error response.")
-                    return f"Error after {self.max_retries} retries: {str(e)}"
-                self.LOGGER.info("Retrying in %d seconds...", self.retry_delay)
-                time.sleep(self.retry_delay)
-
-    def analyze_srt_basic(self, srt_content: str, color_list: List[str]) -> List[ColoredWord]:
+                replies.append(json.loads(cleaned))
+            except json.JSONDecodeError as e:
+                self.LOGGER.error("Error parsing response: %s", str(e))
+                self.LOGGER.error("Cleaned response was: %s", cleaned)
+                replies.append(None)
+        return replies
+
+    def analyze_srt_basic(self, cues: List[Cue], color_list: List[str]) -> List[ColoredWord]:
         self.LOGGER.info("Starting basic SRT analysis")
 
-        # Use JSON string representation for consistent formatting in prompt
-        colors_json = json.dumps(color_list, ensure_ascii=False)
-        prompt = self.BASIC_PROMPT_TEMPLATE.format(srt_content=srt_content, colors=colors_json)
-
-        self.LOGGER.debug("Constructed prompt for basic analysis")
-        response = self._generate_with_retry(prompt)
-
-        self.LOGGER.debug("Raw response: %s", response)
+        cache_key = self.make_cache_key("basic", self.BASIC_PROMPT_VERSION, cues, color_list)
+        cached = self.RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            self.LOGGER.info("Basic analysis cache hit %s (%s)", cache_key[:12], self.RESPONSE_CACHE.stats())
+            return [ColoredWord(**item) for item in cached]
 
-        # Remove surrounding code block markers if present
-        cleaned = re.sub(r"^```(?:json)?|```$", "", response.strip(), flags=re.MULTILINE).strip()
-
-        self.LOGGER.debug("Cleaned response: %s", cleaned)
-
-        try:
-            parsed = json.loads(cleaned)
-            colored_words = [ColoredWord(**item) for item in parsed]
-            self.LOGGER.info("Parsed %d colored words successfully", len(colored_words))
-            return colored_words
-        except (json.JSONDecodeError, ValidationError, TypeError) as e:
-            self.LOGGER.error("Error parsing basic response: %s", str(e))
-            self.LOGGER.error("Cleaned response was: %s", cleaned)
+        chunks = self.chunk_sentences(self.compact_sentences(cues))
+        if not chunks:
             return []
-
-    def analyze_srt_advanced(self, srt_content: str, color_list: List[str]) -> Union[AdvancedSRTResponse, dict]:
+        replies = self._analyze_chunks(
+            self.BASIC_PROMPT_TEMPLATE,
+            [self.format_transcript(chunk, with_timestamps=False) for chunk in chunks],
+            color_list,
+        )
+
+        chunk_words: List[List[ColoredWord]] = []
+        complete = True
+        for reply in replies:
+            try:
+                chunk_words.append([ColoredWord(**item) for item in reply])
+            except (ValidationError, TypeError) as e:
+                self.LOGGER.error("Error parsing basic response: %s", str(e))
+                complete = False
+
+        colored_words = self.merge_colored_words(chunk_words, color_list)
+        self.LOGGER.info("Parsed %d colored words from %d chunks", len(colored_words), len(chunks))
+        # Only fully validated responses are cached, errors and unparsable replies are retried next time
+        if complete:
+            self.RESPONSE_CACHE.set(cache_key, [cw.model_dump() for cw in colored_words])
+        return colored_words
+
+    def analyze_srt_advanced(self, cues: List[Cue], color_list: List[str]) -> Union[AdvancedSRTResponse, dict]:
         self.LOGGER.info("Starting advanced SRT analysis")
         self.LOGGER.info("Colors list: %s", color_list)
 
-        # Serialize color list to JSON for accurate inclusion in prompt
-        colors_json = json.dumps(color_list, ensure_ascii=False)
-        self.LOGGER.debug("Serialized colors for prompt: %s", colors_json)
-
-        prompt = self.ADVANCED_PROMPT_TEMPLATE.format(srt_content=srt_content, colors=colors_json)
-        self.LOGGER.debug("Constructed prompt for advanced analysis:\n%s", prompt)
-
-        response = self._generate_with_retry(prompt)
-        self.LOGGER.debug("Raw response: %s", response)
-
-        # Remove optional triple backtick formatting (e.g., ```json ... ```)
-        cleaned = re.sub(r"^```(?:json)?|```$", "", response.strip(), flags=re.MULTILINE).strip()
-        self.LOGGER.debug("Cleaned response: %s", cleaned)
-
-        try:
-            parsed = json.loads(cleaned)
-            result = AdvancedSRTResponse(**parsed)
-            self.LOGGER.info("Parsed advanced response successfully: %s", result)
-            return result
-        except (json.JSONDecodeError, ValidationError, TypeError) as e:
-            self.LOGGER.error("Failed to parse advanced response: %s", str(e))
-            self.LOGGER.debug("Traceback:", exc_info=True)
-            self.LOGGER.error("Cleaned response content: %s", cleaned)
-            return {"raw_response": response}
\ No newline at end of file
+        cache_key = self.make_cache_key("advanced", self.ADVANCED_PROMPT_VERSION, cues, color_list)
+        cached = self.RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            self.LOGGER.info("Advanced analysis cache hit %s (%s)", cache_key[:12], self.RESPONSE_CACHE.stats())
+            return AdvancedSRTResponse(**cached)
+
+        sentences = self.compact_sentences(cues)
+        chunks = self.chunk_sentences(sentences)
+        if not chunks:
+            return {"raw_response": ""}
+        replies = self._analyze_chunks(
+            self.ADVANCED_PROMPT_TEMPLATE,
+            [self.format_transcript(chunk, with_timestamps=True) for chunk in chunks],
+            color_list,
+        )
+
+        results: List[Optional[AdvancedSRTResponse]] = []
+        for reply in replies:
+            try:
+                results.append(AdvancedSRTResponse(**reply))
+            except (ValidationError, TypeError) as e:
+                self.LOGGER.error("Failed to parse advanced response: %s", str(e))
+                results.append(None)
+        if not any(results):
+            return {"raw_response": replies}
+
+        # Speech starts in the first chunk and ends in the last one; when either of
+        # them failed, keep that end of the video instead of guessing
+        first, last = results[0], results[-1]
+        result = AdvancedSRTResponse(
+            colored_words=self.merge_colored_words([r.colored_words for r in results if r], color_list),
+            active_speech_range={
+                "start_time": first.active_speech_range.start_time if first else sentences[0][0],
+                "end_time": last.active_speech_range.end_time if last else sentences[-1][1],
+            },
+        )
+        self.LOGGER.info("Parsed advanced response successfully: %s", result)
+        if all(results):
+            self.RESPONSE_CACHE.set(cache_key, result.model_dump())
+        return result
@@ -0,0 +1,204 @@
+import re, math, zlib, string
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Dict, List, Optional, Union
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+from app.schemas.ai_model import ActiveSpeechRange, AdvancedSRTResponse, ColoredWord
+from app.models.transcript import Cue, format_timestamp
+from .ass_renderer import AssRenderer
+
+
+class LocalHighlighter:
+    """
+    In-process highlight word picker, no network involved.
+
+    Words are scored with TF-IDF over the subtitle cues, boosted when they are in
+    the emotion lexicon, and colored deterministically: lexicon words get a color
+    of the matching tone from the list, other words a stable hash of the word.
+
+    Tokenizing works for every language in LANGUAGE_CODES, but STOPWORDS and
+    EMOTION_LEXICON are English only: other languages are ranked by TF-IDF
+    alone and colored by hash.
+    """
+
+    STOPWORDS = frozenset("""
+        a about above after again against all also am an and any are aren't as at be because been before being
+        below between both but by can can't cannot could couldn't did didn't do does doesn't doing don't down
+        during each even ever every few for from further get gets getting go goes going gonna gotta got had hadn't
+        has hasn't have haven't having he he'd he'll he's her here here's hers herself him himself his how how's
+        i i'd i'll i'm i've if in into is isn't it it's its itself just kind know let let's like lot make many
+        maybe me might more most much must my myself no nor not now of off oh okay ok on once one only or other
+        ought our ours ourselves out over own really right said same say says see she she'd she'll she's should
+        shouldn't so some something such take than that that's the their theirs them themselves then there
+        there's these they they'd they'll they're they've thing things think this those though through to too
+        uh um under until up us very want was wasn't way we we'd we'll we're we've well were weren't what what's
+        when when's where where's which while who who's whom why why's will with won't would wouldn't yeah yes
+        you you'd you'll you're you've your yours yourself yourselves
+    """.split())
+
+    # Tone of emotionally loaded words: warm (passion, anger, excitement), cool (sadness,
+    # calm, reflection) or soft (creativity, tenderness, vulnerability)
+    EMOTION_LEXICON: Dict[str, str] = {
+        **dict.fromkeys("""
+            love passion fire burn burning angry anger furious rage fight fighting war danger dangerous blood
+            power powerful strong strength win winning victory excited exciting amazing incredible energy
+            explode explosive scream hate brave courage bold fierce wild hot heart crazy insane unstoppable
+            success money rich champion dream dreams hustle grind fast faster attack kill killed destroy
+        """.split(), "warm"),
+        **dict.fromkeys("""
+            sad sadness cry crying tears alone lonely lost loss grief pain hurt broken cold fear afraid scared
+            calm peace peaceful quiet silence silent ocean rain storm dark darkness death dead die dying miss
+            remember memory memories home mother father family sorry regret tired heavy empty depression anxiety
+        """.split(), "cool"),
+        **dict.fromkeys("""
+            beautiful gentle kind kindness soft tender hope hopeful magic magical create creative imagine art
+            music soul spirit wonder wonderful grateful gratitude happy happiness joy smile laugh laughing free
+            freedom together friend friends baby dance light believe faith inspire inspired grace
+        """.split(), "soft"),
+    }
+    EMOTION_BOOST = 2.0
+    MIN_WORD_LENGTH = 3
+    # Sound tags like [Music] or (laughs) and note symbols aren't speech
+    NON_SPEECH_PATTERN = re.compile(r"\[[^\]]*\]|\([^)]*\)|[♪♫]")
+    # Any Unicode letter, digits alone don't make a word
+    LETTER_PATTERN = re.compile(r"[^\W\d_]")
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        """
+        Lowercase words without stopwords. Split on whitespace and cleaned with
+        AssRenderer.clean_word, so every token matches a word of the rendered subtitles.
+        """
+        tokens = []
+        for word in text.lower().split():
+            core = word.strip(string.punctuation + "“”‘’«»¿¡…").replace("’", "'")
+            token = AssRenderer.clean_word(core)
+            if token and core not in cls.STOPWORDS and cls.LETTER_PATTERN.search(token):
+                tokens.append(token)
+        return tokens
+
+    @classmethod
+    def color_tone(cls, color: str) -> Optional[str]:
+        """Tone of a '#RRGGBB' or '&HRRGGBB&' color from its hue, None for grays."""
+        digits = re.sub(r"[^0-9A-Fa-f]", "", color.upper().replace("&H", "", 1))[-6:]
+        if len(digits) != 6:
+            return None
+        r, g, b = (int(digits[i:i + 2], 16) / 255 for i in (0, 2, 4))
+        high, low = max(r, g, b), min(r, g, b)
+        if high - low < 0.15:
+            return None
+        if high == r:
+            hue = (60 * (g - b) / (high - low)) % 360
+        elif high == g:
+            hue = 60 * (b - r) / (high - low) + 120
+        else:
+            hue = 60 * (r - g) / (high - low) + 240
+        if hue < 70 or hue >= 330:
+            return "warm"
+        if hue < 250:
+            return "cool"
+        return "soft"
+
+    @classmethod
+    def pick_color(cls, word: str, tone: Optional[str], color_list: List[str]) -> str:
+        candidates = [color for color in color_list if tone and cls.color_tone(color) == tone] or color_list
+        # crc32 rather than hash(), which is salted per process
+        return candidates[zlib.crc32(word.encode("utf-8")) % len(candidates)]
+
+    @classmethod
+    def pick_words(cls, cues: List[Cue], color_list: List[str], max_words: Optional[int] = None) -> List[ColoredWord]:
+        cues = [cls.tokenize(cls.NON_SPEECH_PATTERN.sub(" ", text)) for _, _, text in cues if text.strip()]
+        if not cues or not color_list:
+            return []
+
+        term_counts = Counter(token for tokens in cues for token in tokens)
+        document_counts = Counter(token for tokens in cues for token in set(tokens))
+        first_seen = {}
+        for tokens in cues:
+            for token in tokens:
+                first_seen.setdefault(token, len(first_seen))
+
+        scores = {}
+        for word, count in term_counts.items():
+            if len(word) < cls.MIN_WORD_LENGTH:
+                continue
+            idf = math.log(len(cues) / document_counts[word]) + 1
+            # Repetition matters less than rarity, a word said ten times isn't ten times as important
+            score = (1 + math.log(count)) * idf
+            if word in cls.EMOTION_LEXICON:
+                score *= cls.EMOTION_BOOST
+            scores[word] = score
+
+        total_words = sum(term_counts.values())
+        limit = max_words or min(max(5, total_words // 25), 40)
+        ranked = sorted(scores, key=lambda word: (-scores[word], first_seen[word]))[:limit]
+        # Keep transcript order so the result reads like the Gemini output
+        ranked.sort(key=first_seen.get)
+        return [ColoredWord(word=word, color=cls.pick_color(word, cls.EMOTION_LEXICON.get(word), color_list)) for word in ranked]
+
+    @classmethod
+    def speech_range(cls, cues: List[Cue]) -> Optional[ActiveSpeechRange]:
+        """First and last cues with actual words, skipping [Music]-style tags and note symbols."""
+        spoken = [
+            (start, end) for start, end, text in cues
+            if cls.LETTER_PATTERN.search(cls.NON_SPEECH_PATTERN.sub(" ", text))
+        ]
+        if not spoken:
+            return None
+        # SRT-style times, the format Gemini answers with and trim_video parses
+        return ActiveSpeechRange(start_time=format_timestamp(spoken[0][0]), end_time=format_timestamp(spoken[-1][1]))
+
+
+class HighlightService:
+    """Chooses between Gemini and the local highlighter according to the request's highlight_engine."""
+    LOGGER = LogManager.get_logger("highlight_service")
+
+    # Gemini calls that overrun the auto budget keep running here and still fill the response cache
+    _executor = ThreadPoolExecutor(max_workers=VideoSettings.GEMINI_MAX_CONCURRENCY, thread_name_prefix="highlight")
+
+    @classmethod
+    def local_basic(cls, cues: List[Cue], color_list: List[str]) -> List[ColoredWord]:
+        return LocalHighlighter.pick_words(cues, color_list)
+
+    @classmethod
+    def local_advanced(cls, cues: List[Cue], color_list: List[str]) -> Union[AdvancedSRTResponse, dict]:
+        speech_range = LocalHighlighter.speech_range(cues)
+        if speech_range is None:
+            return {"raw_response": "No spoken dialogue found."}
+        return AdvancedSRTResponse(colored_words=LocalHighlighter.pick_words(cues, color_list), active_speech_range=speech_range)
+
+    @classmethod
+    def analyze(cls, cues: List[Cue], color_list: List[str], engine: str, advanced: bool):
+        """
+        Returns the same types as GeminiService.analyze_srt_basic / analyze_srt_advanced.
+        In auto mode Gemini gets HIGHLIGHT_LATENCY_BUDGET seconds; a late, failed or
+        empty answer is replaced by the local result.
+        """
+        local = cls.local_advanced if advanced else cls.local_basic
+        if engine == "local":
+            return local(cues, color_list)
+
+        # Imported here so the local engine works without the Gemini SDK
+        from .gemini_service import GeminiService
+
+        gemini = GeminiService()
+        analyze = gemini.analyze_srt_advanced if advanced else gemini.analyze_srt_basic
+        if engine == "gemini":
+            return analyze(cues=cues, color_list=color_list)
+
+        future = cls._executor.submit(analyze, cues=cues, color_list=color_list)
+        try:
+            response = future.result(timeout=VideoSettings.HIGHLIGHT_LATENCY_BUDGET)
+        except TimeoutError:
+            cls.LOGGER.warning(f"Gemini exceeded the {VideoSettings.HIGHLIGHT_LATENCY_BUDGET}s budget, using local highlights.")
+            return local(cues, color_list)
+        except Exception as e:
+            cls.LOGGER.warning(f"Gemini failed ({e}), using local highlights.")
+            return local(cues, color_list)
+
+        if (advanced and not isinstance(response, AdvancedSRTResponse)) or (not advanced and not response):
+            cls.LOGGER.info("Gemini returned no usable highlights, using local highlights.")
+            return local(cues, color_list)
+        return response
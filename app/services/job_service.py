@@ -0,0 +1,260 @@
+import json, time, threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy import select, update
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+from app.core.database import SessionLocal
+from app.models.video_models import JobStatus, VideoJob
+from app.schemas.job_schema import JobStatusResponse, StageTiming
+from app.schemas.video_schema import VideoEditRequest, VideoUploadRequest, WebhookVideoResponse
+from .upload_service import UploadService
+from .webhook_service import WebhookService
+
+
+class JobService:
+    LOGGER = LogManager.get_logger("job_service")
+    # Stages of one job can run concurrently, serialize the read-modify-write of its stage timings
+    _stage_lock = threading.Lock()
+
+    @classmethod
+    def enqueue(cls, request: VideoEditRequest, source_path: Optional[str] = None) -> str:
+        job = VideoJob(payload=request.model_dump_json(), source_path=source_path)
+        with SessionLocal() as session:
+            session.add(job)
+            session.commit()
+        cls.LOGGER.info(f"Job {job.id} queued.")
+        return job.id
+
+    @classmethod
+    def load_request(cls, job: VideoJob) -> VideoEditRequest:
+        request_model = VideoUploadRequest if job.source_path else VideoEditRequest
+        return request_model.model_validate_json(job.payload)
+
+    @classmethod
+    def get_job(cls, job_id: str) -> Optional[VideoJob]:
+        with SessionLocal() as session:
+            return session.get(VideoJob, job_id)
+
+    @classmethod
+    def get_status(cls, job_id: str) -> Optional[JobStatusResponse]:
+        job = cls.get_job(job_id)
+        if job is None:
+            return None
+
+        stages = {}
+        for name, timing in json.loads(job.stages or "{}").items():
+            started_at = datetime.fromisoformat(timing["started_at"]) if timing.get("started_at") else None
+            finished_at = datetime.fromisoformat(timing["finished_at"]) if timing.get("finished_at") else None
+            duration = (finished_at - started_at).total_seconds() if started_at and finished_at else None
+            stages[name] = StageTiming(started_at=started_at, finished_at=finished_at, duration_seconds=duration)
+
+        return JobStatusResponse(
+            job_id=job.id,
+            status=job.status,
+            stage=job.stage,
+            progress=job.progress,
+            eta_seconds=job.eta_seconds,
+            stages=stages,
+            attempts=job.attempts,
+            error=job.error,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+        )
+
+    @classmethod
+    def start_stage(cls, job_id: Optional[str], stage: str, close_previous: bool = True) -> Callable[[float], None]:
+        """
+        Records the start of a pipeline stage, closing the previous one unless stages
+        run concurrently, and returns a callback that reports the stage progress in
+        percent (used for ffmpeg runs). Does nothing when the pipeline runs outside of a job.
+        """
+        if job_id is None:
+            return lambda percent: None
+
+        now = datetime.utcnow()
+        with cls._stage_lock, SessionLocal() as session:
+            job = session.get(VideoJob, job_id)
+            if job is None:
+                return lambda percent: None
+            stages = json.loads(job.stages or "{}")
+            if close_previous:
+                stages = cls._close_open_stage(stages, job.stage, now)
+            # A stage re-entered for the next aspect ratio keeps its first start time
+            started_at = stages.get(stage, {}).get("started_at") or now.isoformat()
+            stages[stage] = {"started_at": started_at, "finished_at": None}
+            job.stages = json.dumps(stages)
+            job.stage = stage
+            job.progress = None
+            job.eta_seconds = None
+            session.commit()
+
+        started = time.monotonic()
+        last_report = [0.0]
+
+        def report_progress(percent: float):
+            now_monotonic = time.monotonic()
+            # Throttle the writes, ffmpeg emits a progress block every half second
+            if percent < 100 and now_monotonic - last_report[0] < VideoSettings.JOB_PROGRESS_INTERVAL:
+                return
+            last_report[0] = now_monotonic
+            elapsed = now_monotonic - started
+            eta = elapsed * (100 - percent) / percent if percent > 0 else None
+            try:
+                cls.update_progress(job_id, percent, eta)
+            except Exception as e:
+                cls.LOGGER.warning(f"Unable to record progress for job {job_id}: {e}")
+
+        return report_progress
+
+    @classmethod
+    def finish_stage(cls, job_id: Optional[str], stage: str):
+        if job_id is None:
+            return
+        with cls._stage_lock, SessionLocal() as session:
+            job = session.get(VideoJob, job_id)
+            if job is None:
+                return
+            job.stages = json.dumps(cls._close_open_stage(json.loads(job.stages or "{}"), stage, datetime.utcnow()))
+            session.commit()
+
+    @classmethod
+    def update_progress(cls, job_id: str, percent: float, eta_seconds: Optional[float]):
+        with SessionLocal() as session:
+            session.execute(
+                update(VideoJob)
+                .where(VideoJob.id == job_id)
+                .values(progress=round(min(percent, 100.0), 1), eta_seconds=round(eta_seconds, 1) if eta_seconds is not None else None)
+            )
+            session.commit()
+
+    @staticmethod
+    def _close_open_stage(stages: dict, stage: Optional[str], now: datetime) -> dict:
+        if stage and stage in stages and not stages[stage].get("finished_at"):
+            stages[stage]["finished_at"] = now.isoformat()
+        return stages
+
+    @classmethod
+    def claim_next(cls, worker_id: str) -> Optional[VideoJob]:
+        """Atomically moves the oldest queued job to running and returns it."""
+        with SessionLocal() as session:
+            while True:
+                job = session.execute(
+                    select(VideoJob)
+                    .where(VideoJob.status == JobStatus.QUEUED)
+                    .order_by(VideoJob.created_at)
+                    .limit(1)
+                ).scalar_one_or_none()
+                if job is None:
+                    return None
+
+                now = datetime.utcnow()
+                claimed = session.execute(
+                    update(VideoJob)
+                    .where(VideoJob.id == job.id, VideoJob.status == JobStatus.QUEUED)
+                    .values(
+                        status=JobStatus.RUNNING,
+                        worker_id=worker_id,
+                        attempts=VideoJob.attempts + 1,
+                        started_at=now,
+                        heartbeat_at=now,
+                    )
+                ).rowcount
+                session.commit()
+                if claimed == 1:
+                    session.refresh(job)
+                    return job
+                # Another worker won the race for this job, try the next one
+
+    @classmethod
+    def heartbeat(cls, job_id: str):
+        with SessionLocal() as session:
+            session.execute(
+                update(VideoJob)
+                .where(VideoJob.id == job_id, VideoJob.status == JobStatus.RUNNING)
+                .values(heartbeat_at=datetime.utcnow())
+            )
+            session.commit()
+
+    @classmethod
+    def mark_completed(cls, job_id: str):
+        cls._finish(job_id, JobStatus.COMPLETED)
+
+    @classmethod
+    def mark_failed(cls, job_id: str, error: str):
+        cls._finish(job_id, JobStatus.FAILED, error=error)
+
+    @classmethod
+    def _finish(cls, job_id: str, status: str, error: Optional[str] = None):
+        now = datetime.utcnow()
+        with SessionLocal() as session:
+            job = session.get(VideoJob, job_id)
+            if job is None:
+                return
+            job.stages = json.dumps(cls._close_open_stage(json.loads(job.stages or "{}"), job.stage, now))
+            job.status = status
+            job.error = error
+            job.eta_seconds = None
+            job.finished_at = now
+            session.commit()
+        # Kept through retries, a direct upload is only dropped once the job won't run again
+        if job.source_path:
+            UploadService.discard(job.source_path)
+        cls.LOGGER.info(f"Job {job_id} {status}.")
+
+    @classmethod
+    def _fail_stale(cls, job: VideoJob, cutoff: datetime) -> bool:
+        """
+        Fails a stale job that used all its attempts, like a failed handle_edit: the job
+        is marked failed and the failure webhook queued. False when another worker's
+        recovery got to it first.
+        """
+        error = "Worker stopped responding."
+        with SessionLocal() as session:
+            won = session.execute(
+                update(VideoJob)
+                .where(VideoJob.id == job.id, VideoJob.status == JobStatus.RUNNING, VideoJob.heartbeat_at < cutoff)
+                .values(status=JobStatus.FAILED)
+            ).rowcount
+            session.commit()
+        if won != 1:
+            return False
+
+        cls.mark_failed(job.id, error)
+        try:
+            request = cls.load_request(job)
+            body = WebhookVideoResponse(
+                message=f"Unable to process the video. {error}",
+                status_code=400,
+                metadata=request.metadata,
+            ).model_dump()
+            WebhookService.enqueue(request.webhook_url, body, job_id=job.id)
+        except Exception as e:
+            cls.LOGGER.error(f"Unable to queue the failure webhook of job {job.id}: {e}")
+        return True
+
+    @classmethod
+    def requeue_stale(cls) -> int:
+        """
+        Puts back running jobs whose worker stopped sending heartbeats (crash or restart).
+        Jobs that already used all their attempts are failed instead, with a failure webhook.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=VideoSettings.JOB_STALE_AFTER_SECONDS)
+        with SessionLocal() as session:
+            stale = (VideoJob.status == JobStatus.RUNNING, VideoJob.heartbeat_at < cutoff)
+            exhausted = session.execute(
+                select(VideoJob).where(*stale, VideoJob.attempts >= VideoSettings.JOB_MAX_ATTEMPTS)
+            ).scalars().all()
+            requeued = session.execute(
+                update(VideoJob)
+                .where(*stale, VideoJob.attempts < VideoSettings.JOB_MAX_ATTEMPTS)
+                .values(status=JobStatus.QUEUED, worker_id=None)
+            ).rowcount
+            session.commit()
+
+        failed = sum(cls._fail_stale(job, cutoff) for job in exhausted)
+        if requeued or failed:
+            cls.LOGGER.warning(f"Recovered stale jobs: {requeued} requeued, {failed} failed.")
+        return requeued
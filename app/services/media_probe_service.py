@@ -0,0 +1,109 @@
+import ffmpeg
+from fractions import Fraction
+from typing import Optional, Tuple
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+from app.schemas.media_schema import AudioLayout, MediaInfo
+
+
+class MediaProbeService:
+    LOGGER = LogManager.get_logger("media_probe_service")
+
+    @classmethod
+    def _parse_rate(cls, rate: Optional[str]) -> float:
+        try:
+            return float(Fraction(rate)) if rate and rate != "0/0" else 0.0
+        except (ValueError, ZeroDivisionError):
+            return 0.0
+
+    @classmethod
+    def _parse_rotation(cls, stream: dict) -> int:
+        for side_data in stream.get('side_data_list', []):
+            if 'rotation' in side_data:
+                return int(float(side_data['rotation'])) % 360
+        return int(stream.get('tags', {}).get('rotate', 0)) % 360
+
+    @classmethod
+    def check_limits(cls, media_info: MediaInfo):
+        """Raises ValueError when the source is outside the accepted duration, size or resolution."""
+        if not VideoSettings.MIN_VIDEO_DURATION_SECONDS <= media_info.duration <= VideoSettings.MAX_VIDEO_DURATION_SECONDS:
+            raise ValueError(
+                f"Video duration must be between {VideoSettings.MIN_VIDEO_DURATION_SECONDS / 60:g} "
+                f"and {VideoSettings.MAX_VIDEO_DURATION_SECONDS / 60:g} minutes."
+            )
+        if media_info.size_bytes and media_info.size_bytes > VideoSettings.MAX_SOURCE_BYTES:
+            raise ValueError(f"Video is larger than {VideoSettings.MAX_SOURCE_BYTES} bytes.")
+        if max(media_info.width, media_info.height) > VideoSettings.MAX_SOURCE_DIMENSION:
+            raise ValueError(f"Video resolution exceeds {VideoSettings.MAX_SOURCE_DIMENSION} pixels.")
+
+    @classmethod
+    def _parse_keyframes(cls, probe: dict, stream_index: int, start_time: float) -> Tuple[float, ...]:
+        return tuple(sorted(
+            float(packet['pts_time']) - start_time
+            for packet in probe.get('packets', [])
+            if packet.get('stream_index') == stream_index
+            and 'K' in packet.get('flags', '')
+            and packet.get('pts_time') not in (None, 'N/A')
+        ))
+
+    @classmethod
+    def probe_keyframes(cls, path: str, start_time: float = 0.0) -> Tuple[float, ...]:
+        """Video keyframe times of path relative to start_time, read from every packet header."""
+        probe = ffmpeg.probe(path, select_streams='v:0', show_entries='packet=stream_index,pts_time,flags')
+        video_stream = next((s for s in probe.get('streams', []) if s.get('codec_type') == 'video'), None)
+        stream_index = video_stream['index'] if video_stream else 0
+        return cls._parse_keyframes(probe, stream_index, start_time)
+
+    @classmethod
+    def probe(cls, path: str, with_keyframes: bool = False, timeout: Optional[float] = None) -> MediaInfo:
+        """
+        Runs ffprobe once and returns the typed MediaInfo for path (a local file or a URL).
+        The keyframe index needs every packet header, so it is only read when asked for;
+        otherwise MediaInfo.keyframes is None and the trim reads it with probe_keyframes.
+        timeout bounds each network read, in seconds.
+        """
+        kwargs = {'show_entries': 'packet=stream_index,pts_time,flags'} if with_keyframes else {}
+        if timeout is not None:
+            kwargs['rw_timeout'] = int(timeout * 1_000_000)
+        probe = ffmpeg.probe(path, **kwargs)
+
+        video_stream = next((s for s in probe['streams'] if s['codec_type'] == 'video'), None)
+        if video_stream is None:
+            raise ValueError("No video stream found.")
+        audio_stream = next((s for s in probe['streams'] if s['codec_type'] == 'audio'), None)
+
+        format_info = probe.get('format', {})
+        start_time = float(format_info.get('start_time', 0) or 0)
+        duration = format_info.get('duration') or video_stream.get('duration')
+        if not duration:
+            raise ValueError("Unable to determine the video duration.")
+
+        keyframes = cls._parse_keyframes(probe, video_stream['index'], start_time) if with_keyframes else None
+
+        audio = None
+        if audio_stream is not None:
+            audio = AudioLayout(
+                codec=audio_stream.get('codec_name', ''),
+                channels=int(audio_stream.get('channels', 0)),
+                channel_layout=audio_stream.get('channel_layout'),
+                sample_rate=int(audio_stream.get('sample_rate', 0) or 0),
+            )
+
+        return MediaInfo(
+            path=path,
+            format_name=format_info.get('format_name', ''),
+            duration=float(duration),
+            size_bytes=int(format_info['size']) if format_info.get('size') else None,
+            start_time=start_time,
+            width=int(video_stream['width']),
+            height=int(video_stream['height']),
+            rotation=cls._parse_rotation(video_stream),
+            fps=cls._parse_rate(video_stream.get('avg_frame_rate')) or cls._parse_rate(video_stream.get('r_frame_rate')),
+            video_codec=video_stream.get('codec_name', ''),
+            pix_fmt=video_stream.get('pix_fmt'),
+            profile=video_stream.get('profile'),
+            level=video_stream.get('level'),
+            keyframes=keyframes,
+            audio=audio,
+        )
@@ -0,0 +1,220 @@
+import os, shutil, fcntl, hashlib, uuid
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from typing import Callable, List, Optional
+from sqlalchemy import delete, func, select
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+from app.core.database import SessionLocal
+from app.models.video_models import SourceCacheAlias, SourceCacheBlob
+from .download_service import DownloadService, RemoteSource
+
+
+class SourceCacheService:
+    """
+    Content-addressed cache of downloaded source videos.
+
+    Blobs are stored once under their SHA-256 and hard-linked into job folders.
+    A URL is only served from the cache when the origin returns the same ETag or
+    Last-Modified as when it was cached; without either the source is always
+    downloaded but its bytes are still deduplicated. Locks are taken per URL key
+    first, then per content hash, and that order is kept everywhere. Job folders must never write into the
+    linked file in place; the pipeline always replaces it (os.replace), so the
+    cached blob stays untouched.
+    """
+    LOGGER = LogManager.get_logger("source_cache_service")
+
+    @classmethod
+    def make_url_key(cls, video_url: str, etag: Optional[str], last_modified: Optional[str]) -> str:
+        return hashlib.sha256(f"{video_url}\n{etag or ''}\n{last_modified or ''}".encode("utf-8")).hexdigest()
+
+    @classmethod
+    def blob_path(cls, content_hash: str) -> str:
+        extension = os.path.splitext(VideoSettings.VIDEO_FILE)[1]
+        return os.path.join(VideoSettings.SOURCE_CACHE_DIR, content_hash[:2], f"{content_hash}{extension}")
+
+    @classmethod
+    def lock_path(cls, key: str) -> str:
+        return os.path.join(VideoSettings.SOURCE_CACHE_DIR, "locks", f"{key}.lock")
+
+    @classmethod
+    @contextmanager
+    def _key_lock(cls, key: str):
+        """
+        Exclusive lock per URL key or content hash, shared by threads and worker
+        processes, so concurrent requests for the same source wait for the one
+        download in flight. Eviction deletes lock files while holding them; a
+        waiter that ends up locking a deleted file opens the current one again.
+        """
+        path = cls.lock_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        while True:
+            lock_file = open(path, "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    current = os.stat(path).st_ino
+                except FileNotFoundError:
+                    current = None
+                if current != os.fstat(lock_file.fileno()).st_ino:
+                    continue
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                return
+            finally:
+                lock_file.close()
+
+    @classmethod
+    def _link(cls, source: str, destination: str):
+        if os.path.exists(destination):
+            os.remove(destination)
+        try:
+            os.link(source, destination)
+        except OSError:
+            # Different filesystem, fall back to a real copy
+            shutil.copy2(source, destination)
+
+    @classmethod
+    def _lookup(cls, url_key: str) -> Optional[str]:
+        with SessionLocal() as session:
+            alias = session.get(SourceCacheAlias, url_key)
+            if alias is None:
+                return None
+            blob = session.get(SourceCacheBlob, alias.content_hash)
+            path = cls.blob_path(alias.content_hash)
+            if blob is None or not os.path.exists(path):
+                session.delete(alias)
+                session.commit()
+                return None
+            blob.last_accessed_at = datetime.utcnow()
+            session.commit()
+            return path
+
+    @classmethod
+    def _store(cls, downloaded_path: str, content_hash: str, alias: Optional[SourceCacheAlias] = None) -> str:
+        """Moves a download into the cache, the caller holds the content hash lock."""
+        path = cls.blob_path(content_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with SessionLocal() as session:
+            blob = session.get(SourceCacheBlob, content_hash)
+            if blob is not None and os.path.exists(path):
+                # Same bytes already cached under another URL, keep the existing blob
+                os.remove(downloaded_path)
+                blob.last_accessed_at = datetime.utcnow()
+            else:
+                os.replace(downloaded_path, path)
+                if blob is None:
+                    session.add(SourceCacheBlob(content_hash=content_hash, size=os.path.getsize(path)))
+            if alias is not None:
+                session.merge(alias)
+            session.commit()
+        return path
+
+    @classmethod
+    def _download(cls, video_url: str, remote: RemoteSource, downloader: Callable[..., str]):
+        os.makedirs(VideoSettings.SOURCE_CACHE_DIR, exist_ok=True)
+        download_path = os.path.join(VideoSettings.SOURCE_CACHE_DIR, f".download-{uuid.uuid4()}")
+        try:
+            return download_path, downloader(video_url, download_path, remote=remote)
+        except Exception:
+            if os.path.exists(download_path):
+                os.remove(download_path)
+            raise
+
+    @classmethod
+    def fetch(cls, video_url: str, destination_path: str, downloader: Callable[..., str], remote: Optional[RemoteSource] = None) -> str:
+        """
+        Places the source for video_url at destination_path, downloading it only on a
+        cache miss. downloader(url, path, remote=...) must write the file and return
+        its SHA-256. The one HEAD request (remote) serves both the cache validators
+        and the downloader; when the origin rejects HEAD there are no validators and
+        the source is downloaded uncached, like any URL without them.
+        """
+        remote = remote or DownloadService.head(video_url)
+        if not remote.etag and not remote.last_modified:
+            # Without validators we can't tell whether the URL changed, so there is no
+            # alias to look up or to wait for: download, then deduplicate by content hash
+            cls.LOGGER.info(f"No ETag/Last-Modified for {video_url}, bypassing URL lookup.")
+            download_path, content_hash = cls._download(video_url, remote, downloader)
+            with cls._key_lock(content_hash):
+                cls._link(cls._store(download_path, content_hash), destination_path)
+            cls.evict()
+            return destination_path
+
+        url_key = cls.make_url_key(video_url, remote.etag, remote.last_modified)
+        with cls._key_lock(url_key):
+            # Eviction takes this lock before removing the aliased blob, so the path stays valid
+            cached_path = cls._lookup(url_key)
+            if cached_path:
+                cls.LOGGER.info(f"Source cache hit for {video_url}")
+                cls._link(cached_path, destination_path)
+                return destination_path
+
+            cls.LOGGER.info(f"Source cache miss for {video_url}")
+            download_path, content_hash = cls._download(video_url, remote, downloader)
+            alias = SourceCacheAlias(
+                url_key=url_key,
+                url=video_url,
+                etag=remote.etag,
+                last_modified=remote.last_modified,
+                content_hash=content_hash,
+            )
+            with cls._key_lock(content_hash):
+                cls._link(cls._store(download_path, content_hash, alias), destination_path)
+
+        cls.evict()
+        return destination_path
+
+    @classmethod
+    def _alias_keys(cls, session, content_hash: str) -> List[str]:
+        return sorted(session.execute(
+            select(SourceCacheAlias.url_key).where(SourceCacheAlias.content_hash == content_hash)
+        ).scalars())
+
+    @classmethod
+    def _evict_blob(cls, content_hash: str) -> int:
+        """Removes one blob with its aliases and lock files, returns the bytes freed (0 if skipped)."""
+        with SessionLocal() as session:
+            url_keys = cls._alias_keys(session, content_hash)
+        with ExitStack() as locks:
+            for key in url_keys + [content_hash]:
+                locks.enter_context(cls._key_lock(key))
+            with SessionLocal() as session:
+                blob = session.get(SourceCacheBlob, content_hash)
+                if blob is None:
+                    return 0
+                if cls._alias_keys(session, content_hash) != url_keys:
+                    # Aliased again while we waited for the locks, it is no longer idle
+                    return 0
+                path = cls.blob_path(content_hash)
+                # Job folders keep their own hard link, unlinking here only drops the cache entry
+                if os.path.exists(path):
+                    os.remove(path)
+                session.execute(delete(SourceCacheAlias).where(SourceCacheAlias.content_hash == content_hash))
+                session.delete(blob)
+                session.commit()
+                size = blob.size
+            # Still held, waiters notice the file is gone and open a new one
+            for key in url_keys + [content_hash]:
+                if os.path.exists(cls.lock_path(key)):
+                    os.remove(cls.lock_path(key))
+        cls.LOGGER.info(f"Evicted cached source {content_hash} ({size} bytes)")
+        return size
+
+    @classmethod
+    def evict(cls, max_bytes: int = VideoSettings.SOURCE_CACHE_MAX_BYTES):
+        """Removes least recently used blobs until the cache fits in max_bytes."""
+        with SessionLocal() as session:
+            total = session.execute(select(func.coalesce(func.sum(SourceCacheBlob.size), 0))).scalar_one()
+            if total <= max_bytes:
+                return
+            candidates = session.execute(
+                select(SourceCacheBlob.content_hash).order_by(SourceCacheBlob.last_accessed_at)
+            ).scalars().all()
+        for content_hash in candidates:
+            if total <= max_bytes:
+                break
+            total -= cls._evict_blob(content_hash)
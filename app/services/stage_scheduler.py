@@ -0,0 +1,96 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.config.logger import LogManager
+from .job_service import JobService
+
+
+class StageFailed(Exception):
+    """Raised by StageScheduler.run with the name of the stage that failed."""
+
+    def __init__(self, stage: str, error: Exception):
+        self.stage = stage
+        self.error = error
+        super().__init__(f"Stage '{stage}' failed: {error}")
+
+
+class Stage:
+    __slots__ = ("name", "func", "deps", "job_stage")
+
+    def __init__(self, name: str, func: Callable, deps: Iterable[str], job_stage: Optional[str]):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.job_stage = job_stage
+
+
+class StageScheduler:
+    """
+    Runs the stages of one job as a dependency graph.
+
+    A stage starts as soon as every stage it depends on has finished, so
+    independent stages (transcription and frame analysis, Gemini and the crop
+    encodes) overlap and the job takes as long as its critical path. Each stage
+    is called as func(results, on_progress) where results holds the return
+    values of its dependencies by name, and on_progress reports to the job
+    stage it is tracked under (JobStage), if any.
+    """
+    LOGGER = LogManager.get_logger("stage_scheduler")
+
+    def __init__(self, job_id: Optional[str] = None, max_workers: int = 4):
+        self.job_id = job_id
+        self.max_workers = max_workers
+        self.timings: Dict[str, float] = {}
+        self._stages: Dict[str, Stage] = {}
+
+    def add(self, name: str, func: Callable[[Dict[str, Any], Callable[[float], None]], Any], deps: Iterable[str] = (), job_stage: Optional[str] = None) -> "StageScheduler":
+        # Dependencies must be added first, which also rules out cycles
+        missing = [dep for dep in deps if dep not in self._stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages {missing}")
+        self._stages[name] = Stage(name, func, deps, job_stage)
+        return self
+
+    def _run_stage(self, stage: Stage, results: Dict[str, Any]) -> Any:
+        started = time.monotonic()
+        on_progress = lambda percent: None
+        if stage.job_stage:
+            on_progress = JobService.start_stage(self.job_id, stage.job_stage, close_previous=False)
+        self.LOGGER.info(f"Stage {stage.name} started.")
+        try:
+            return stage.func(results, on_progress)
+        finally:
+            if stage.job_stage:
+                JobService.finish_stage(self.job_id, stage.job_stage)
+            self.timings[stage.name] = round(time.monotonic() - started, 3)
+            self.LOGGER.info(f"Stage {stage.name} finished in {self.timings[stage.name]}s.")
+
+    def run(self) -> Dict[str, Any]:
+        """Runs every stage and returns their results by name, raising StageFailed on the first failure."""
+        started = time.monotonic()
+        results: Dict[str, Any] = {}
+        pending = dict(self._stages)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as executor:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if all(dep in results for dep in stage.deps):
+                        del pending[name]
+                        future = executor.submit(self._run_stage, stage, {dep: results[dep] for dep in stage.deps})
+                        running[future] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        # Stages already running finish on their own, nothing new is started
+                        for other in running:
+                            other.cancel()
+                        raise StageFailed(name, e) from e
+
+        total = time.monotonic() - started
+        self.LOGGER.info(f"Pipeline finished in {total:.1f}s (sum of stages {sum(self.timings.values()):.1f}s): {self.timings}")
+        return results
@@ -0,0 +1,120 @@
+import os, threading
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+from .frame_analysis_service import FrameAnalysisService
+from app.schemas.media_schema import MediaInfo
+
+
+class SubjectTrack:
+    """Smoothed subject centre path, in source pixel coordinates, sampled at `times` (seconds)."""
+    __slots__ = ("times", "centers_x", "centers_y", "width", "height")
+
+    def __init__(self, times: np.ndarray, centers_x: np.ndarray, centers_y: np.ndarray, width: int, height: int):
+        self.times = times
+        self.centers_x = centers_x
+        self.centers_y = centers_y
+        self.width = width
+        self.height = height
+
+
+class SubjectTrackingService:
+    LOGGER = LogManager.get_logger("subject_tracking_service")
+
+    # CascadeClassifier isn't documented as thread-safe, keep one per thread instead of one per call
+    _local = threading.local()
+
+    @classmethod
+    def get_face_detector(cls):
+        detector = getattr(cls._local, "face_cascade", None)
+        if detector is None:
+            detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+            cls._local.face_cascade = detector
+        return detector
+
+    @classmethod
+    def detect_face_center(cls, frame: np.ndarray) -> Optional[Tuple[float, float]]:
+        """Returns the centre of the largest face, detected on a frame downscaled to DETECTION_WIDTH."""
+        h, w = frame.shape[:2]
+        scale = min(1.0, VideoSettings.DETECTION_WIDTH / w)
+        if scale < 1.0:
+            frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+        faces = cls.get_face_detector().detectMultiScale(gray, 1.3, 5)
+        if len(faces) == 0:
+            return None
+        x, y, fw, fh = max(faces, key=lambda f: f[2] * f[3])
+        return (x + fw / 2) / scale, (y + fh / 2) / scale
+
+    @classmethod
+    def smooth_path(cls, values: np.ndarray, window: int) -> Optional[np.ndarray]:
+        """Fills missed detections by interpolation and applies a centred moving average."""
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return None
+
+        index = np.arange(len(values))
+        filled = np.interp(index, index[valid], values[valid])
+        if window > 1 and len(filled) > 1:
+            window = window if window % 2 else window + 1
+            padded = np.pad(filled, window // 2, mode='edge')
+            filled = np.convolve(padded, np.ones(window) / window, mode='valid')
+        return filled
+
+    @classmethod
+    def track_subject(cls, video_path: str, media_info: Optional[MediaInfo] = None) -> Optional[SubjectTrack]:
+        """
+        Returns the smoothed face centre path from the shared analysis pass, or
+        None when no face is ever found.
+        """
+        analysis = FrameAnalysisService.analyze(video_path, media_info=media_info)
+        faces = analysis["face_centers"]
+        if not faces["times"]:
+            return None
+
+        to_array = lambda values: np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        window = VideoSettings.TRACKING_SMOOTHING_WINDOW
+        smoothed_x = cls.smooth_path(to_array(faces["x"]), window)
+        smoothed_y = cls.smooth_path(to_array(faces["y"]), window)
+        if smoothed_x is None or smoothed_y is None:
+            cls.LOGGER.info(f"No subject found in {video_path}, using a centred crop.")
+            return None
+
+        source = analysis["source"]
+        return SubjectTrack(np.array(faces["times"]), smoothed_x, smoothed_y, source["width"], source["height"])
+
+    @classmethod
+    def write_crop_commands(
+        cls,
+        track: SubjectTrack,
+        crop_w: int,
+        crop_h: int,
+        filter_instance: str,
+        commands_path: str,
+    ) -> Tuple[int, int]:
+        """
+        Writes a sendcmd script that moves the named crop filter along the track and
+        returns the initial (x, y). The path is resampled to COMMAND_INTERVAL so the
+        window glides instead of jumping once per detection sample.
+        """
+        step = VideoSettings.TRACKING_COMMAND_INTERVAL
+        grid = np.arange(0, track.times[-1] + step, step)
+        xs = np.interp(grid, track.times, track.centers_x) - crop_w / 2
+        ys = np.interp(grid, track.times, track.centers_y) - crop_h / 2
+        xs = np.clip(np.round(xs), 0, track.width - crop_w).astype(int)
+        ys = np.clip(np.round(ys), 0, track.height - crop_h).astype(int)
+
+        # Only emit a command when the window actually moves
+        changed = np.ones(len(grid), dtype=bool)
+        changed[1:] = (np.diff(xs) != 0) | (np.diff(ys) != 0)
+
+        os.makedirs(os.path.dirname(commands_path), exist_ok=True)
+        with open(commands_path, 'w', encoding='utf-8') as f:
+            for t, x, y in zip(grid[changed], xs[changed], ys[changed]):
+                f.write(f"{t:.3f} {filter_instance} x {x}, {filter_instance} y {y};\n")
+        return int(xs[0]), int(ys[0])
@@ -1,147 +1,80 @@
-import os, ffmpeg, re
+import os, json, hashlib
+import numpy as np
 import whisper_timestamped as whisper
 
 
 from app.schemas.video_schema import VideoEditRequest
 from app.core.config import VideoSettings
-from datetime import timedelta
-from typing import Dict
+from app.models.transcript import Transcript
+from typing import Dict, Optional
+from .whisper_model_pool import WhisperModelPool
+from .audio_service import AudioService
+from .ass_renderer import AssRenderer
+from app.config.logger import LogManager
+from app.utils.disk_cache import DiskCache
 
 class SubtitleService:
-    
-    @classmethod
-    def generate_srt_file(cls, request: VideoEditRequest, folder: str, video_path: str):
-        def format_timestamp(seconds):
-            td = timedelta(seconds=seconds)
-            total_seconds = int(td.total_seconds())
-            millis = int((td.total_seconds() - total_seconds) * 1000)
-            return f"{str(td)}".split('.')[0].zfill(8).replace('.', ',') + f",{millis:03d}"
-        
-        def split_segment(segment, max_words=6):
-            words = segment["text"].strip().split()
-            total_words = len(words)
-            duration = segment["end"] - segment["start"]
-            word_duration = duration / total_words
-
-            sub_segments = []
-            for i in range(0, total_words, max_words):
-                chunk_words = words[i:i+max_words]
-                chunk_start = segment["start"] + i * word_duration
-                chunk_end = chunk_start + len(chunk_words) * word_duration
-                sub_segments.append({
-                    "start": chunk_start,
-                    "end": chunk_end,
-                    "text": " ".join(chunk_words)
-                })
-            return sub_segments
-
-
-
-        os.makedirs(os.path.join(folder, 'temp'), exist_ok=True)
-        output_audio_path = os.path.join(folder, VideoSettings.TEMP_AUDIO_FILE_PATH)
-        output_srt_path = os.path.join(folder, VideoSettings.TEMP_SRT_FILE_PATH)
-        max_words_per_subtitle = request.max_words_per_subtitle
-
-        (
-            ffmpeg
-            .input(video_path)
-            .output(output_audio_path, format='wav', acodec='pcm_s16le', ac=1, ar='16000')
-            .overwrite_output()
-            .run()
-        )
-
-        audio = whisper.load_audio(output_audio_path)
-        model = whisper.load_model(VideoSettings.WHISPER_MODEL, device="cpu")
-        result = whisper.transcribe(model, audio, language=request.language_code)
-
-        srt_lines = []
-        counter = 1
-        for i, segment in enumerate(result['segments']):
-            # start = format_timestamp(segment['start'])
-            # end = format_timestamp(segment['end'])
-            # text = segment['text'].strip()
-            # srt_lines.append(f"{i+1}\n{start} --> {end}\n{text}\n")
-
-            smaller_segments = split_segment(segment, max_words=max_words_per_subtitle)
-            for sub in smaller_segments:
-                start = format_timestamp(sub["start"])
-                end = format_timestamp(sub["end"])
-                text = sub["text"]
-                srt_lines.append(f"{counter}\n{start} --> {end}\n{text}\n")
-                counter += 1
-
-
-        # Save to file
-        with open(output_srt_path, "w", encoding="utf-8") as srt_file:
-            srt_file.writelines(srt_lines)
-
-        return output_srt_path if os.path.exists(output_srt_path) else None
+    LOGGER = LogManager.get_logger("subtitle_service")
+    TRANSCRIPT_CACHE = DiskCache(
+        name="transcript",
+        directory=VideoSettings.TRANSCRIPT_CACHE_DIR,
+        max_bytes=VideoSettings.TRANSCRIPT_CACHE_MAX_BYTES,
+    )
 
     @classmethod
-    def srt_to_ass_timestamp(cls, srt_time):
-        hms, ms = srt_time.split(',')
-        hours, minutes, seconds = map(int, hms.split(':'))
-        centiseconds = int(int(ms) / 10)
-        return f"{hours}:{minutes:02}:{seconds:02}.{centiseconds:02}"
-
+    def transcribe(cls, request: VideoEditRequest, folder: str, video_path: str, audio: Optional[np.ndarray] = None) -> Transcript:
+        """
+        Returns the segments and word timings of the video audio, transcribing only on a cache miss.
+        audio is the mono 16 kHz float32 buffer when it was already decoded during the download.
+        """
+        if audio is None:
+            audio = AudioService.extract_audio(video_path)
+
+        cache_key = cls.make_transcript_cache_key(audio, request.language_code)
+        cached = cls.TRANSCRIPT_CACHE.get(cache_key)
+        if cached is not None:
+            cls.LOGGER.info(f"Transcript cache hit {cache_key[:12]} ({cls.TRANSCRIPT_CACHE.stats()})")
+            return Transcript.from_dict(cached)
+
+        with WhisperModelPool.acquire(language=request.language_code) as model:
+            result = whisper.transcribe(model, audio, language=request.language_code, **VideoSettings.WHISPER_DECODE_OPTIONS)
+
+        # Only segments and word timings are kept, tokens and decoder statistics are dropped
+        transcript = Transcript.from_dict(result)
+        cls.TRANSCRIPT_CACHE.set(cache_key, transcript.to_dict())
+        cls.LOGGER.info(f"Transcript cache miss {cache_key[:12]} ({cls.TRANSCRIPT_CACHE.stats()})")
+        return transcript
 
     @classmethod
-    def parse_srt_file(cls, srt_file_path: str):
-        with open(srt_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        pattern = re.compile(r'(\d+)\s+(\d{2}:\d{2}:\d{2},\d{3}) --> (\d{2}:\d{2}:\d{2},\d{3})\s+(.*?)\s*(?=\n\d+\s+\d{2}:\d{2}:\d{2},\d{3}|$)', re.DOTALL)
-        matches = pattern.findall(content)
-
-        subtitles = []
-        for _, start, end, text in matches:
-            # Replace line breaks within subtitle text with space
-            cleaned_text = ' '.join(text.strip().splitlines())
-            subtitles.append({'start': start.strip(), 'end': end.strip(), 'text': cleaned_text})
-        return subtitles
-
-    @staticmethod
-    def srt_to_ass_timestamp(ts: str) -> str:
-        h, m, s_ms = ts.split(':')
-        s, ms = s_ms.split(',')
-        return f"{int(h):01}:{int(m):02}:{int(s):02}.{int(ms)//10:02}"
-
-    @staticmethod
-    def rgb_to_ass_bgr(color: str) -> str:
-        """Convert #RRGGBB to BGR hex for ASS color format"""
-        color = color.lstrip('#')
-        r, g, b = color[0:2], color[2:4], color[4:6]
-        return f"{b}{g}{r}"
+    def make_transcript_cache_key(cls, audio, language_code: str) -> str:
+        """Hash of the 16 kHz PCM samples plus everything that changes Whisper's output."""
+        sha256 = hashlib.sha256(audio.tobytes())
+        sha256.update(json.dumps({
+            "model": VideoSettings.WHISPER_MODEL,
+            "language": language_code,
+            "decode_options": VideoSettings.WHISPER_DECODE_OPTIONS,
+        }, sort_keys=True).encode("utf-8"))
+        return sha256.hexdigest()
 
     @classmethod
-    def generate_ass_file(cls, request: VideoEditRequest, srt_file_path: str, folder: str, aspect_ratio: str, highlighted_words: dict):
-        
-        subtitles = cls.parse_srt_file(srt_file_path)
-        font_sizes = request.font_sizes
-        font_size = font_sizes.get(aspect_ratio) or VideoSettings.DEFAULT_FONT_SIZES.get(aspect_ratio) or 24
-        selected_font = request.selected_font
-        ass_file_path = os.path.join(folder, VideoSettings.TEMP_ASS_FILE_PATH)
+    def ass_file_path(cls, folder: str, aspect_ratio: str) -> str:
+        # Each ratio gets its own file so they can all be rendered at the same time
+        ass_base, ass_ext = os.path.splitext(VideoSettings.TEMP_ASS_FILE_PATH)
+        return os.path.join(folder, f"{ass_base}_{aspect_ratio.replace(':', '_')}{ass_ext}")
 
-        with open(ass_file_path, 'w', encoding='utf-8') as f:
-            ass_header = VideoSettings.generate_ass_header(selected_font, font_size)
-            f.write(ass_header)
-
-            for sub in subtitles:
-                start = cls.srt_to_ass_timestamp(sub['start'])
-                end = cls.srt_to_ass_timestamp(sub['end'])
-                text = sub['text']
-                words = text.split()
-                final_text = ""
-
-                for word in words:
-                    clean_word = re.sub(r'\W+', '', word).lower()
-                    if clean_word in highlighted_words:
-                        color_hex = cls.rgb_to_ass_bgr(highlighted_words[clean_word])
-                        final_text += f"{{\\1c&H{color_hex}&}}{word}{{\\r}} "
-                    else:
-                        final_text += word + " "
-
-                final_text = final_text.strip()
-                f.write(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{final_text}\n")
+    @classmethod
+    def ass_font_size(cls, request: VideoEditRequest, aspect_ratio: str) -> int:
+        return request.font_sizes.get(aspect_ratio) or VideoSettings.DEFAULT_FONT_SIZES.get(aspect_ratio) or 24
 
-        return ass_file_path
\ No newline at end of file
+    @classmethod
+    def generate_ass_files(cls, request: VideoEditRequest, transcript: Transcript, folder: str, highlighted_words: dict) -> Dict[str, str]:
+        """Writes the ASS file of every requested aspect ratio from the same dialogue lines."""
+        renderer = AssRenderer.from_transcript(transcript, request.max_words_per_subtitle, highlighted_words)
+        return {
+            aspect_ratio: renderer.write(
+                cls.ass_file_path(folder, aspect_ratio),
+                request.selected_font,
+                cls.ass_font_size(request, aspect_ratio)
+            )
+            for aspect_ratio in request.aspect_ratios
+        }
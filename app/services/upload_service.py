@@ -0,0 +1,115 @@
+import os, uuid, hashlib
+from typing import Dict, Optional
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+
+
+class MultipartUpload:
+    """
+    Incremental multipart/form-data sink fed with the raw request body.
+
+    The part named FILE_FIELD is written to disk chunk by chunk and hashed as it
+    arrives; every other part is a small form field kept in memory. Nothing
+    buffers more than one body chunk of the file.
+    """
+    FILE_FIELD = "file"
+    MAX_FIELD_BYTES = 64 * 1024
+
+    def __init__(self, content_type: str, file_path: str):
+        mime_type, options = parse_options_header(content_type)
+        boundary = options.get(b"boundary")
+        if mime_type != b"multipart/form-data" or not boundary:
+            raise ValueError("Expected a multipart/form-data body.")
+
+        self.file_path = file_path
+        self.fields: Dict[str, str] = {}
+        self.file_size = 0
+        self.file_received = False
+        self._sha256 = hashlib.sha256()
+        self._file = None
+        self._field_name: Optional[str] = None
+        self._field_value = bytearray()
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._headers: Dict[bytes, bytes] = {}
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": lambda data, start, end: self._header_field.extend(data[start:end]),
+            "on_header_value": lambda data, start, end: self._header_value.extend(data[start:end]),
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    def write(self, chunk: bytes):
+        self._parser.write(chunk)
+
+    def finish(self):
+        self._parser.finalize()
+        if not self.file_received:
+            raise ValueError(f"Missing '{self.FILE_FIELD}' part.")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._field_name = None
+        self._field_value = bytearray()
+
+    def _on_header_end(self):
+        self._headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._field_name = options.get(b"name", b"").decode("utf-8", errors="ignore")
+        if self._field_name == self.FILE_FIELD:
+            if self.file_received:
+                raise ValueError("Only one file can be uploaded per request.")
+            self._file = open(self.file_path, "wb")
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        chunk = data[start:end]
+        if self._file is not None:
+            self.file_size += len(chunk)
+            if self.file_size > VideoSettings.MAX_SOURCE_BYTES:
+                raise ValueError(f"Video is larger than {VideoSettings.MAX_SOURCE_BYTES} bytes.")
+            self._sha256.update(chunk)
+            self._file.write(chunk)
+        else:
+            self._field_value.extend(chunk)
+            if len(self._field_value) > self.MAX_FIELD_BYTES:
+                raise ValueError(f"Form field '{self._field_name}' is too large.")
+
+    def _on_part_end(self):
+        if self._file is not None:
+            self.close()
+            self.file_received = True
+        elif self._field_name:
+            self.fields[self._field_name] = self._field_value.decode("utf-8")
+
+
+class UploadService:
+    LOGGER = LogManager.get_logger("upload_service")
+
+    @classmethod
+    def new_upload_path(cls) -> str:
+        os.makedirs(VideoSettings.UPLOAD_DIR, exist_ok=True)
+        extension = os.path.splitext(VideoSettings.VIDEO_FILE)[1]
+        return os.path.join(VideoSettings.UPLOAD_DIR, f"{uuid.uuid4()}{extension}")
+
+    @classmethod
+    def discard(cls, path: str):
+        if os.path.exists(path):
+            os.remove(path)
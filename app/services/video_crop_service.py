@@ -1,53 +1,71 @@
-import requests, os, ffmpeg, cv2, tempfile
-from typing import List
+import requests, os, ffmpeg, tempfile, shutil, bisect
+from typing import Callable, Dict, List, Optional, Tuple
 from app.schemas.video_schema import VideoEditRequest
 from app.core.config import VideoSettings
-from .gemini_service import GeminiService
+from app.utils.ffmpeg_utils import run_ffmpeg
+from app.config.logger import LogManager
+from .subject_tracking_service import SubjectTrackingService
+from .frame_analysis_service import FrameAnalysisService
+from .media_probe_service import MediaProbeService
+from app.schemas.media_schema import MediaInfo
 
 class VideoCropService:
+    LOGGER = LogManager.get_logger("video_crop_service")
 
     @classmethod
-    def detect_main_object(cls, frame):
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
+    def compute_crop_size(cls, width: int, height: int, aspect_ratio: str) -> Tuple[int, int]:
+        """Largest window of the requested aspect ratio that fits in the frame."""
+        target_w = width
 
+        w, h = map(int, aspect_ratio.split(":"))
+        target_h = int(width * h / w)
 
-        if len(faces) > 0:
-            x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
-            center_x, center_y = x + w // 2, y + h // 2
-            return center_x, center_y
-        else:
-            h, w = frame.shape[:2]
-            return w // 2, h // 2
 
+        if target_h > height:
+            target_h = height
+            target_w = int(height * w / h)
 
-    @classmethod
-    def crop_video(cls, folder: str, video_path: str, aspect_ratio: str) -> List[str]:
-        croped_path = os.path.join(folder, VideoSettings.TEMP_CLIPS_DIR)
-        probe = ffmpeg.probe(video_path)
-        video_info = next(s for s in probe['streams'] if s['codec_type'] == 'video')
-        width, height = int(video_info['width']), int(video_info['height'])
+        return target_w, target_h
 
+    @classmethod
+    def apply_crop(cls, stream, folder: str, video_path: str, aspect_ratio: str, media_info: Optional[MediaInfo] = None):
+        """
+        Adds the crop for aspect_ratio to a filter graph stream. In tracking mode the
+        window follows the subject through a sendcmd script, otherwise it stays on
+        the subject found in the first frame.
+        """
+        if VideoSettings.CROP_MODE == "tracking":
+            track = SubjectTrackingService.track_subject(video_path, media_info=media_info)
+            if track is not None:
+                target_w, target_h = cls.compute_crop_size(track.width, track.height, aspect_ratio)
+                ratio_name = aspect_ratio.replace(':', '_')
+                filter_instance = f"crop@track_{ratio_name}"
+                commands_path = os.path.join(folder, 'temp', f'crop_{ratio_name}.cmd')
+                x1, y1 = SubjectTrackingService.write_crop_commands(track, target_w, target_h, filter_instance, commands_path)
+                return (
+                    stream
+                    .filter('sendcmd', f=commands_path.replace("\\", "/"))
+                    .filter(filter_instance, target_w, target_h, x1, y1)
+                )
 
-        cap = cv2.VideoCapture(video_path)
-        ret, frame = cap.read()
-        cap.release()
+        target_w, target_h, x1, y1 = cls.compute_crop_box(video_path, aspect_ratio, media_info=media_info)
+        return stream.filter('crop', target_w, target_h, x1, y1)
 
+    @classmethod
+    def compute_crop_box(cls, video_path: str, aspect_ratio: str, media_info: Optional[MediaInfo] = None) -> Tuple[int, int, int, int]:
+        """Returns (width, height, x, y) of the crop window centred on the subject of the first frame."""
+        analysis = FrameAnalysisService.analyze(video_path, media_info=media_info)
+        width, height = analysis["source"]["width"], analysis["source"]["height"]
+        faces = analysis["face_centers"]
 
-        if not ret:
+        if not faces["times"]:
             raise Exception('Could not read video')
 
-        center_x, center_y = cls.detect_main_object(frame)
-        target_w = width
-
-        w, h = map(int, aspect_ratio.split(":"))
-        target_h = int(width * h / w)
-
-
-        if target_h > height:
-            target_h = height
-            target_w = int(height * w / h)
+        if faces["x"][0] is not None:
+            center_x, center_y = int(faces["x"][0]), int(faces["y"][0])
+        else:
+            center_x, center_y = width // 2, height // 2
+        target_w, target_h = cls.compute_crop_size(width, height, aspect_ratio)
 
 
         x1 = max(center_x - target_w // 2, 0)
@@ -55,22 +73,132 @@ class VideoCropService:
         x1 = min(x1, width - target_w)
         y1 = min(y1, height - target_h)
 
+        return target_w, target_h, x1, y1
+
+    @classmethod
+    def crop_video(cls, folder: str, video_path: str, aspect_ratio: str, on_progress: Optional[Callable[[float], None]] = None, media_info: Optional[MediaInfo] = None) -> List[str]:
+        media_info = media_info or MediaProbeService.probe(video_path)
+        croped_path = os.path.join(folder, VideoSettings.TEMP_CLIPS_DIR)
 
         # Corrected ffmpeg call
         video = ffmpeg.input(video_path)
-        cropped_video = video.video.filter('crop', target_w, target_h, x1, y1)
+        cropped_video = cls.apply_crop(video.video, folder, video_path, aspect_ratio, media_info=media_info)
         audio = video.audio
 
         os.makedirs(croped_path, exist_ok=True)
         croped_file_path = os.path.join(croped_path, f'video_{aspect_ratio}.mp4'.replace(':', '_'))
-        (
+        run_ffmpeg(
             ffmpeg
             .output(cropped_video, audio, croped_file_path, vcodec='libx264', acodec='aac')
+            .overwrite_output(),
+            duration=media_info.duration if on_progress else None,
+            on_progress=on_progress
+        )
+
+        return croped_file_path
+
+    @classmethod
+    def get_fonts_dir(cls) -> str:
+        return os.path.join(VideoSettings.STATIC_DIR, "fonts").replace("\\", "/")
+
+    @classmethod
+    def render_video(cls, folder: str, video_path: str, ass_file_path: str, aspect_ratio: str, on_progress: Optional[Callable[[float], None]] = None, media_info: Optional[MediaInfo] = None) -> str:
+        """
+        Crops and burns the subtitles in a single filter graph (crop -> ass),
+        so each aspect ratio is decoded and encoded with libx264 only once.
+        """
+        media_info = media_info or MediaProbeService.probe(video_path)
+        ass_path_str = str(ass_file_path).replace("\\", "/")
+
+        os.makedirs(os.path.join(folder, VideoSettings.OUTPUT_DIR), exist_ok=True)
+        output_video_path = os.path.join(folder, VideoSettings.OUTPUT_DIR, f'video_{aspect_ratio}.mp4'.replace(':', '_'))
+
+        video = ffmpeg.input(video_path)
+        rendered_video = (
+            cls.apply_crop(video.video, folder, video_path, aspect_ratio, media_info=media_info)
+            .filter('ass', ass_path_str, fontsdir=cls.get_fonts_dir())
+        )
+        run_ffmpeg(
+            ffmpeg
+            .output(
+                rendered_video,
+                video.audio,
+                output_video_path,
+                vcodec='libx264',
+                acodec='aac',
+                loglevel="error"
+            )
+            .overwrite_output(),
+            duration=media_info.duration if on_progress else None,
+            on_progress=on_progress
+        )
+        return output_video_path
+
+    @classmethod
+    def prepare_shared_audio(cls, folder: str, video_path: str, media_info: MediaInfo):
+        """
+        Returns the audio stream to map into every output and its codec option.
+        AAC sources are stream copied, anything else is encoded to AAC once up front
+        so the outputs don't each run their own audio encoder.
+        """
+        if media_info.audio is None:
+            return None, None
+        if media_info.audio.codec == 'aac':
+            return ffmpeg.input(video_path).audio, 'copy'
+
+        os.makedirs(os.path.join(folder, 'temp'), exist_ok=True)
+        shared_audio_path = os.path.join(folder, VideoSettings.TEMP_SHARED_AUDIO_FILE_PATH)
+        (
+            ffmpeg
+            .input(video_path)
+            .output(shared_audio_path, vn=None, acodec='aac', loglevel="error")
             .overwrite_output()
             .run()
         )
+        return ffmpeg.input(shared_audio_path).audio, 'copy'
 
-        return croped_file_path
+    @classmethod
+    def render_multi_output(cls, folder: str, video_path: str, ass_files: Dict[str, str], on_progress: Optional[Callable[[float], None]] = None, media_info: Optional[MediaInfo] = None) -> Dict[str, str]:
+        """
+        Renders every aspect ratio from a single decode of the source: the video
+        stream is split into one crop -> ass branch per ratio and all outputs are
+        written by the same ffmpeg invocation.
+        """
+        media_info = media_info or MediaProbeService.probe(video_path)
+        os.makedirs(os.path.join(folder, VideoSettings.OUTPUT_DIR), exist_ok=True)
+        aspect_ratios = list(ass_files.keys())
+
+        video = ffmpeg.input(video_path)
+        branches = video.video.filter_multi_output('split', len(aspect_ratios))
+        audio, acodec = cls.prepare_shared_audio(folder, video_path, media_info)
+        fonts_dir = cls.get_fonts_dir()
+
+        outputs = []
+        output_paths: Dict[str, str] = {}
+        for index, aspect_ratio in enumerate(aspect_ratios):
+            ass_path_str = str(ass_files[aspect_ratio]).replace("\\", "/")
+            rendered_video = (
+                cls.apply_crop(branches.stream(index), folder, video_path, aspect_ratio, media_info=media_info)
+                .filter('ass', ass_path_str, fontsdir=fonts_dir)
+            )
+
+            output_video_path = os.path.join(folder, VideoSettings.OUTPUT_DIR, f'video_{aspect_ratio}.mp4'.replace(':', '_'))
+            streams = [rendered_video, audio] if audio is not None else [rendered_video]
+            output_kwargs = {'vcodec': 'libx264'}
+            if acodec:
+                output_kwargs['acodec'] = acodec
+            outputs.append(ffmpeg.output(*streams, output_video_path, **output_kwargs))
+            output_paths[aspect_ratio] = output_video_path
+
+        run_ffmpeg(
+            ffmpeg
+            .merge_outputs(*outputs)
+            .global_args('-loglevel', 'error')
+            .overwrite_output(),
+            duration=media_info.duration if on_progress else None,
+            on_progress=on_progress
+        )
+        return output_paths
 
     @classmethod
     def srt_time_to_seconds(cls, time_str: str) -> float:
@@ -81,18 +209,48 @@ class VideoCropService:
 
 
     @classmethod
-    def trim_video(cls, video_file_path: str, start_time_str: float, end_time_str: float = None):
+    def keyframes(cls, video_file_path: str, media_info: Optional[MediaInfo] = None) -> Tuple[float, ...]:
+        """Sorted video keyframe times relative to the file start, probed here when media_info has none."""
+        media_info = media_info or MediaProbeService.probe(video_file_path)
+        if media_info.keyframes is not None:
+            return media_info.keyframes
+        return MediaProbeService.probe_keyframes(video_file_path, media_info.start_time)
+
+    @classmethod
+    def list_keyframes(cls, video_file_path: str, start: float, end: float, media_info: Optional[MediaInfo] = None) -> List[float]:
+        """Returns the sorted video keyframe times between start and end, relative to the file start."""
+        return [k for k in cls.keyframes(video_file_path, media_info) if start <= k <= end]
+
+    @classmethod
+    def find_keyframe_before(cls, video_file_path: str, time_seconds: float, media_info: Optional[MediaInfo] = None) -> float:
+        """Returns the time of the last video keyframe at or before time_seconds, 0.0 when there is none."""
+        keyframes = cls.keyframes(video_file_path, media_info)
+        index = bisect.bisect_right(keyframes, time_seconds + 0.001) - 1
+        return keyframes[index] if index >= 0 else 0.0
+
+    @classmethod
+    def trim_video(cls, video_file_path: str, start_time_str: float, end_time_str: float = None, media_info: Optional[MediaInfo] = None) -> Tuple[float, Optional[float]]:
+        """
+        Trims the video in place and returns the (start, end) window that was
+        actually kept. In "keyframe" mode the start snaps back to the preceding
+        keyframe, so callers must use the returned value to align subtitles.
+        """
         if not os.path.exists(video_file_path):
             raise FileNotFoundError(f"Video file not found: {video_file_path}")
+        if VideoSettings.TRIM_MODE == "smart":
+            end_time = cls.srt_time_to_seconds(end_time_str) if end_time_str is not None else None
+            return cls.smart_trim(video_file_path, cls.srt_time_to_seconds(start_time_str), end_time, media_info=media_info)
         
-        start_time = cls.srt_time_to_seconds(start_time_str)
+        requested_start = cls.srt_time_to_seconds(start_time_str)
+        start_time = cls.find_keyframe_before(video_file_path, requested_start, media_info=media_info)
         input_kwargs = {'ss': start_time}
         output_kwargs = {'c': 'copy'}
+        end_time = None
 
         if end_time_str is not None:
             end_time = cls.srt_time_to_seconds(end_time_str)
             duration = end_time - start_time
-            if duration <= 0:
+            if end_time <= requested_start:
                 raise ValueError("End time must be greater than start time")
             output_kwargs['t'] = duration
 
@@ -111,9 +269,138 @@ class VideoCropService:
             os.remove(temp_path)
             raise RuntimeError(f"Failed to trim video: {e.stderr.decode()}") from e
 
+        return start_time, end_time
+
+    # ffprobe H.264 profile names -> libx264 -profile:v values
+    X264_PROFILES = {
+        'Constrained Baseline': 'baseline',
+        'Baseline': 'baseline',
+        'Main': 'main',
+        'High': 'high',
+        'High 10': 'high10',
+        'High 4:2:2': 'high422',
+        'High 4:4:4 Predictive': 'high444',
+    }
+
+    @classmethod
+    def _encode_params(cls, media_info: MediaInfo) -> Dict[str, str]:
+        """
+        libx264 options matching the source stream, so the re-encoded head and tail
+        share the copied interior's pixel format, profile and level and the
+        concatenated stream stays decodable by players that honour the header's limits.
+        """
+        params = {'pix_fmt': media_info.pix_fmt or 'yuv420p'}
+        if media_info.video_codec != 'h264':
+            return params
+        profile = cls.X264_PROFILES.get(media_info.profile or '')
+        if profile:
+            params['profile:v'] = profile
+        # ffprobe reports level 4.1 as 41; 9 is level 1b and negative values mean unknown
+        if media_info.level and media_info.level >= 10:
+            params['level'] = f"{media_info.level // 10}.{media_info.level % 10}"
+        return params
+
+    @classmethod
+    def _encode_segment(cls, video_file_path: str, segment_path: str, start: float, end: float, encode_params: Dict[str, str]):
+        (
+            ffmpeg
+            .input(video_file_path, ss=start)
+            .output(
+                segment_path,
+                t=end - start,
+                an=None,
+                vcodec='libx264',
+                preset=VideoSettings.SMART_TRIM_PRESET,
+                crf=VideoSettings.SMART_TRIM_CRF,
+                f='mpegts',
+                **encode_params
+            )
+            .run(overwrite_output=True, quiet=True)
+        )
+
+    @classmethod
+    def _copy_segment(cls, video_file_path: str, segment_path: str, start: float, end: float):
+        # Nudge past the keyframe so float rounding can't make the seek land on the previous GOP
+        (
+            ffmpeg
+            .input(video_file_path, ss=start + 0.001)
+            .output(segment_path, t=end - start, an=None, c='copy', f='mpegts', **{'bsf:v': 'h264_mp4toannexb'})
+            .run(overwrite_output=True, quiet=True)
+        )
+
+    @classmethod
+    def smart_trim(cls, video_file_path: str, start_time: float, end_time: Optional[float] = None, media_info: Optional[MediaInfo] = None) -> Tuple[float, float]:
+        """
+        Frame-accurate trim that only re-encodes the partial GOPs at both ends.
+
+        The interior [first keyframe, last keyframe) is stream copied, the head and
+        tail are re-encoded with libx264 at the source's pixel format, profile and
+        level, and the three parts are concatenated as
+        MPEG-TS (in-band parameter sets) before being remuxed to MP4 with the audio
+        re-encoded over the exact window. Non-H.264 sources are fully re-encoded.
+        Returns the achieved (start, end) in seconds.
+        """
+        media_info = media_info or MediaProbeService.probe(video_file_path)
+        has_audio = media_info.audio is not None
+        end_time = min(end_time, media_info.duration) if end_time is not None else media_info.duration
+        if end_time <= start_time:
+            raise ValueError("End time must be greater than start time")
+
+        encode_params = cls._encode_params(media_info)
+        keyframes = cls.list_keyframes(video_file_path, start_time, end_time, media_info=media_info)
+        if media_info.video_codec != 'h264':
+            keyframes = []
+
+        work_dir = tempfile.mkdtemp(prefix='.trim-', dir=os.path.dirname(os.path.abspath(video_file_path)))
+        try:
+            parts = []
+            if keyframes:
+                first_key, last_key = keyframes[0], keyframes[-1]
+                if first_key > start_time:
+                    parts.append(('encode', start_time, first_key))
+                if last_key > first_key:
+                    parts.append(('copy', first_key, last_key))
+                if end_time > last_key:
+                    parts.append(('encode', last_key, end_time))
+            else:
+                parts.append(('encode', start_time, end_time))
+
+            segment_paths = []
+            for index, (mode, segment_start, segment_end) in enumerate(parts):
+                segment_path = os.path.join(work_dir, f'part_{index}.ts')
+                if mode == 'copy':
+                    cls._copy_segment(video_file_path, segment_path, segment_start, segment_end)
+                else:
+                    cls._encode_segment(video_file_path, segment_path, segment_start, segment_end, encode_params)
+                segment_paths.append(segment_path)
+
+            list_path = os.path.join(work_dir, 'parts.txt')
+            with open(list_path, 'w', encoding='utf-8') as f:
+                f.writelines(f"file '{path}'\n" for path in segment_paths)
+
+            output_path = os.path.join(work_dir, f'trimmed{os.path.splitext(video_file_path)[1]}')
+            streams = [ffmpeg.input(list_path, f='concat', safe=0).video]
+            output_kwargs = {'vcodec': 'copy', 'movflags': '+faststart'}
+            if has_audio:
+                streams.append(ffmpeg.input(video_file_path, ss=start_time, t=end_time - start_time).audio)
+                output_kwargs['acodec'] = 'aac'
+            ffmpeg.output(*streams, output_path, **output_kwargs).run(overwrite_output=True, quiet=True)
+
+            achieved_end = start_time + float(ffmpeg.probe(output_path)['format']['duration'])
+            os.replace(output_path, video_file_path)
+        except ffmpeg.Error as e:
+            raise RuntimeError(f"Failed to trim video: {e.stderr.decode() if e.stderr else e}") from e
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        cls.LOGGER.info(f"Smart trim kept {start_time:.3f}s to {achieved_end:.3f}s ({len(parts)} parts)")
+        return start_time, achieved_end
+
     
     @classmethod
-    def burn_subtitle(cls, folder: str, ass_file_path: str, croped_video_path, aspect_ratio: str):
+    def burn_subtitle(cls, folder: str, ass_file_path: str, croped_video_path, aspect_ratio: str, on_progress: Optional[Callable[[float], None]] = None, media_info: Optional[MediaInfo] = None):
+        # The cropped clip keeps the source duration, so the source MediaInfo is enough for progress
+        media_info = media_info or MediaProbeService.probe(croped_video_path)
         ass_path_fixed = ass_file_path.replace("\\", "/")
         ass_filter = f"ass='{ass_path_fixed}'"
 
@@ -127,7 +414,7 @@ class VideoCropService:
         fonts_dir_str = str(fonts_dir).replace("\\", "/")
 
         vf_filter = f"ass='{ass_path_str}':fontsdir='{fonts_dir_str}'"
-        (
+        run_ffmpeg(
             ffmpeg
             .input(croped_video_path)
             .output(
@@ -137,7 +424,8 @@ class VideoCropService:
                 acodec='copy',
                 loglevel="error"
             )
-            .overwrite_output()
-            .run()
+            .overwrite_output(),
+            duration=media_info.duration if on_progress else None,
+            on_progress=on_progress
         )
         return output_video_path
@@ -1,22 +1,35 @@
 import shutil
-import requests
-import os, uuid, cv2
+import os, uuid
 from app.schemas.video_schema import VideoEditRequest, WebhookVideo, WebhookVideoResponse
 from pathlib import Path
 import ffmpeg
-from app import ErrorResponse
-from typing import Any, List, Dict
+from app.core.exceptions import VideoEditFailed
+from typing import Callable, List, Optional
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from app.config.logger import LogManager
 from datetime import datetime
 from app.core.config import VideoSettings
 from .subtitle_service import SubtitleService
 from .video_crop_service import VideoCropService
-from .gemini_service import GeminiService
-from app.schemas.ai_model import ColoredWord, AdvancedSRTResponse
+from .highlight_service import HighlightService
+from .source_cache_service import SourceCacheService
+from .download_service import DownloadService, RemoteSource
+from .audio_service import StreamingAudioExtractor
+from .media_probe_service import MediaProbeService
+from app.schemas.media_schema import MediaInfo
+from app.schemas.ai_model import AdvancedSRTResponse
+from app.models.video_models import JobStage
+from .job_service import JobService
+from .webhook_service import WebhookService
+from .stage_scheduler import StageFailed, StageScheduler
+from .frame_analysis_service import FrameAnalysisService
 
 class VideoService:
     MEDIA_ROOT = Path("media")
     LOGGER = LogManager.get_logger("video_service")
+    # Step number reported in the webhook when a pipeline stage fails
+    STAGE_ERROR_STEPS = {"srt": 3, "gemini": 4, "trim": 4, "ass": 5, "analysis": 6, "crop": 6, "burn": 7, "render": 7}
 
     @classmethod
     def create_media_folder(cls):
@@ -29,42 +42,74 @@ class VideoService:
 
 
     @classmethod
-    def validate_and_download(cls, folder: str, video_url: str) -> str:
+    def preflight(cls, video_url: str, remote: RemoteSource) -> Optional[MediaInfo]:
+        """
+        Probes the remote source before downloading it. ffprobe reads the URL with
+        range requests, so only the container header is transferred. Without Range
+        support it would read up to the whole file to reach a trailing moov atom, so
+        such sources only get the HEAD size check. Returns None when the URL isn't
+        probed or the probe fails; the limits are then checked after download.
+        """
+        if remote.size and remote.size > VideoSettings.MAX_SOURCE_BYTES:
+            raise ValueError(f"Video is larger than {VideoSettings.MAX_SOURCE_BYTES} bytes.")
+        if not remote.accepts_ranges:
+            cls.LOGGER.info(f"No Range support for {video_url}, skipping the pre-flight probe, checking after download.")
+            return None
+        try:
+            media_info = MediaProbeService.probe(video_url, timeout=VideoSettings.PREFLIGHT_TIMEOUT)
+        except (ffmpeg.Error, ValueError) as e:
+            stderr = e.stderr.decode(errors='ignore')[:300] if isinstance(e, ffmpeg.Error) and e.stderr else e
+            cls.LOGGER.info(f"Pre-flight probe unavailable for {video_url}, checking after download: {stderr}")
+            return None
+        MediaProbeService.check_limits(media_info)
+        cls.LOGGER.info(f"Pre-flight passed: {media_info.duration:.1f}s {media_info.width}x{media_info.height} {media_info.video_codec}")
+        return media_info
+
+    @classmethod
+    def validate_and_download(
+        cls,
+        folder: str,
+        video_url: str,
+        on_chunk: Optional[Callable[[bytes], None]] = None,
+        on_progress: Optional[Callable[[float], None]] = None,
+    ) -> MediaInfo:
         # 1. Validate URL
         if not video_url.lower().startswith(('http://', 'https://')):
             cls.LOGGER.info(f"Invalid video URL provided.")
             raise ValueError("Invalid video URL provided.")
+
+        # 2. Reject out-of-range sources from their header, before paying for the download.
+        # The HEAD response is reused by the source cache and the downloader.
+        remote = DownloadService.head(video_url)
+        try:
+            cls.preflight(video_url, remote)
+        except ValueError as e:
+            shutil.rmtree(folder)
+            cls.LOGGER.info(f"Pre-flight rejected {video_url}: {e}")
+            raise e
         
         # 3. Download the video
         # video_path = f"{folder}\input_video.mp4"
         video_path = os.path.join(folder, VideoSettings.VIDEO_FILE)
         cls.LOGGER.info(f"Video path is : {video_path}")
         try:
-            response = requests.get(video_url, stream=True, timeout=15)
-            response.raise_for_status()
-            with open(video_path, 'wb') as f:
-                shutil.copyfileobj(response.raw, f)
+            SourceCacheService.fetch(
+                video_url,
+                video_path,
+                downloader=partial(DownloadService.download, on_chunk=on_chunk, on_progress=on_progress),
+                remote=remote,
+            )
         except Exception as e:
             shutil.rmtree(folder)
             cls.LOGGER.info(f"Failed to download video {e}.")
             raise ValueError("Failed to download video.")
 
-        # 4. Use ffmpeg-python to get duration
+        # 4. Probe the source once, every later step reuses this MediaInfo
         try:
             cls.LOGGER.info("Getting video info...")
-            cap = cv2.VideoCapture(video_path)
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
-            duration = frame_count / fps
-            duration_minutes = duration / 60
-            cap.release()
-
-            #TODO
-            if duration_minutes < 0.5 or duration_minutes > 7:
-                shutil.rmtree(folder)
-                cls.LOGGER.info("Video duration must be between 1 and 7 minutes.")
-                raise ValueError("Video duration must be between 1 and 7 minutes.")
+            media_info = MediaProbeService.probe(video_path)
         except ValueError as e:
+            shutil.rmtree(folder)
             cls.LOGGER.info(f"Error reading video metadata: {e}")
             raise e
         except Exception as e:
@@ -72,22 +117,186 @@ class VideoService:
             cls.LOGGER.info(f"Error reading video metadata: {e}")
             raise ValueError("Error reading video metadata.")
 
-        return str(video_path)
+        # Still needed when the pre-flight probe was unavailable
+        try:
+            MediaProbeService.check_limits(media_info)
+        except ValueError as e:
+            shutil.rmtree(folder)
+            cls.LOGGER.info(f"Video rejected after download: {e}")
+            raise e
+
+        return media_info
 
     @classmethod
-    def get_srt_file_content(cls, srt_file_path: str) -> str:
+    def use_uploaded_source(cls, folder: str, source_path: str) -> MediaInfo:
+        """
+        Links a direct upload, already checked by the API, into the job folder and probes it.
+        The upload itself stays until the job is finished (JobService), so a retry after a
+        worker crash still finds it.
+        """
+        if not os.path.exists(source_path):
+            raise ValueError("Uploaded video is no longer available.")
+        video_path = os.path.join(folder, VideoSettings.VIDEO_FILE)
         try:
-            with open(srt_file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except FileNotFoundError:
-            cls.LOGGER.info(f"File not found: {srt_file_path}")
-            return ""
-        except Exception as e:
-            cls.LOGGER.info(f"Error reading file {srt_file_path}: {e}")
-            return ""
+            os.link(source_path, video_path)
+        except OSError:
+            # Different filesystem, fall back to a real copy
+            shutil.copy2(source_path, video_path)
+        return MediaProbeService.probe(video_path)
 
     @classmethod
-    def handle_edit(cls, request: VideoEditRequest):
+    def build_pipeline(
+        cls,
+        request: VideoEditRequest,
+        folder: str,
+        media_info: MediaInfo,
+        audio_extractor: Optional[StreamingAudioExtractor],
+        job_id: Optional[str] = None,
+    ) -> StageScheduler:
+        """
+        Describes the steps after the download as a stage graph. Transcription and
+        the frame analysis pass start together, Gemini waits only for the SRT, and
+        the renders wait for their ASS files. In full-edit mode the analysis (and the
+        crop encodes in two_pass mode) overlap Whisper and the Gemini round trip;
+        when trimming, everything that reads the video waits for the trimmed clip.
+        """
+        highlight_colors = request.highlight_colors or VideoSettings.HIGHLIGHT_COLORS
+        trimming = not request.is_full_video_edit
+        source_deps = ["trim"] if trimming else []
+        scheduler = StageScheduler(job_id=job_id)
+
+        def source(results) -> MediaInfo:
+            return results["trim"][0] if trimming else media_info
+
+        def srt(results, on_progress):
+            audio = audio_extractor.finish() if audio_extractor else None
+            transcript = SubtitleService.transcribe(request=request, folder=folder, video_path=media_info.path, audio=audio)
+            cls.LOGGER.info(f"Transcribed {transcript.segment_count} segments, {len(transcript)} words")
+            return transcript
+
+        def gemini(results, on_progress):
+            # The same lines the subtitles will show, straight from the transcript
+            cues = list(results["srt"].cues(request.max_words_per_subtitle))
+            if trimming:
+                response = HighlightService.analyze(cues, highlight_colors, request.highlight_engine, advanced=True)
+                if isinstance(response, AdvancedSRTResponse):
+                    return {cw.word: cw.color for cw in response.colored_words}, response.active_speech_range
+                return {}, None
+            response = HighlightService.analyze(cues, highlight_colors, request.highlight_engine, advanced=False)
+            if isinstance(response, list):
+                return {cw.word: cw.color for cw in response}, None
+            cls.LOGGER.debug("Incoming response is not a list")
+            return {}, None
+
+        def trim(results, on_progress):
+            transcript = results["srt"]
+            speech_range = results["gemini"][1]
+            if speech_range is None:
+                return media_info, transcript
+            cls.LOGGER.info(f"Trimming video: {speech_range.start_time} to {speech_range.end_time}")
+            trim_start, trim_end = VideoCropService.trim_video(
+                video_file_path=media_info.path,
+                start_time_str=speech_range.start_time,
+                end_time_str=speech_range.end_time,
+                media_info=media_info
+            )
+            # The file was rewritten, probe the trimmed clip once for the renders
+            trimmed_info = MediaProbeService.probe(media_info.path)
+            transcript = transcript.clip(start_time=trim_start, end_time=trim_end)
+            cls.LOGGER.info(f"Video trimmed to {trim_start}s - {trim_end}s, {len(transcript)} words kept")
+            return trimmed_info, transcript
+
+        def analysis(results, on_progress):
+            info = source(results)
+            FrameAnalysisService.analyze(info.path, media_info=info)
+
+        def ass(results, on_progress):
+            transcript = results["trim"][1] if trimming else results["srt"]
+            highlighted_words = results["gemini"][0]
+            return SubtitleService.generate_ass_files(
+                request=request,
+                folder=folder,
+                transcript=transcript,
+                highlighted_words=highlighted_words
+            )
+
+        def render(results, on_progress):
+            info = source(results)
+            if VideoSettings.RENDER_MODE == "multi_output":
+                return VideoCropService.render_multi_output(
+                    folder=folder,
+                    video_path=info.path,
+                    ass_files=results["ass"],
+                    on_progress=on_progress,
+                    media_info=info
+                )
+            # Every ratio has its own ASS file, so the single-pass renders can run side by side
+            with ThreadPoolExecutor(max_workers=VideoSettings.RENDER_CONCURRENCY, thread_name_prefix="render") as executor:
+                futures = {
+                    aspect_ratio: executor.submit(
+                        VideoCropService.render_video,
+                        folder=folder,
+                        video_path=info.path,
+                        ass_file_path=results["ass"][aspect_ratio],
+                        aspect_ratio=aspect_ratio,
+                        on_progress=on_progress if len(request.aspect_ratios) == 1 else None,
+                        media_info=info
+                    )
+                    for aspect_ratio in request.aspect_ratios
+                }
+                rendered = {}
+                for aspect_ratio, future in futures.items():
+                    rendered[aspect_ratio] = future.result()
+                    on_progress(100 * len(rendered) / len(futures))
+                return rendered
+
+        def crop(aspect_ratio):
+            def run(results, on_progress):
+                info = source(results)
+                return VideoCropService.crop_video(
+                    video_path=info.path,
+                    folder=folder,
+                    aspect_ratio=aspect_ratio,
+                    on_progress=on_progress,
+                    media_info=info
+                )
+            return run
+
+        def burn(aspect_ratio):
+            def run(results, on_progress):
+                return VideoCropService.burn_subtitle(
+                    folder=folder,
+                    croped_video_path=results[f"crop:{aspect_ratio}"],
+                    ass_file_path=results["ass"][aspect_ratio],
+                    aspect_ratio=aspect_ratio,
+                    on_progress=on_progress,
+                    media_info=source(results)
+                )
+            return run
+
+        scheduler.add("srt", srt, job_stage=JobStage.SRT)
+        scheduler.add("gemini", gemini, deps=["srt"], job_stage=JobStage.GEMINI)
+        if trimming:
+            scheduler.add("trim", trim, deps=["srt", "gemini"], job_stage=JobStage.TRIM)
+        scheduler.add("analysis", analysis, deps=source_deps, job_stage=JobStage.ANALYSIS)
+        scheduler.add("ass", ass, deps=["gemini"] + (source_deps or ["srt"]), job_stage=JobStage.ASS)
+
+        if VideoSettings.RENDER_MODE in ("multi_output", "single_pass"):
+            scheduler.add("render", render, deps=["ass", "analysis"] + source_deps, job_stage=JobStage.BURN)
+            return scheduler
+
+        # two_pass: the crop encodes only need the analysis, so they run while Gemini answers.
+        # Encodes of the same kind are chained to avoid oversubscribing the CPU.
+        previous_crop, previous_burn = [], []
+        for aspect_ratio in request.aspect_ratios:
+            scheduler.add(f"crop:{aspect_ratio}", crop(aspect_ratio), deps=["analysis"] + source_deps + previous_crop, job_stage=JobStage.CROP)
+            scheduler.add(f"burn:{aspect_ratio}", burn(aspect_ratio), deps=[f"crop:{aspect_ratio}", "ass"] + source_deps + previous_burn, job_stage=JobStage.BURN)
+            previous_crop, previous_burn = [f"crop:{aspect_ratio}"], [f"burn:{aspect_ratio}"]
+        return scheduler
+
+    @classmethod
+    def handle_edit(cls, request: VideoEditRequest, job_id: Optional[str] = None, source_path: Optional[str] = None):
+        video_path = None
         try:
             cls.LOGGER.info(f"Incoming request: {request.model_dump()}")
             
@@ -97,134 +306,47 @@ class VideoService:
                 cls.LOGGER.info(f"Media folder created successfully: {media_folder}")
             except Exception as e:
                 cls.LOGGER.error(f"[Step 1] Failed to create media folder: {e}Video path is : {video_path}")
-                return cls.call_webhook(
-                    request=request,
-                    status_code=400,
-                    message=f"Unable to process the video. {1}"
-                )
+                raise cls.fail(request, job_id, step=1, reason=str(e))
 
             cls.LOGGER.info("Step 2: Downloading video...")
+            download_progress = JobService.start_stage(job_id, JobStage.DOWNLOAD)
+            audio_extractor = StreamingAudioExtractor() if VideoSettings.STREAM_AUDIO_DURING_DOWNLOAD and not source_path else None
             try:
-                video_path = cls.validate_and_download(media_folder, request.video_url)
+                if source_path:
+                    media_info = cls.use_uploaded_source(media_folder, source_path)
+                else:
+                    media_info = cls.validate_and_download(
+                        media_folder,
+                        request.video_url,
+                        on_chunk=audio_extractor.feed if audio_extractor else None,
+                        on_progress=download_progress
+                    )
+                video_path = media_info.path
+                JobService.finish_stage(job_id, JobStage.DOWNLOAD)
                 cls.LOGGER.info(f"Video downloaded successfully at path: {video_path}")
             except Exception as e:
+                if audio_extractor:
+                    audio_extractor.abort()
                 cls.LOGGER.error(f"[Step 2] Video download failed: {e} Video path is : {video_path}")
-                return cls.call_webhook(
-                    request=request,
-                    status_code=400,
-                    message=f"Unable to process the video. {2}"
-                )
+                # Rejections (too long, too large, unreadable...) are worth telling the client
+                reason = str(e) if isinstance(e, ValueError) else None
+                raise cls.fail(request, job_id, step=2, reason=str(e), client_reason=reason)
 
-            cls.LOGGER.info("Step 3: Generating initial SRT file...")
+            cls.LOGGER.info("Step 3: Running the pipeline stages...")
+            scheduler = cls.build_pipeline(request, media_folder, media_info, audio_extractor, job_id)
             try:
-                srt_file = SubtitleService.generate_srt_file(request=request, folder=media_folder, video_path=video_path)
-                cls.LOGGER.info(f"Generated initial SRT file: {srt_file}")
-                if srt_file:
-                    srt_content = cls.get_srt_file_content(srt_file_path=srt_file)
-                    cls.LOGGER.debug(f"SRT Content (truncated): {srt_content[:300]}...")
-                else:
-                    raise ValueError("Unable to generate srt file")
-            except Exception as e:
-                cls.LOGGER.error(f"[Step 3] SRT generation failed: {e}, Video path is : {video_path}")
-                return cls.call_webhook(
-                    request=request,
-                    status_code=400,
-                    message=f"Unable to process the video. {3}"
-                )
-
-            cls.LOGGER.info("Step 4: Analyzing video for trimming or full-edit...")
-            highlight_colors = request.highlight_colors or VideoSettings.HIGHLIGHT_COLORS
-            highlighted_words: Dict[str, str] = {}
-            aspect_ratios = request.aspect_ratios
-            if not request.is_full_video_edit:
-                cls.LOGGER.info("Trimming is required.")
-                response = GeminiService().analyze_srt_advanced(srt_content=srt_content, color_list=highlight_colors)
-                if isinstance(response, AdvancedSRTResponse):
-                    range = response.active_speech_range
-                    cls.LOGGER.info(f"Trimming video: {range.start_time} to {range.end_time}")
-                    VideoCropService.trim_video(video_file_path=video_path, start_time_str=range.start_time, end_time_str=range.end_time)
-                    words = response.colored_words
-                    highlighted_words = {cw.word: cw.color for cw in words}
-                    cls.LOGGER.debug(f"Highlighted words: {highlighted_words}")
-
-                    cls.LOGGER.info("Regenerating SRT after trimming...")
-                    try:
-                        srt_file = SubtitleService.generate_srt_file(request=request, folder=media_folder, video_path=video_path)
-                        cls.LOGGER.info(f"Regenerated SRT file: {srt_file}")
-                        if srt_file:
-                            srt_content = cls.get_srt_file_content(srt_file_path=srt_file)
-                        else:
-                            raise ValueError("Unable to generate srt file")
-                    except Exception as e:
-                        cls.LOGGER.error(f"[Step 4] Regenerated SRT generation failed: {e} Video path is : {video_path}")
-                        return cls.call_webhook(
-                            request=request,
-                            status_code=400,
-                            message=f"Unable to process the video. {4}"
-                        )
-            else:
-                cls.LOGGER.info("Full video edit — basic SRT analysis.")
-                response = GeminiService().analyze_srt_basic(srt_content=srt_content, color_list=highlight_colors)
-                if isinstance(response, list):
-                    cls.LOGGER.debug("Incoming response is a list")
-                    highlighted_words = {cw.word: cw.color for cw in response}
-                    cls.LOGGER.debug(f"Highlighted words: {highlighted_words}")
-                else:
-                    cls.LOGGER.debug("Incoming response is not a list")
+                results = scheduler.run()
+            except StageFailed as e:
+                step = cls.STAGE_ERROR_STEPS.get(e.stage.split(":")[0], 9)
+                cls.LOGGER.error(f"[Step {step}] Stage {e.stage} failed: {e.error} Video path is : {video_path}")
+                raise cls.fail(request, job_id, step=step, reason=f"Stage {e.stage} failed: {e.error}")
 
             output_videos = []
-
-            for aspect_ratio in aspect_ratios:
-                cls.LOGGER.info(f"Step 5: Processing aspect ratio {aspect_ratio}...")
-                try:
-                    ass_file = SubtitleService.generate_ass_file(
-                        request=request,
-                        folder=media_folder,
-                        srt_file_path=srt_file,
-                        aspect_ratio=aspect_ratio,
-                        highlighted_words=highlighted_words
-                    )
-                    cls.LOGGER.info(f"Generated ASS file for {aspect_ratio}: {ass_file}")
-                except Exception as e:
-                    cls.LOGGER.error(f"[Step 5] ASS file generation failed for {aspect_ratio}: {e} Video path is : {video_path}")
-                    return cls.call_webhook(
-                        request=request,
-                        status_code=400,
-                        message=f"Unable to process the video. {5}"
-                    )
-
-                try:
-                    cropped_video_path = VideoCropService.crop_video(
-                        video_path=video_path,
-                        folder=media_folder,
-                        aspect_ratio=aspect_ratio
-                    )
-                    cls.LOGGER.info(f"Cropped video for {aspect_ratio}: {cropped_video_path}")
-                except Exception as e:
-                    cls.LOGGER.error(f"[Step 5] Cropping failed for {aspect_ratio}: {e} Video path is : {video_path}")
-                    return cls.call_webhook(
-                        request=request,
-                        status_code=400,
-                        message=f"Unable to process the video. {6}"
-                    )
-
-                try:
-                    video_output = VideoCropService.burn_subtitle(
-                        folder=media_folder,
-                        croped_video_path=cropped_video_path,
-                        ass_file_path=ass_file,
-                        aspect_ratio=aspect_ratio
-                    )
-                    cls.LOGGER.info(f"Final output for {aspect_ratio}: {video_output}")
-                    video_url = f"{VideoSettings.BASE_URL}/{video_output}"
-                    output_videos.append(WebhookVideo(video_url=video_url, aspect_ratio=aspect_ratio))
-                except Exception as e:
-                    cls.LOGGER.error(f"[Step 5] Burning subtitle failed for {aspect_ratio}: {e} Video path is : {video_path}")
-                    return cls.call_webhook(
-                        request=request,
-                        status_code=400,
-                        message=f"Unable to process the video. {7}"
-                    )
+            for aspect_ratio in request.aspect_ratios:
+                video_output = results["render"][aspect_ratio] if "render" in results else results[f"burn:{aspect_ratio}"]
+                cls.LOGGER.info(f"Final output for {aspect_ratio}: {video_output}")
+                video_url = f"{VideoSettings.BASE_URL}/{video_output}"
+                output_videos.append(WebhookVideo(video_url=video_url, aspect_ratio=aspect_ratio))
 
             cls.LOGGER.info("Step 6: All output videos generated successfully.")
             for v in output_videos:
@@ -232,6 +354,7 @@ class VideoService:
 
             cls.call_webhook(
                 request=request,
+                job_id=job_id,
                 status_code=200,
                 message="Video processing complete",
                 data=output_videos
@@ -251,29 +374,38 @@ class VideoService:
             # else:
             #     cls.LOGGER.info(f"No video file found to remove: {video_path}")
 
+        except VideoEditFailed:
+            raise
         except ValueError as e:
             cls.LOGGER.error(f"[ValueError] {e} Video path is : {video_path}")
-            return cls.call_webhook(
-                request=request,
-                status_code=400,
-                message=f"Unable to process the video. {8}"
-            )
+            raise cls.fail(request, job_id, step=8, reason=str(e))
         except Exception as e:
             cls.LOGGER.error(f"[Unhandled Exception] {e} Video path is : {video_path}")
-            return cls.call_webhook(
-                request=request,
-                status_code=400,
-                message=f"Unable to process the video. {9}"
-            )
+            raise cls.fail(request, job_id, step=9, reason=str(e))
 
     
+    @classmethod
+    def fail(cls, request: VideoEditRequest, job_id: Optional[str], step: int, reason: str, client_reason: Optional[str] = None) -> VideoEditFailed:
+        """
+        Queues the failure webhook and returns the exception that marks the job as failed.
+        The webhook carries client_reason when given, the step number otherwise.
+        """
+        cls.call_webhook(
+            request=request,
+            job_id=job_id,
+            status_code=400,
+            message=f"Unable to process the video. {client_reason or step}"
+        )
+        return VideoEditFailed(f"[Step {step}] {reason}")
+
     @classmethod
     def call_webhook(
         cls,
         request: VideoEditRequest,
         status_code: int,
         message: str,
-        data: List[WebhookVideo] = []
+        data: List[WebhookVideo] = [],
+        job_id: Optional[str] = None
     ):
         cls.LOGGER.info("Preparing to send webhook callback.")
         webhook_url = request.webhook_url
@@ -291,12 +423,5 @@ class VideoService:
             metadata=metadata
         ).model_dump()
 
-        try:
-            cls.LOGGER.info(f"Sending webhook to {webhook_url} with payload: {webhook_body}")
-            response = requests.post(webhook_url, json=webhook_body, timeout=10)
-            cls.LOGGER.info(
-                f"Webhook sent. Status code: {response.status_code}, Response: {response.text}"
-            )
-        except requests.RequestException as e:
-            cls.LOGGER.error(f"Failed to send webhook to {webhook_url}: {str(e)}")
-        
+        # Sent by the webhook dispatcher, with retries, so a slow receiver never holds up the worker
+        WebhookService.enqueue(webhook_url, webhook_body, job_id=job_id)
@@ -0,0 +1,129 @@
+import json, random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, update
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+from app.core.database import SessionLocal
+from app.models.video_models import WebhookDelivery, WebhookStatus
+from app.schemas.webhook_schema import WebhookDeliveryResponse
+
+
+class WebhookService:
+    """Durable outbox of webhook callbacks. Jobs only write here, the dispatcher does the sending."""
+    LOGGER = LogManager.get_logger("webhook_service")
+
+    @classmethod
+    def enqueue(cls, url: str, body: Dict[str, Any], job_id: Optional[str] = None) -> str:
+        delivery = WebhookDelivery(url=url, payload=json.dumps(body, default=str), job_id=job_id)
+        with SessionLocal() as session:
+            session.add(delivery)
+            session.commit()
+        cls.LOGGER.info(f"Webhook {delivery.id} to {url} queued.")
+        return delivery.id
+
+    @classmethod
+    def claim_due(cls, limit: int) -> List[WebhookDelivery]:
+        """
+        Leases up to `limit` pending deliveries that are due. The lease moves
+        next_attempt_at past the send timeout, so a dispatcher that dies mid-send
+        only delays the delivery, and two dispatchers never send the same row at once.
+        """
+        now = datetime.utcnow()
+        lease_until = now + timedelta(seconds=VideoSettings.WEBHOOK_TIMEOUT * 3)
+        claimed = []
+        with SessionLocal() as session:
+            due = session.execute(
+                select(WebhookDelivery)
+                .where(WebhookDelivery.status == WebhookStatus.PENDING, WebhookDelivery.next_attempt_at <= now)
+                .order_by(WebhookDelivery.next_attempt_at)
+                .limit(limit)
+            ).scalars().all()
+            for delivery in due:
+                won = session.execute(
+                    update(WebhookDelivery)
+                    .where(WebhookDelivery.id == delivery.id, WebhookDelivery.next_attempt_at == delivery.next_attempt_at)
+                    .values(next_attempt_at=lease_until, attempts=WebhookDelivery.attempts + 1)
+                ).rowcount
+                if won == 1:
+                    claimed.append(delivery)
+            session.commit()
+            for delivery in claimed:
+                session.refresh(delivery)
+        return claimed
+
+    @classmethod
+    def _settle(cls, delivery: WebhookDelivery, values: Dict[str, Any]) -> bool:
+        """
+        Writes the outcome of a send only while the caller still holds the lease.
+        The leased next_attempt_at is the lease token: a send that outlived its lease
+        was re-claimed with a new one, and its late result must not overwrite the row.
+        """
+        with SessionLocal() as session:
+            updated = session.execute(
+                update(WebhookDelivery)
+                .where(
+                    WebhookDelivery.id == delivery.id,
+                    WebhookDelivery.status == WebhookStatus.PENDING,
+                    WebhookDelivery.next_attempt_at == delivery.next_attempt_at,
+                )
+                .values(**values)
+            ).rowcount
+            session.commit()
+        if updated != 1:
+            cls.LOGGER.warning(f"Webhook {delivery.id} lease expired before attempt {delivery.attempts} finished, result dropped.")
+        return updated == 1
+
+    @classmethod
+    def mark_delivered(cls, delivery: WebhookDelivery) -> bool:
+        return cls._settle(delivery, {"status": WebhookStatus.DELIVERED, "delivered_at": datetime.utcnow(), "last_error": None})
+
+    @classmethod
+    def mark_failed(cls, delivery: WebhookDelivery, error: str, retryable: bool = True) -> bool:
+        """Schedules the next attempt with exponential backoff and jitter, or dead-letters the delivery."""
+        values: Dict[str, Any] = {"last_error": error[:2000]}
+        if not retryable or delivery.attempts >= VideoSettings.WEBHOOK_MAX_ATTEMPTS:
+            values["status"] = WebhookStatus.DEAD
+            cls.LOGGER.error(f"Webhook {delivery.id} to {delivery.url} dead-lettered after {delivery.attempts} attempts: {error}")
+        else:
+            delay = min(VideoSettings.WEBHOOK_BACKOFF_MAX, VideoSettings.WEBHOOK_BACKOFF_BASE * 2 ** (delivery.attempts - 1))
+            values["next_attempt_at"] = datetime.utcnow() + timedelta(seconds=delay * random.uniform(0.5, 1.0))
+            cls.LOGGER.warning(f"Webhook {delivery.id} attempt {delivery.attempts} failed ({error}), retrying in ~{delay}s")
+        return cls._settle(delivery, values)
+
+    @classmethod
+    def list_dead_letters(cls, limit: int = 100) -> List[WebhookDeliveryResponse]:
+        with SessionLocal() as session:
+            rows = session.execute(
+                select(WebhookDelivery)
+                .where(WebhookDelivery.status == WebhookStatus.DEAD)
+                .order_by(WebhookDelivery.created_at.desc())
+                .limit(limit)
+            ).scalars().all()
+        return [
+            WebhookDeliveryResponse(
+                id=row.id,
+                job_id=row.job_id,
+                url=row.url,
+                status=row.status,
+                attempts=row.attempts,
+                last_error=row.last_error,
+                created_at=row.created_at,
+                next_attempt_at=row.next_attempt_at,
+                delivered_at=row.delivered_at,
+            )
+            for row in rows
+        ]
+
+    @classmethod
+    def retry_dead_letter(cls, delivery_id: str) -> bool:
+        """Puts a dead letter back in the outbox with a fresh attempt budget."""
+        with SessionLocal() as session:
+            updated = session.execute(
+                update(WebhookDelivery)
+                .where(WebhookDelivery.id == delivery_id, WebhookDelivery.status == WebhookStatus.DEAD)
+                .values(status=WebhookStatus.PENDING, attempts=0, next_attempt_at=datetime.utcnow())
+            ).rowcount
+            session.commit()
+        return updated == 1
@@ -0,0 +1,101 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+import whisper_timestamped as whisper
+
+from app.core.config import VideoSettings
+from app.config.logger import LogManager
+
+
+class WhisperModelPool:
+    """
+    Process-wide registry of loaded Whisper models.
+
+    Each (model name, device, language config) key is loaded at most
+    WHISPER_POOL_SIZE times per process and handed out from an idle list,
+    callers wait on a condition when every instance is busy, because whisper_timestamped installs hooks on the model while it
+    transcribes and a single instance can't serve two jobs at once.
+    """
+    LOGGER = LogManager.get_logger("whisper_model_pool")
+
+    _lock = threading.Lock()
+    # Signalled when a model is returned or a reserved load slot is given back
+    _available = threading.Condition(_lock)
+    _pools: Dict[Tuple[str, str, Optional[str]], List[Any]] = {}
+    _loaded: Dict[Tuple[str, str, Optional[str]], int] = {}
+    _stats = {"loads": 0, "hits": 0, "waits": 0}
+
+    @classmethod
+    def make_key(cls, model_name: str, device: str, language: Optional[str]) -> Tuple[str, str, Optional[str]]:
+        # Multilingual checkpoints share weights across languages, the language
+        # is only a decode option, so only English-only models keep it in the key.
+        language_config = language if model_name.endswith(".en") else None
+        return (model_name, device, language_config)
+
+    @classmethod
+    def _load(cls, key: Tuple[str, str, Optional[str]]):
+        model_name, device, _ = key
+        cls.LOGGER.info(f"Loading whisper model '{model_name}' on {device}...")
+        model = whisper.load_model(model_name, device=device)
+        with cls._lock:
+            cls._stats["loads"] += 1
+        return model
+
+    @classmethod
+    @contextmanager
+    def acquire(
+        cls,
+        model_name: str = VideoSettings.WHISPER_MODEL,
+        device: str = VideoSettings.WHISPER_DEVICE,
+        language: Optional[str] = None,
+        pool_size: int = VideoSettings.WHISPER_POOL_SIZE,
+    ):
+        """Borrow a model instance for the duration of the ``with`` block."""
+        key = cls.make_key(model_name, device, language)
+        model = None
+        with cls._available:
+            pool = cls._pools.setdefault(key, [])
+            waited = False
+            while not pool and cls._loaded.get(key, 0) >= max(pool_size, 1):
+                if not waited:
+                    cls._stats["waits"] += 1
+                    waited = True
+                cls._available.wait()
+            if pool:
+                cls._stats["hits"] += 1
+                model = pool.pop()
+            else:
+                # Reserve the slot before loading so concurrent callers don't overshoot the bound
+                cls._loaded[key] = cls._loaded.get(key, 0) + 1
+
+        if model is None:
+            try:
+                model = cls._load(key)
+            finally:
+                if model is None:
+                    # The load failed: give the slot back and wake a waiter to retry it
+                    with cls._available:
+                        cls._loaded[key] -= 1
+                        cls._available.notify_all()
+
+        try:
+            yield model
+        finally:
+            with cls._available:
+                pool.append(model)
+                cls._available.notify_all()
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats["instances"] = sum(cls._loaded.values())
+        return stats
+
+    @classmethod
+    def clear(cls):
+        """Drop every idle model so the memory can be reclaimed."""
+        with cls._lock:
+            for key, pool in cls._pools.items():
+                cls._loaded[key] -= len(pool)
+                pool.clear()
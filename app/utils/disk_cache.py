@@ -0,0 +1,106 @@
+import os, json, time, uuid, threading
+from typing import Any, Dict, Optional
+
+from app.config.logger import LogManager
+
+
+def _json_default(value):
+    # NumPy scalars coming out of the models serialize as plain numbers
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class DiskCache:
+    """
+    Small persistent JSON cache shared by all worker processes.
+
+    Each entry is one file named after its key, written atomically. File mtimes
+    track recency for LRU eviction once the directory grows past max_bytes, and
+    entries older than ttl_seconds (when set) are treated as misses.
+    """
+
+    def __init__(self, name: str, directory: str, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.name = name
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.logger = LogManager.get_logger(f"{name}_cache")
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _count(self, stat: str, amount: int = 1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._count("misses")
+            return None
+
+        if self.ttl_seconds is not None and time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            self._remove(path)
+            self._count("misses")
+            return None
+
+        try:
+            # Refresh the mtime so eviction sees this entry as recently used
+            os.utime(path)
+        except OSError:
+            pass
+        self._count("hits")
+        return entry.get("value")
+
+    def set(self, key: str, value: Any):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.time(), "value": value}, f, default=_json_default)
+        os.replace(temp_path, path)
+        self._count("writes")
+        self.evict()
+
+    def _remove(self, path: str) -> int:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except OSError:
+            return 0
+
+    def evict(self):
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for file_name in files:
+                if not file_name.endswith(".json"):
+                    continue
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            total -= self._remove(path)
+            self._count("evictions")
+        self.logger.info(f"{self.name} cache evicted down to {total} bytes")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
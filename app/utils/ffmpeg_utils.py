@@ -0,0 +1,38 @@
+import threading
+import ffmpeg
+from typing import Callable, Optional
+
+
+def run_ffmpeg(stream_spec, duration: Optional[float] = None, on_progress: Optional[Callable[[float], None]] = None):
+    """
+    Runs an ffmpeg-python stream spec. When on_progress is given, ffmpeg writes its
+    -progress report to stdout and the callback receives the completion percent
+    computed against the source duration.
+    """
+    if on_progress is None or not duration:
+        return stream_spec.run()
+
+    process = (
+        stream_spec
+        .global_args('-progress', 'pipe:1', '-nostats')
+        .run_async(pipe_stdout=True, pipe_stderr=True)
+    )
+
+    # Drain stderr on its own thread so a chatty ffmpeg can't block on a full pipe
+    stderr_chunks = []
+    stderr_thread = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    stderr_thread.start()
+
+    for raw_line in process.stdout:
+        key, _, value = raw_line.decode(errors='ignore').strip().partition('=')
+        if key == 'out_time_us' and value.isdigit():
+            on_progress(min(int(value) / 1_000_000 / duration * 100, 100.0))
+        elif key == 'progress' and value == 'end':
+            on_progress(100.0)
+
+    process.wait()
+    stderr_thread.join()
+    stderr = b"".join(stderr_chunks)
+    if process.returncode != 0:
+        raise ffmpeg.Error('ffmpeg', None, stderr)
+    return None, stderr
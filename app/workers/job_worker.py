@@ -0,0 +1,108 @@
+import os, socket, time, threading
+import multiprocessing
+from typing import List
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+from app.models.video_models import VideoJob
+from app.services.job_service import JobService
+
+
+class JobWorkerPool:
+    """Runs queued jobs on a fixed number of worker processes, outside the API process."""
+    LOGGER = LogManager.get_logger("job_worker")
+
+    _processes: List[multiprocessing.Process] = []
+    _stop_event = None
+
+    @classmethod
+    def start(cls, processes: int = VideoSettings.JOB_WORKER_PROCESSES):
+        # spawn keeps the workers free of the API's threads and event loop state
+        context = multiprocessing.get_context("spawn")
+        cls._stop_event = context.Event()
+        for index in range(processes):
+            worker_id = f"{socket.gethostname()}-{os.getpid()}-{index}"
+            process = context.Process(target=run_worker, args=(worker_id, cls._stop_event), name=f"job-worker-{index}", daemon=True)
+            process.start()
+            cls._processes.append(process)
+        cls.LOGGER.info(f"Started {processes} job worker processes.")
+
+    @classmethod
+    def stop(cls, timeout: float = VideoSettings.JOB_SHUTDOWN_TIMEOUT):
+        """Asks the workers to exit after their current job, terminating them after the timeout."""
+        if cls._stop_event is None:
+            return
+        cls._stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in cls._processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                cls.LOGGER.warning(f"Terminating {process.name}, its job will be requeued on the next start.")
+                process.terminate()
+        cls._processes = []
+        cls._stop_event = None
+
+
+def process_job(job: VideoJob):
+    # Imported here so the model and heavy media libraries load in the worker, not the API
+    from app.services.video_service import VideoService
+
+    logger = JobWorkerPool.LOGGER
+    stop_heartbeat = threading.Event()
+
+    def send_heartbeats():
+        while not stop_heartbeat.wait(VideoSettings.JOB_HEARTBEAT_SECONDS):
+            try:
+                JobService.heartbeat(job.id)
+            except Exception as e:
+                logger.warning(f"Heartbeat failed for job {job.id}: {e}")
+
+    heartbeat_thread = threading.Thread(target=send_heartbeats, daemon=True)
+    heartbeat_thread.start()
+    try:
+        logger.info(f"Processing job {job.id} (attempt {job.attempts})")
+        request = JobService.load_request(job)
+        # handle_edit raises VideoEditFailed after queueing the failure webhook
+        VideoService.handle_edit(request, job_id=job.id, source_path=job.source_path)
+        JobService.mark_completed(job.id)
+    except Exception as e:
+        logger.error(f"Job {job.id} failed: {e}")
+        JobService.mark_failed(job.id, str(e))
+    finally:
+        stop_heartbeat.set()
+        heartbeat_thread.join()
+
+
+def run_worker(worker_id: str, stop_event):
+    logger = JobWorkerPool.LOGGER
+    logger.info(f"Worker {worker_id} started.")
+    last_recovery = 0.0
+    while not stop_event.is_set():
+        try:
+            if time.monotonic() - last_recovery > VideoSettings.JOB_STALE_AFTER_SECONDS:
+                JobService.requeue_stale()
+                last_recovery = time.monotonic()
+
+            job = JobService.claim_next(worker_id)
+        except Exception as e:
+            logger.error(f"Worker {worker_id} could not reach the job store: {e}")
+            job = None
+
+        if job is None:
+            stop_event.wait(VideoSettings.JOB_POLL_INTERVAL)
+            continue
+        process_job(job)
+    logger.info(f"Worker {worker_id} stopped.")
+
+
+if __name__ == "__main__":
+    # Standalone worker pool: python -m app.workers.job_worker
+    from app.core.database import init_db
+
+    init_db()
+    JobWorkerPool.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        JobWorkerPool.stop()
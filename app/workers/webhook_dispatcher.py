@@ -0,0 +1,126 @@
+import asyncio, threading
+import requests
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from fastapi.concurrency import run_in_threadpool
+
+from app.config.logger import LogManager
+from app.core.config import VideoSettings
+from app.models.video_models import WebhookDelivery
+from app.services.webhook_service import WebhookService
+
+
+class WebhookDispatcher:
+    """
+    Sends the webhook outbox from an asyncio task in the API process.
+
+    Each receiving host gets its own keep-alive session, so repeated callbacks
+    to a customer reuse connections. Sends run concurrently up to
+    WEBHOOK_CONCURRENCY; a slow receiver only holds a dispatcher slot, never a
+    render worker.
+    """
+    LOGGER = LogManager.get_logger("webhook_dispatcher")
+
+    _task: Optional[asyncio.Task] = None
+    _stopping: Optional[asyncio.Event] = None
+    _sessions: Dict[str, requests.Session] = {}
+    _sessions_lock = threading.Lock()
+
+    @classmethod
+    def session_for(cls, url: str) -> requests.Session:
+        host = urlsplit(url).netloc.lower()
+        with cls._sessions_lock:
+            session = cls._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=VideoSettings.WEBHOOK_CONCURRENCY)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                cls._sessions[host] = session
+            return session
+
+    @classmethod
+    def send(cls, delivery: WebhookDelivery):
+        try:
+            response = cls.session_for(delivery.url).post(
+                delivery.url,
+                data=delivery.payload,
+                headers={"Content-Type": "application/json", "X-Webhook-Delivery": delivery.id},
+                timeout=VideoSettings.WEBHOOK_TIMEOUT,
+            )
+        except requests.RequestException as e:
+            WebhookService.mark_failed(delivery, str(e))
+            return
+
+        if 200 <= response.status_code < 300:
+            if WebhookService.mark_delivered(delivery):
+                cls.LOGGER.info(f"Webhook {delivery.id} delivered to {delivery.url} ({response.status_code}).")
+            return
+        # Client errors other than timeouts and rate limits won't succeed on a retry
+        retryable = response.status_code >= 500 or response.status_code in (408, 429)
+        WebhookService.mark_failed(delivery, f"HTTP {response.status_code}: {response.text[:500]}", retryable=retryable)
+
+    @classmethod
+    async def run(cls, stopping: asyncio.Event):
+        semaphore = asyncio.Semaphore(VideoSettings.WEBHOOK_CONCURRENCY)
+        in_flight = set()
+
+        async def dispatch(delivery: WebhookDelivery):
+            try:
+                await run_in_threadpool(cls.send, delivery)
+            except Exception as e:
+                cls.LOGGER.error(f"Webhook {delivery.id} dispatch error: {e}")
+            finally:
+                semaphore.release()
+
+        cls.LOGGER.info("Webhook dispatcher started.")
+        while not stopping.is_set():
+            free = VideoSettings.WEBHOOK_CONCURRENCY - len(in_flight)
+            deliveries = []
+            if free > 0:
+                try:
+                    deliveries = await run_in_threadpool(WebhookService.claim_due, free)
+                except Exception as e:
+                    cls.LOGGER.error(f"Webhook dispatcher could not reach the outbox: {e}")
+
+            for delivery in deliveries:
+                await semaphore.acquire()
+                task = asyncio.create_task(dispatch(delivery))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+            if not deliveries:
+                try:
+                    await asyncio.wait_for(stopping.wait(), timeout=VideoSettings.WEBHOOK_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+        if in_flight:
+            await asyncio.wait(in_flight, timeout=VideoSettings.WEBHOOK_TIMEOUT)
+        cls.LOGGER.info("Webhook dispatcher stopped.")
+
+    @classmethod
+    def start(cls):
+        cls._stopping = asyncio.Event()
+        cls._task = asyncio.create_task(cls.run(cls._stopping))
+
+    @classmethod
+    async def stop(cls):
+        if cls._task is None:
+            return
+        cls._stopping.set()
+        await cls._task
+        cls._task = None
+        cls._stopping = None
+
+
+if __name__ == "__main__":
+    # Standalone dispatcher: python -m app.workers.webhook_dispatcher
+    from app.core.database import init_db
+
+    init_db()
+    try:
+        asyncio.run(WebhookDispatcher.run(asyncio.Event()))
+    except KeyboardInterrupt:
+        pass
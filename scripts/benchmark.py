@@ -0,0 +1,416 @@
+"""
+Offline benchmark of the pipeline stages on synthetic media.
+
+Sources are generated with ffmpeg's lavfi (testsrc2 video and a tone track)
+at every requested resolution and duration, so runs are reproducible without
+network access. Each stage is timed on its own, then the full handle_edit
+runs against a local HTTP server with Gemini and the webhook stubbed out.
+
+    python scripts/benchmark.py --resolutions 640x360,1280x720 --durations 30,60 --repeat 3
+    python scripts/benchmark.py --skip-whisper --output before.json
+
+Caches, the database and job folders live in --workdir, a folder under the
+system temp dir by default, never in the repo's media/ and cache/ folders. Compare two result files to measure a change.
+"""
+import os, sys, re, json, time, shutil, argparse, platform, statistics, subprocess, tempfile, threading, functools
+import http.server
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STAGES = ["probe", "download", "audio", "whisper", "analysis", "ass", "crop", "burn", "render", "handle_edit"]
+
+# Speech-like audio: a gliding tone gated into syllables, so Whisper and the
+# audio paths see something closer to voice than a constant sine
+AUDIO_SOURCES = {
+    "sine": "sine=frequency=440:beep_factor=4:sample_rate=44100:duration={duration}",
+    "speechlike": "aevalsrc='0.4*sin(2*PI*(180+60*sin(2*PI*3*t))*t)*gt(sin(2*PI*2.5*t),0.2)':s=44100:d={duration}",
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Time the ClipCatch pipeline stages on generated test videos.")
+    parser.add_argument("--resolutions", default="640x360,1280x720,1920x1080")
+    parser.add_argument("--durations", default="30,60", help="Seconds, the pipeline rejects sources under MIN_VIDEO_DURATION_SECONDS")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--audio", choices=sorted(AUDIO_SOURCES), default="speechlike")
+    parser.add_argument("--aspect-ratios", default="9:16,1:1")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Subset of {','.join(STAGES)}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-whisper", action="store_true", help="Use a synthetic transcript instead of running Whisper, in handle_edit too")
+    parser.add_argument("--gemini-latency", type=float, default=0.0, help="Seconds the stubbed Gemini call takes")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "clipcatch-benchmark"))
+    parser.add_argument("--output", default=None, help="JSON file, defaults to <workdir>/results-<timestamp>.json")
+    return parser.parse_args()
+
+
+def configure_environment(workdir: str):
+    """Points every cache and the database at the workdir. Must run before anything from app is imported."""
+    os.makedirs(workdir, exist_ok=True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'benchmark.db')}"
+    os.environ["SOURCE_CACHE_DIR"] = os.path.join(workdir, "cache", "sources")
+    os.environ["UPLOAD_DIR"] = os.path.join(workdir, "cache", "uploads")
+    os.environ["TRANSCRIPT_CACHE_DIR"] = os.path.join(workdir, "cache", "transcripts")
+    os.environ["GEMINI_CACHE_DIR"] = os.path.join(workdir, "cache", "gemini")
+    sys.path.insert(0, ROOT)
+    # handle_edit creates its job folders under ./media
+    os.chdir(workdir)
+
+
+def generate_source(directory: str, width: int, height: int, duration: int, fps: int, audio: str) -> str:
+    """Deterministic H.264/AAC source, reused when it already exists."""
+    path = os.path.join(directory, f"testsrc2_{width}x{height}_{duration}s_{fps}fps_{audio}.mp4")
+    if os.path.exists(path):
+        return path
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp.mp4"
+    subprocess.run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}",
+        "-f", "lavfi", "-i", AUDIO_SOURCES[audio].format(duration=duration),
+        "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", "-g", str(fps * 2),
+        "-c:a", "aac", "-b:a", "128k", "-shortest",
+        "-fflags", "+bitexact", "-flags:v", "+bitexact", "-flags:a", "+bitexact",
+        "-movflags", "+faststart", temp_path,
+    ], check=True)
+    os.replace(temp_path, path)
+    return path
+
+
+class RangeRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Static files with single byte-range support, so DownloadService splits the download like on a CDN."""
+
+    RANGE_PATTERN = re.compile(r"bytes=(\d+)-(\d*)")
+    byte_range = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def end_headers(self):
+        self.send_header("Accept-Ranges", "bytes")
+        super().end_headers()
+
+    def send_head(self):
+        self.byte_range = None
+        match = self.RANGE_PATTERN.fullmatch(self.headers.get("Range", "").strip())
+        path = self.translate_path(self.path)
+        if not match or not os.path.isfile(path):
+            return super().send_head()
+
+        size = os.path.getsize(path)
+        start = int(match.group(1))
+        end = min(int(match.group(2)) if match.group(2) else size - 1, size - 1)
+        if start > end:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        f = open(path, "rb")
+        f.seek(start)
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Last-Modified", self.date_time_string(int(os.path.getmtime(path))))
+        self.end_headers()
+        self.byte_range = (start, end)
+        return f
+
+    def copyfile(self, source, outputfile):
+        if self.byte_range is None:
+            return super().copyfile(source, outputfile)
+        remaining = self.byte_range[1] - self.byte_range[0] + 1
+        while remaining > 0:
+            chunk = source.read(min(64 * 1024, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
+
+
+def start_server(directory: str) -> http.server.ThreadingHTTPServer:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(RangeRequestHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, name="benchmark-http", daemon=True).start()
+    return server
+
+
+class NullCache:
+    """Stands in for a DiskCache so every run pays for the real work."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def stats(self):
+        return {}
+
+
+def install_stubs(gemini_latency: float, webhooks: List[Dict[str, Any]], skip_whisper: bool = False):
+    from app.services.highlight_service import HighlightService
+    from app.services.subtitle_service import SubtitleService
+    from app.services.webhook_service import WebhookService
+
+    local_basic, local_advanced = HighlightService.local_basic, HighlightService.local_advanced
+
+    # Gemini answers with the local highlighter's words after a fixed delay, whatever the engine
+    def analyze(cues, color_list, engine, advanced):
+        time.sleep(gemini_latency)
+        return local_advanced(cues, color_list) if advanced else local_basic(cues, color_list)
+
+    def enqueue(url, body, job_id=None):
+        webhooks.append(body)
+        return f"benchmark-{len(webhooks)}"
+
+    HighlightService.analyze = staticmethod(analyze)
+    WebhookService.enqueue = staticmethod(enqueue)
+    SubtitleService.TRANSCRIPT_CACHE = NullCache()
+
+    if skip_whisper:
+        from app.services.media_probe_service import MediaProbeService
+
+        # handle_edit transcribes on its own, --skip-whisper has to reach it too
+        def transcribe(request, folder, video_path, audio=None):
+            return synthetic_transcript(MediaProbeService.probe(video_path).duration)
+
+        SubtitleService.transcribe = staticmethod(transcribe)
+
+
+def synthetic_transcript(duration: float):
+    """Four-word phrases every two seconds, standing in for Whisper when it is skipped or fails."""
+    from app.models.transcript import Transcript
+
+    phrases = ["the brave storm is coming home", "we fight for freedom tonight", "remember the quiet ocean rain"]
+    segments = []
+    for index, start in enumerate(range(0, int(duration) - 2, 2)):
+        text = phrases[index % len(phrases)]
+        segments.append((float(start), start + 1.8, Transcript.spread_words(float(start), start + 1.8, text)))
+    return Transcript.build(segments, language="en")
+
+
+def summarize(runs: List[float]) -> Dict[str, Any]:
+    return {
+        "runs": [round(run, 4) for run in runs],
+        "min": round(min(runs), 4),
+        "median": round(statistics.median(runs), 4),
+        "mean": round(statistics.fmean(runs), 4),
+    }
+
+
+def time_stage(name: str, repeat: int, func: Callable[[], Any], before: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """Runs func `repeat` times, timing only func itself. A failure is recorded instead of aborting the run."""
+    runs, result = [], None
+    for _ in range(repeat):
+        if before:
+            before()
+        started = time.perf_counter()
+        try:
+            result = func()
+        except Exception as e:
+            print(f"  {name}: failed ({e!r})", flush=True)
+            return {"error": repr(e)}, None
+        runs.append(time.perf_counter() - started)
+    stats = summarize(runs)
+    print(f"  {name}: median {stats['median']:.3f}s", flush=True)
+    return stats, result
+
+
+def benchmark_source(args, source_path: str, base_url: str, stages: List[str]) -> Dict[str, Any]:
+    from app.core.config import VideoSettings
+    from app.schemas.video_schema import VideoEditRequest
+    from app.services.audio_service import AudioService
+    from app.services.download_service import DownloadService
+    from app.services.frame_analysis_service import FrameAnalysisService
+    from app.services.media_probe_service import MediaProbeService
+    from app.services.subtitle_service import SubtitleService
+    from app.services.video_crop_service import VideoCropService
+    from app.services.video_service import VideoService
+    from app.services.highlight_service import LocalHighlighter
+
+    aspect_ratios = args.aspect_ratios.split(",")
+    source_url = f"{base_url}/{os.path.basename(source_path)}"
+    request = VideoEditRequest(
+        video_url=source_url,
+        webhook_url="http://127.0.0.1/benchmark-webhook",
+        aspect_ratios=aspect_ratios,
+        highlight_engine="gemini",
+    )
+    folder = os.path.join(args.workdir, "jobs", os.path.splitext(os.path.basename(source_path))[0])
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+
+    results: Dict[str, Any] = {}
+    media_info = MediaProbeService.probe(source_path)
+
+    if "probe" in stages:
+        results["probe"], _ = time_stage("probe", args.repeat, lambda: MediaProbeService.probe(source_path))
+
+    if "download" in stages:
+        download_path = os.path.join(folder, "download.mp4")
+        results["download"], _ = time_stage(
+            "download", args.repeat,
+            lambda: DownloadService.download(source_url, download_path),
+            before=lambda: os.path.exists(download_path) and os.remove(download_path),
+        )
+
+    audio = None
+    if "audio" in stages or ("whisper" in stages and not args.skip_whisper):
+        results["audio"], audio = time_stage("audio", args.repeat, lambda: AudioService.extract_audio(source_path))
+
+    transcript = None
+    if "whisper" in stages and not args.skip_whisper and audio is not None:
+        results["whisper"], transcript = time_stage(
+            "whisper", args.repeat,
+            lambda: SubtitleService.transcribe(request=request, folder=folder, video_path=source_path, audio=audio),
+        )
+    if transcript is None or len(transcript) == 0:
+        transcript = synthetic_transcript(media_info.duration)
+    results["transcript_words"] = len(transcript)
+
+    if "analysis" in stages or "crop" in stages or "burn" in stages or "render" in stages:
+        results["analysis"], _ = time_stage(
+            "analysis", args.repeat,
+            lambda: FrameAnalysisService.analyze(source_path, media_info=media_info),
+            before=FrameAnalysisService._cache.clear,
+        )
+
+    highlighted_words = {
+        cw.word: cw.color
+        for cw in LocalHighlighter.pick_words(list(transcript.cues(request.max_words_per_subtitle)), request.highlight_colors or VideoSettings.HIGHLIGHT_COLORS)
+    }
+    ass_files = SubtitleService.generate_ass_files(request=request, transcript=transcript, folder=folder, highlighted_words=highlighted_words)
+    if "ass" in stages:
+        results["ass"], _ = time_stage(
+            "ass", args.repeat,
+            lambda: SubtitleService.generate_ass_files(request=request, transcript=transcript, folder=folder, highlighted_words=highlighted_words),
+        )
+
+    cropped = {}
+    if "crop" in stages or "burn" in stages:
+        def crop_all():
+            for aspect_ratio in aspect_ratios:
+                cropped[aspect_ratio] = VideoCropService.crop_video(folder=folder, video_path=source_path, aspect_ratio=aspect_ratio, media_info=media_info)
+        results["crop"], _ = time_stage("crop", args.repeat, crop_all)
+
+    if "burn" in stages and len(cropped) == len(aspect_ratios):
+        results["burn"], _ = time_stage("burn", args.repeat, lambda: [
+            VideoCropService.burn_subtitle(
+                folder=folder,
+                ass_file_path=ass_files[aspect_ratio],
+                croped_video_path=cropped[aspect_ratio],
+                aspect_ratio=aspect_ratio,
+                media_info=media_info,
+            )
+            for aspect_ratio in aspect_ratios
+        ])
+
+    if "render" in stages:
+        results["render"], _ = time_stage(
+            "render", args.repeat,
+            lambda: VideoCropService.render_multi_output(folder=folder, video_path=source_path, ass_files=ass_files, media_info=media_info),
+        )
+
+    if "handle_edit" in stages:
+        runs = []
+        for run in range(args.repeat):
+            FrameAnalysisService._cache.clear()
+            # A fresh query string misses the source cache, so every run downloads
+            run_request = request.model_copy(update={"video_url": f"{source_url}?run={time.time_ns()}"})
+            started = time.perf_counter()
+            try:
+                VideoService.handle_edit(run_request)
+            except Exception as e:
+                # VideoEditFailed after the failure webhook, recorded like a failed stage
+                print(f"  handle_edit: failed ({e!r})", flush=True)
+                results["handle_edit"] = {"error": repr(e)}
+                break
+            runs.append(time.perf_counter() - started)
+        else:
+            results["handle_edit"] = summarize(runs)
+            print(f"  handle_edit: median {results['handle_edit']['median']:.3f}s", flush=True)
+
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "-C", ROOT, "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ffmpeg_version() -> Optional[str]:
+    try:
+        return subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, check=True).stdout.split("\n")[0]
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args = parse_args()
+    args.workdir = os.path.abspath(args.workdir)
+    output_path = os.path.abspath(args.output) if args.output else os.path.join(args.workdir, f"results-{datetime.now():%Y%m%d-%H%M%S}.json")
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        sys.exit(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    configure_environment(args.workdir)
+    from app.core.config import VideoSettings
+    from app.core.database import init_db
+
+    init_db()
+    webhooks: List[Dict[str, Any]] = []
+    install_stubs(args.gemini_latency, webhooks, skip_whisper=args.skip_whisper)
+
+    sources_dir = os.path.join(args.workdir, "sources")
+    os.makedirs(sources_dir, exist_ok=True)
+    server = start_server(sources_dir)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": ffmpeg_version(),
+        "options": {key: value for key, value in vars(args).items() if key != "output"},
+        "settings": {
+            name: getattr(VideoSettings, name)
+            for name in ("RENDER_MODE", "RENDER_CONCURRENCY", "CROP_MODE", "TRIM_MODE", "DOWNLOAD_SEGMENTS", "WHISPER_MODEL", "WHISPER_DEVICE")
+        },
+        "results": [],
+    }
+
+    try:
+        for resolution in args.resolutions.split(","):
+            width, height = (int(value) for value in resolution.lower().split("x"))
+            for duration in (int(value) for value in args.durations.split(",")):
+                source_path = generate_source(sources_dir, width, height, duration, args.fps, args.audio)
+                print(f"{os.path.basename(source_path)} ({os.path.getsize(source_path)} bytes)", flush=True)
+                report["results"].append({
+                    "source": {
+                        "file": os.path.basename(source_path),
+                        "width": width,
+                        "height": height,
+                        "duration": duration,
+                        "fps": args.fps,
+                        "audio": args.audio,
+                        "size_bytes": os.path.getsize(source_path),
+                    },
+                    "stages": benchmark_source(args, source_path, base_url, stages),
+                })
+    finally:
+        server.shutdown()
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
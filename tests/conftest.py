@@ -0,0 +1,52 @@
+import os, sys, tempfile, types
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+# Must run before anything from app is imported: the database URL is read at import
+# time, and the loggers and caches write relative to the working directory
+WORKDIR = tempfile.mkdtemp(prefix="clipcatch-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'tests.db')}"
+os.chdir(WORKDIR)
+
+from app.core.database import init_db  # noqa: E402
+
+init_db()
+
+
+def _install_fake_genai():
+    """
+    Minimal stand-in for google.generativeai when the SDK isn't installed. It
+    speaks the REST generateContent call the SDK makes with transport="rest",
+    so GeminiClient can still be tested against a local stub of the API.
+    """
+    genai = types.ModuleType("google.generativeai")
+    genai.options = {}
+
+    def configure(api_key=None, transport=None, client_options=None):
+        genai.options = {"api_key": api_key, **(client_options or {})}
+
+    class GenerativeModel:
+        def __init__(self, model_name):
+            self.model_name = model_name
+
+        def generate_content(self, prompt):
+            response = requests.post(
+                f"http://{genai.options['api_endpoint']}/v1beta/models/{self.model_name}:generateContent",
+                json={"contents": [{"parts": [{"text": prompt}], "role": "user"}]},
+                timeout=30,
+            )
+            response.raise_for_status()
+            parts = response.json()["candidates"][0]["content"]["parts"]
+            return types.SimpleNamespace(text="".join(part["text"] for part in parts))
+
+    genai.configure, genai.GenerativeModel = configure, GenerativeModel
+    google = sys.modules.setdefault("google", types.ModuleType("google"))
+    google.generativeai = sys.modules["google.generativeai"] = genai
+
+
+try:
+    import google.generativeai  # noqa: F401
+except ImportError:
+    _install_fake_genai()
@@ -0,0 +1,68 @@
+import os, time
+import numpy as np
+
+from app.utils.disk_cache import DiskCache
+
+
+def make_cache(tmp_path, max_bytes=1_000_000, ttl_seconds=None) -> DiskCache:
+    return DiskCache("test", str(tmp_path / "cache"), max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+
+
+def age(cache: DiskCache, key: str, seconds: float):
+    path = cache._path(key)
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_round_trip_and_misses(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.get("ab12") is None
+    cache.set("ab12", {"words": ["ocean"], "score": np.float32(0.5), "count": np.int64(3)})
+    assert cache.get("ab12") == {"words": ["ocean"], "score": 0.5, "count": 3}
+    assert cache.stats() == {"hits": 1, "misses": 1, "writes": 1, "evictions": 0}
+
+
+def test_corrupt_entries_are_misses(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set("ab12", [1, 2])
+    with open(cache._path("ab12"), "w", encoding="utf-8") as f:
+        f.write('{"created_at": 1, "val')
+    assert cache.get("ab12") is None
+
+
+def test_expired_entries_are_dropped(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.set("ab12", "old")
+    assert cache.get("ab12") == "old"
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("ab12") is None
+    assert not os.path.exists(cache._path("ab12"))
+
+
+def test_eviction_drops_least_recently_used_first(tmp_path):
+    cache = make_cache(tmp_path)
+    for index, key in enumerate(["aa01", "bb02", "cc03"]):
+        cache.set(key, "x" * 100)
+        age(cache, key, 300 - index * 100)
+    # Reading the oldest entry makes it the most recently used
+    assert cache.get("aa01") is not None
+
+    entry_size = os.path.getsize(cache._path("aa01"))
+    cache.max_bytes = entry_size * 2
+    cache.evict()
+
+    assert cache.get("bb02") is None
+    assert cache.get("aa01") is not None and cache.get("cc03") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_writes_keep_the_directory_under_budget(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=1000)
+    for index in range(20):
+        cache.set(f"{index:04d}", "x" * 100)
+    sizes = [os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(cache.directory) for name in files]
+    assert sum(sizes) <= 1000
+    assert not any(name.endswith(".tmp") for _, _, files in os.walk(cache.directory) for name in files)
+    assert cache.get("0019") is not None
@@ -0,0 +1,95 @@
+import os, hashlib, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from app.core.config import VideoSettings
+from app.services.download_service import DownloadService
+
+DATA = os.urandom(3_000_000)
+
+
+class SourceHandler(BaseHTTPRequestHandler):
+    """Serves DATA, honouring Range and answering HEAD as the server's flags say."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.server.requests.append(("HEAD", None))
+        if self.server.reject_head:
+            self.send_response(403)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(DATA)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def do_GET(self):
+        byte_range = self.headers.get("Range")
+        self.server.requests.append(("GET", byte_range))
+        if byte_range and self.server.honour_range:
+            start, end = byte_range.removeprefix("bytes=").split("-")
+            body = DATA[int(start):int(end) + 1 if end else len(DATA)]
+            self.send_response(206)
+        else:
+            body = DATA
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    monkeypatch.setattr(VideoSettings, "DOWNLOAD_MIN_SEGMENT_BYTES", 500_000)
+    servers = []
+
+    def start(honour_range=True, reject_head=False):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SourceHandler)
+        server.honour_range, server.reject_head, server.requests = honour_range, reject_head, []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_port}/video.mp4"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def download(url, tmp_path):
+    path = tmp_path / "video.mp4"
+    fed = []
+    sha256 = DownloadService.download(url, str(path), on_chunk=fed.append)
+    assert sha256 == hashlib.sha256(DATA).hexdigest()
+    assert path.read_bytes() == DATA
+    # on_chunk sees every byte exactly once, in order
+    assert b"".join(fed) == DATA
+
+
+def test_ranged_download_uses_parallel_segments(serve, tmp_path):
+    server, url = serve()
+    download(url, tmp_path)
+    ranges = [byte_range for method, byte_range in server.requests if method == "GET"]
+    assert len(ranges) == VideoSettings.DOWNLOAD_SEGMENTS
+    assert all(byte_range.startswith("bytes=") for byte_range in ranges)
+
+
+def test_ignored_range_falls_back_to_one_stream(serve, tmp_path):
+    server, url = serve(honour_range=False)
+    download(url, tmp_path)
+    assert ("GET", None) in server.requests
+
+
+def test_rejected_head_falls_back_to_one_plain_get(serve, tmp_path):
+    server, url = serve(reject_head=True)
+    download(url, tmp_path)
+    assert [r for r in server.requests if r[0] == "GET"] == [("GET", None)]
+
+
+def test_head_reports_unknown_source_when_rejected(serve):
+    _, url = serve(reject_head=True)
+    remote = DownloadService.head(url)
+    assert (remote.size, remote.accepts_ranges, remote.etag, remote.last_modified) == (None, False, None, None)
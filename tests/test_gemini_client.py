@@ -0,0 +1,110 @@
+import json, time, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from app.core.config import VideoSettings
+from app.services.gemini_client import CircuitBreaker, GeminiClient, GeminiUnavailable
+
+
+class GeminiHandler(BaseHTTPRequestHandler):
+    """Answers generateContent with the server's scripted replies, then keeps repeating the last one."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.prompts.append(body["contents"][0]["parts"][0]["text"])
+            status, delay = self.server.replies[min(len(self.server.prompts), len(self.server.replies)) - 1]
+        time.sleep(delay)
+        payload = {"candidates": [{"content": {"parts": [{"text": " ok "}], "role": "model"}, "finishReason": "STOP"}]}
+        data = json.dumps(payload if status == 200 else {"error": {"code": status}}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    monkeypatch.setattr(VideoSettings, "GEMINI_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(VideoSettings, "GEMINI_BACKOFF_MAX", 0.02)
+    monkeypatch.setattr(VideoSettings, "GEMINI_REQUEST_TIMEOUT", 0.5)
+    monkeypatch.setattr(VideoSettings, "GEMINI_BREAKER_THRESHOLD", 2)
+    servers = []
+
+    def start(*replies):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), GeminiHandler)
+        server.replies, server.prompts, server.lock = replies, [], threading.Lock()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        monkeypatch.setattr(VideoSettings, "GEMINI_API_ENDPOINT", f"127.0.0.1:{server.server_port}")
+        return server, GeminiClient("gemini-test")
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    assert not breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.record_failure()
+    assert breaker.allow()
+    assert breaker.record_failure()
+    assert not breaker.allow()
+
+
+def test_breaker_lets_one_trial_through_after_the_cooldown():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    # Only one trial at a time
+    assert not breaker.allow()
+    # A failed trial re-opens the breaker for another cooldown
+    assert not breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_server_errors_are_retried(gemini):
+    server, client = gemini((503, 0), (200, 0))
+    assert client.generate("colour these words") == "ok"
+    assert server.prompts == ["colour these words"] * 2
+
+
+def test_deadline_bounds_a_hanging_server(gemini):
+    server, client = gemini((200, 3))
+    started = time.monotonic()
+    with pytest.raises(GeminiUnavailable):
+        client.generate("colour these words", deadline=0.3)
+    assert time.monotonic() - started < 1.5
+
+
+def test_open_breaker_skips_the_network(gemini):
+    server, client = gemini((500, 0))
+    for _ in range(VideoSettings.GEMINI_BREAKER_THRESHOLD):
+        with pytest.raises(GeminiUnavailable):
+            client.generate("colour these words")
+    sent = len(server.prompts)
+    assert sent == VideoSettings.GEMINI_BREAKER_THRESHOLD * VideoSettings.GEMINI_MAX_RETRIES
+
+    with pytest.raises(GeminiUnavailable, match="Circuit breaker is open"):
+        client.generate("colour these words")
+    assert len(server.prompts) == sent
+
+
+def test_generate_many_returns_none_for_failed_prompts(gemini):
+    server, client = gemini((200, 0), (400, 0))
+    results = client.generate_many(["first", "second"])
+    # Whichever prompt arrives second keeps getting 400s until its retries run out
+    assert sorted(results, key=str) == [None, "ok"]
+    assert len(server.prompts) == 1 + VideoSettings.GEMINI_MAX_RETRIES
@@ -0,0 +1,63 @@
+from app.core.config import VideoSettings
+from app.schemas.ai_model import ColoredWord
+from app.services.gemini_service import GeminiService
+
+RED, GREEN, BLUE = "#FF0000", "#00FF00", "#0000FF"
+
+
+def words(*pairs):
+    return [ColoredWord(word=word, color=color) for word, color in pairs]
+
+
+def test_compact_sentences_merges_cues_up_to_sentence_ends():
+    cues = [
+        (0.0, 0.8, "I love"),
+        (0.8, 1.5, "the ocean."),
+        (1.5, 1.6, "  "),
+        (1.6, 2.4, "Do you?"),
+        (2.4, 3.0, "It keeps calling"),
+    ]
+    assert GeminiService.compact_sentences(cues) == [
+        ("00:00:00,000", "00:00:01,500", "I love the ocean."),
+        ("00:00:01,600", "00:00:02,400", "Do you?"),
+        ("00:00:02,400", "00:00:03,000", "It keeps calling"),
+    ]
+
+
+def test_compact_sentences_caps_unpunctuated_runs(monkeypatch):
+    monkeypatch.setattr(VideoSettings, "GEMINI_MAX_SENTENCE_WORDS", 4)
+    cues = [(float(i), i + 1.0, "one two") for i in range(3)]
+    assert [text for _, _, text in GeminiService.compact_sentences(cues)] == ["one two one two", "one two"]
+
+
+def test_chunk_sentences_respects_the_character_budget(monkeypatch):
+    monkeypatch.setattr(VideoSettings, "GEMINI_CHUNK_CHARS", 12)
+    sentences = [("a", "b", text) for text in ["short", "tiny", "a much longer sentence", "end"]]
+    chunks = GeminiService.chunk_sentences(sentences)
+    assert [[text for _, _, text in chunk] for chunk in chunks] == [["short", "tiny"], ["a much longer sentence"], ["end"]]
+    assert GeminiService.chunk_sentences([]) == []
+
+
+def test_merge_keeps_transcript_order_and_first_spelling():
+    merged = GeminiService.merge_colored_words(
+        [words(("Ocean", RED), ("heart", BLUE)), words(("ocean ", RED), ("freedom", GREEN), ("", RED))],
+        [RED, GREEN, BLUE],
+    )
+    assert merged == words(("Ocean", RED), ("heart", BLUE), ("freedom", GREEN))
+
+
+def test_merge_picks_the_most_frequent_color_then_the_palette_order():
+    chunks = [words(("ocean", BLUE)), words(("ocean", GREEN)), words(("OCEAN", GREEN)), words(("love", BLUE), ("love", RED))]
+    merged = GeminiService.merge_colored_words(chunks, [RED, GREEN, BLUE])
+    assert merged == words(("ocean", GREEN), ("love", RED))
+    # Reordering the chunks doesn't change the colors
+    reordered = GeminiService.merge_colored_words(chunks[::-1], [RED, GREEN, BLUE])
+    assert {cw.word.lower(): cw.color for cw in reordered} == {"ocean": GREEN, "love": RED}
+
+
+def test_cache_key_ignores_float_noise_and_spacing():
+    colors = [RED, GREEN]
+    key = GeminiService.make_cache_key("basic", 1, [(1.0, 2.0, "I love  the ocean")], colors)
+    assert key == GeminiService.make_cache_key("basic", 1, [(1.0000001, 1.9999999, "I love the ocean")], colors)
+    assert key != GeminiService.make_cache_key("basic", 2, [(1.0, 2.0, "I love the ocean")], colors)
+    assert key != GeminiService.make_cache_key("basic", 1, [(1.0, 2.0, "I love the ocean")], colors[::-1])
@@ -0,0 +1,65 @@
+from app.services.ass_renderer import AssRenderer
+from app.services.highlight_service import LocalHighlighter
+
+COLORS = ["#FF3B30", "#34C759", "#007AFF", "#AF52DE"]
+
+CUES = [
+    (0.0, 2.0, "[Music]"),
+    (2.5, 4.0, "I love the ocean."),
+    (4.0, 6.0, "The ocean keeps calling,"),
+    (6.0, 8.0, "and my heart says yes!"),
+    (8.0, 9.0, "♪ ♪"),
+]
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert LocalHighlighter.tokenize("Well, I'm gonna LOVE this, “freedom”!") == ["love", "freedom"]
+    assert LocalHighlighter.tokenize("Don’t stop 2024") == ["stop"]
+
+
+def test_tokenize_keeps_non_latin_words_intact():
+    # The vowel signs of Devanagari are combining marks, not punctuation
+    assert LocalHighlighter.tokenize("नमस्ते दुनिया") == ["नमस्ते", "दुनिया"]
+    assert LocalHighlighter.tokenize("¿Dónde está el corazón?") == ["dónde", "está", "el", "corazón"]
+
+
+def test_pick_words_is_deterministic_and_in_transcript_order():
+    words = LocalHighlighter.pick_words(CUES, COLORS, max_words=3)
+    assert [cw.word for cw in words] == ["love", "ocean", "heart"]
+    assert words == LocalHighlighter.pick_words(CUES, COLORS, max_words=3)
+    assert all(cw.color in COLORS for cw in words)
+
+
+def test_pick_words_uses_the_lexicon_tone():
+    colors = {cw.word: cw.color for cw in LocalHighlighter.pick_words(CUES, COLORS, max_words=3)}
+    assert LocalHighlighter.color_tone(colors["love"]) == "warm"
+    assert LocalHighlighter.color_tone(colors["ocean"]) == "cool"
+
+
+def test_pick_words_without_speech_or_colors():
+    assert LocalHighlighter.pick_words([(0.0, 1.0, "[Music]")], COLORS) == []
+    assert LocalHighlighter.pick_words(CUES, []) == []
+
+
+def test_speech_range_skips_non_speech_cues():
+    speech_range = LocalHighlighter.speech_range(CUES)
+    assert (speech_range.start_time, speech_range.end_time) == ("00:00:02,500", "00:00:08,000")
+    assert LocalHighlighter.speech_range([(0.0, 1.0, "(laughs)")]) is None
+
+
+def test_color_tone_accepts_ass_colors():
+    assert LocalHighlighter.color_tone("&H0000FF&") == "cool"
+    assert LocalHighlighter.color_tone("#808080") is None
+
+
+def test_rgb_to_ass_bgr():
+    assert AssRenderer.rgb_to_ass_bgr("#FF8800") == "0088FF"
+    assert AssRenderer.rgb_to_ass_bgr("&HFF8800&") == "0088FF"
+    assert AssRenderer.rgb_to_ass_bgr(" &hff8800& ") == "0088FF"
+
+
+def test_renderer_highlights_local_picks():
+    words = LocalHighlighter.pick_words(CUES, ["&HFF0000&"], max_words=2)
+    renderer = AssRenderer(CUES, {cw.word: cw.color for cw in words})
+    assert "Dialogue: 0,0:00:02.50,0:00:04.00,Default,,0,0,0,,I {\\1c&H0000FF&}love{\\r} the {\\1c&H0000FF&}ocean.{\\r}\n" in renderer.events
+    assert renderer.events.count("{\\r}") == 3
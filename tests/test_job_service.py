@@ -0,0 +1,116 @@
+import json, threading
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import delete, select
+
+from app.core.config import VideoSettings
+from app.core.database import SessionLocal
+from app.models.video_models import JobStatus, VideoJob, WebhookDelivery
+from app.schemas.video_schema import VideoEditRequest
+from app.services.job_service import JobService
+
+
+def make_request() -> VideoEditRequest:
+    return VideoEditRequest(
+        video_url="https://example.com/video.mp4",
+        webhook_url="https://example.com/hook",
+        metadata={"order": 42},
+    )
+
+
+@pytest.fixture(autouse=True)
+def empty_queue():
+    # claim_next takes the oldest queued job, so each test starts from an empty queue
+    with SessionLocal() as session:
+        session.execute(delete(VideoJob))
+        session.commit()
+
+
+def make_stale(job_id: str):
+    with SessionLocal() as session:
+        job = session.get(VideoJob, job_id)
+        job.heartbeat_at = datetime.utcnow() - timedelta(seconds=VideoSettings.JOB_STALE_AFTER_SECONDS + 1)
+        session.commit()
+
+
+def test_claim_next_takes_the_oldest_job():
+    first = JobService.enqueue(make_request())
+    JobService.enqueue(make_request())
+    job = JobService.claim_next("worker-a")
+    assert job.id == first
+    assert (job.status, job.worker_id, job.attempts) == (JobStatus.RUNNING, "worker-a", 1)
+
+
+def test_concurrent_workers_never_claim_the_same_job():
+    job_ids = {JobService.enqueue(make_request()) for _ in range(20)}
+    claimed, lock = [], threading.Lock()
+
+    def worker(name: str):
+        while True:
+            job = JobService.claim_next(name)
+            if job is None:
+                return
+            with lock:
+                claimed.append(job.id)
+
+    threads = [threading.Thread(target=worker, args=(f"worker-{i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(job_ids)
+
+
+def test_requeue_stale_puts_back_jobs_with_attempts_left():
+    job_id = JobService.enqueue(make_request())
+    JobService.claim_next("worker-a")
+    make_stale(job_id)
+
+    assert JobService.requeue_stale() == 1
+    job = JobService.get_job(job_id)
+    assert (job.status, job.worker_id) == (JobStatus.QUEUED, None)
+    # Fresh heartbeats are left alone
+    assert JobService.claim_next("worker-b").id == job_id
+    assert JobService.requeue_stale() == 0
+
+
+def test_requeue_stale_fails_exhausted_jobs_with_a_webhook():
+    job_id = JobService.enqueue(make_request())
+    for attempt in range(VideoSettings.JOB_MAX_ATTEMPTS):
+        assert JobService.claim_next("worker-a").id == job_id
+        make_stale(job_id)
+        JobService.requeue_stale()
+
+    job = JobService.get_job(job_id)
+    assert job.status == JobStatus.FAILED
+    assert job.error == "Worker stopped responding."
+    assert job.finished_at is not None
+
+    with SessionLocal() as session:
+        deliveries = session.execute(select(WebhookDelivery).where(WebhookDelivery.job_id == job_id)).scalars().all()
+    assert len(deliveries) == 1
+    payload = json.loads(deliveries[0].payload)
+    assert deliveries[0].url == "https://example.com/hook"
+    assert payload["status_code"] == 400
+    assert payload["metadata"] == {"order": 42}
+
+    # A second recovery pass doesn't fail it or notify again
+    JobService.requeue_stale()
+    with SessionLocal() as session:
+        assert len(session.execute(select(WebhookDelivery).where(WebhookDelivery.job_id == job_id)).scalars().all()) == 1
+
+
+def test_uploads_are_kept_for_retries_and_dropped_when_the_job_ends(tmp_path):
+    upload_path = tmp_path / "upload.mp4"
+    upload_path.write_bytes(b"video")
+    job_id = JobService.enqueue(make_request(), source_path=str(upload_path))
+    JobService.claim_next("worker-a")
+    make_stale(job_id)
+
+    JobService.requeue_stale()
+    assert upload_path.exists()
+
+    JobService.claim_next("worker-b")
+    JobService.mark_completed(job_id)
+    assert not upload_path.exists()
@@ -0,0 +1,142 @@
+import os, hashlib, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from app.core.config import VideoSettings
+from app.core.database import SessionLocal
+from app.models.video_models import SourceCacheAlias, SourceCacheBlob
+from app.services.download_service import RemoteSource
+from app.services.source_cache_service import SourceCacheService
+
+VALIDATED = RemoteSource(size=None, accepts_ranges=False, etag='"v1"', last_modified=None)
+UNVALIDATED = RemoteSource(size=None, accepts_ranges=False, etag=None, last_modified=None)
+
+
+class Downloader:
+    """Writes url-derived bytes and counts its calls, standing in for DownloadService.download."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, url, path, remote=None):
+        self.calls += 1
+        data = url.encode("utf-8") * 1000
+        with open(path, "wb") as f:
+            f.write(data)
+        return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(VideoSettings, "SOURCE_CACHE_DIR", str(tmp_path / "sources"))
+    with SessionLocal() as session:
+        session.query(SourceCacheAlias).delete()
+        session.query(SourceCacheBlob).delete()
+        session.commit()
+    return tmp_path
+
+
+def lock_files():
+    lock_dir = os.path.join(VideoSettings.SOURCE_CACHE_DIR, "locks")
+    return sorted(os.listdir(lock_dir)) if os.path.isdir(lock_dir) else []
+
+
+def test_validated_url_is_downloaded_once(tmp_path):
+    downloader = Downloader()
+    for name in ("a.mp4", "b.mp4"):
+        SourceCacheService.fetch("http://origin/video", str(tmp_path / name), downloader, remote=VALIDATED)
+    assert downloader.calls == 1
+    assert (tmp_path / "a.mp4").read_bytes() == (tmp_path / "b.mp4").read_bytes()
+    # Job folders get a hard link to the blob
+    assert os.stat(tmp_path / "a.mp4").st_ino == os.stat(tmp_path / "b.mp4").st_ino
+
+
+def test_changed_validator_downloads_again(tmp_path):
+    downloader = Downloader()
+    SourceCacheService.fetch("http://origin/video", str(tmp_path / "a.mp4"), downloader, remote=VALIDATED)
+    SourceCacheService.fetch("http://origin/video", str(tmp_path / "b.mp4"), downloader, remote=VALIDATED._replace(etag='"v2"'))
+    assert downloader.calls == 2
+    # Same bytes, one blob
+    with SessionLocal() as session:
+        assert session.query(SourceCacheBlob).count() == 1
+        assert session.query(SourceCacheAlias).count() == 2
+
+
+def test_unvalidated_url_is_always_downloaded_but_stored_once(tmp_path):
+    downloader = Downloader()
+    for name in ("a.mp4", "b.mp4"):
+        SourceCacheService.fetch("http://origin/live", str(tmp_path / name), downloader, remote=UNVALIDATED)
+    assert downloader.calls == 2
+    with SessionLocal() as session:
+        assert session.query(SourceCacheAlias).count() == 0
+        assert session.query(SourceCacheBlob).count() == 1
+    # Only the content hash lock, no per-download URL lock
+    assert len(lock_files()) == 1
+
+
+def test_failed_download_leaves_nothing_behind(tmp_path):
+    def failing(url, path, remote=None):
+        open(path, "wb").write(b"partial")
+        raise IOError("connection reset")
+
+    with pytest.raises(IOError):
+        SourceCacheService.fetch("http://origin/video", str(tmp_path / "a.mp4"), failing, remote=VALIDATED)
+    leftovers = [name for name in os.listdir(VideoSettings.SOURCE_CACHE_DIR) if name.startswith(".download-")]
+    assert leftovers == []
+    assert not (tmp_path / "a.mp4").exists()
+
+
+def test_evict_removes_blobs_aliases_and_lock_files(tmp_path):
+    downloader = Downloader()
+    SourceCacheService.fetch("http://origin/video", str(tmp_path / "a.mp4"), downloader, remote=VALIDATED)
+    SourceCacheService.fetch("http://origin/other", str(tmp_path / "b.mp4"), downloader, remote=UNVALIDATED)
+    assert lock_files()
+
+    SourceCacheService.evict(max_bytes=0)
+    with SessionLocal() as session:
+        assert session.query(SourceCacheBlob).count() == 0
+        assert session.query(SourceCacheAlias).count() == 0
+    assert lock_files() == []
+    # The job folders keep their own links
+    assert (tmp_path / "a.mp4").exists()
+
+    SourceCacheService.fetch("http://origin/video", str(tmp_path / "c.mp4"), downloader, remote=VALIDATED)
+    assert downloader.calls == 3
+
+
+def test_concurrent_fetches_share_one_download(tmp_path):
+    downloader = Downloader()
+    threads = [
+        threading.Thread(target=SourceCacheService.fetch, args=("http://origin/video", str(tmp_path / f"{i}.mp4"), downloader, VALIDATED))
+        for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert downloader.calls == 1
+
+
+class RejectHeadHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(405)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def test_rejected_head_downloads_uncached(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RejectHeadHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        downloader = Downloader()
+        url = f"http://127.0.0.1:{server.server_port}/video.mp4"
+        SourceCacheService.fetch(url, str(tmp_path / "a.mp4"), downloader)
+        SourceCacheService.fetch(url, str(tmp_path / "b.mp4"), downloader)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert downloader.calls == 2
+    assert (tmp_path / "a.mp4").read_bytes() == (tmp_path / "b.mp4").read_bytes()
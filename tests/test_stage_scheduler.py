@@ -0,0 +1,64 @@
+import threading
+import pytest
+
+from app.services.stage_scheduler import StageFailed, StageScheduler
+
+
+def test_stages_receive_only_their_dependencies():
+    seen = {}
+
+    def stage(name, value):
+        def run(results, on_progress):
+            seen[name] = dict(results)
+            return value
+        return run
+
+    scheduler = (
+        StageScheduler(max_workers=2)
+        .add("srt", stage("srt", "transcript"))
+        .add("analysis", stage("analysis", "frames"))
+        .add("trim", stage("trim", "clip"), deps=["srt"])
+        .add("ass", stage("ass", "subtitles"), deps=["trim"])
+        .add("burn", stage("burn", "video"), deps=["ass", "trim", "analysis"])
+    )
+    results = scheduler.run()
+
+    assert results == {"srt": "transcript", "analysis": "frames", "trim": "clip", "ass": "subtitles", "burn": "video"}
+    assert seen["srt"] == {}
+    assert seen["ass"] == {"trim": "clip"}
+    assert seen["burn"] == {"ass": "subtitles", "trim": "clip", "analysis": "frames"}
+    assert set(scheduler.timings) == set(results)
+
+
+def test_independent_stages_overlap():
+    # Each stage waits for the other to start, which only returns if both run at once
+    barrier = threading.Barrier(2, timeout=5)
+    scheduler = (
+        StageScheduler(max_workers=2)
+        .add("srt", lambda results, on_progress: barrier.wait())
+        .add("analysis", lambda results, on_progress: barrier.wait())
+    )
+    assert set(scheduler.run()) == {"srt", "analysis"}
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError):
+        StageScheduler().add("burn", lambda results, on_progress: None, deps=["ass"])
+
+
+def test_failure_names_the_stage_and_skips_dependents():
+    started = []
+
+    def fail(results, on_progress):
+        raise RuntimeError("ffmpeg exited with 1")
+
+    scheduler = (
+        StageScheduler()
+        .add("crop", fail)
+        .add("burn", lambda results, on_progress: started.append("burn"), deps=["crop"])
+    )
+    with pytest.raises(StageFailed) as excinfo:
+        scheduler.run()
+    assert excinfo.value.stage == "crop"
+    assert isinstance(excinfo.value.error, RuntimeError)
+    assert started == []
@@ -0,0 +1,65 @@
+from app.models.transcript import Transcript, format_timestamp
+
+
+def make_transcript() -> Transcript:
+    return Transcript.build(
+        [
+            (0.0, 2.0, [("Hello", 0.0, 0.4), ("there,", 0.5, 0.9), (" ", 0.9, 1.0), ("my", 1.0, 1.2), ("friend.", 1.3, 2.0)]),
+            (2.0, 2.5, []),
+            (3.0, 5.0, [("How", 3.0, 3.4), ("are", 3.5, 3.9), ("you?", 4.0, 5.0)]),
+        ],
+        language="en",
+    )
+
+
+def test_build_skips_blank_words_and_empty_segments():
+    transcript = make_transcript()
+    assert len(transcript) == 7
+    assert transcript.segment_count == 2
+    assert transcript.segment_text(0) == "Hello there, my friend."
+    assert transcript.word(6) == "you?"
+
+
+def test_cues_split_by_max_words_within_segments():
+    cues = list(make_transcript().cues(3))
+    assert cues == [
+        (0.0, 1.2, "Hello there, my"),
+        (1.3, 2.0, "friend."),
+        (3.0, 5.0, "How are you?"),
+    ]
+
+
+def test_clip_shifts_and_cuts_words():
+    clipped = make_transcript().clip(0.6, 3.6)
+    assert clipped.text == "there, my friend. How are"
+    assert clipped.word_start[0] == 0.0
+    assert round(clipped.word_end[0], 6) == 0.3
+    # "are" is cut at the window end
+    assert round(clipped.word_end[-1], 6) == 3.0
+    assert clipped.language == "en"
+
+
+def test_clip_without_end_keeps_the_tail():
+    clipped = make_transcript().clip(3.5)
+    assert clipped.text == "are you?"
+    assert clipped.segment_start[0] == 0.0
+
+
+def test_dict_round_trip():
+    transcript = make_transcript()
+    restored = Transcript.from_dict(transcript.to_dict())
+    assert restored.text == transcript.text
+    assert list(restored.cues(2)) == list(transcript.cues(2))
+
+
+def test_from_dict_spreads_words_when_timings_are_missing():
+    transcript = Transcript.from_dict({"segments": [{"start": 0.0, "end": 2.0, "text": " one two "}]})
+    assert [transcript.word(i) for i in range(len(transcript))] == ["one", "two"]
+    assert list(transcript.word_end) == [1.0, 2.0]
+
+
+def test_srt_and_vtt_output():
+    transcript = make_transcript()
+    assert transcript.to_srt(4).startswith("1\n00:00:00,000 --> 00:00:02,000\nHello there, my friend.\n\n2\n")
+    assert transcript.to_vtt(4).splitlines()[2] == "00:00:00.000 --> 00:00:02.000"
+    assert format_timestamp(3725.5) == "01:02:05,500"
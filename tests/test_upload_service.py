@@ -0,0 +1,68 @@
+import os, hashlib, json
+import pytest
+
+from app.core.config import VideoSettings
+from app.services.upload_service import MultipartUpload
+
+BOUNDARY = "----clipcatch-test"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def make_body(fields=None, files=(("file", b"video bytes"),)) -> bytes:
+    parts = []
+    for name, value in (fields or {}).items():
+        parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode() + value.encode() + b"\r\n")
+    for name, data in files:
+        parts.append(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"; filename="clip.mp4"\r\n'
+            f"Content-Type: video/mp4\r\n\r\n".encode() + data + b"\r\n"
+        )
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+def parse(body: bytes, path, chunk_size: int = 7) -> MultipartUpload:
+    upload = MultipartUpload(CONTENT_TYPE, str(path))
+    try:
+        # Odd chunk sizes split boundaries and headers across writes, like a real request body
+        for start in range(0, len(body), chunk_size):
+            upload.write(body[start:start + chunk_size])
+        upload.finish()
+    finally:
+        upload.close()
+    return upload
+
+
+def test_file_and_fields_are_parsed(tmp_path):
+    data = os.urandom(50_000)
+    request = json.dumps({"webhook_url": "https://example.com/hook"})
+    upload = parse(make_body({"request": request}, [("file", data)]), tmp_path / "upload.mp4")
+    assert upload.fields == {"request": request}
+    assert (tmp_path / "upload.mp4").read_bytes() == data
+    assert upload.file_size == len(data)
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+
+
+def test_missing_file_part(tmp_path):
+    with pytest.raises(ValueError, match="Missing 'file' part"):
+        parse(make_body({"request": "{}"}, []), tmp_path / "upload.mp4")
+
+
+def test_only_one_file_per_request(tmp_path):
+    with pytest.raises(ValueError, match="Only one file"):
+        parse(make_body(files=[("file", b"a"), ("file", b"b")]), tmp_path / "upload.mp4")
+
+
+def test_oversized_file_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(VideoSettings, "MAX_SOURCE_BYTES", 1000)
+    with pytest.raises(ValueError, match="larger than"):
+        parse(make_body(files=[("file", b"x" * 2000)]), tmp_path / "upload.mp4")
+
+
+def test_oversized_field_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="too large"):
+        parse(make_body({"request": "x" * (MultipartUpload.MAX_FIELD_BYTES + 1)}), tmp_path / "upload.mp4", chunk_size=4096)
+
+
+def test_non_multipart_body_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        MultipartUpload("application/json", str(tmp_path / "upload.mp4"))
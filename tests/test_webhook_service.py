@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+from app.core.config import VideoSettings
+from app.core.database import SessionLocal
+from app.models.video_models import WebhookDelivery, WebhookStatus
+from app.services.webhook_service import WebhookService
+
+
+def claim(delivery_id: str) -> WebhookDelivery:
+    claimed = [d for d in WebhookService.claim_due(100) if d.id == delivery_id]
+    assert len(claimed) == 1
+    return claimed[0]
+
+
+def load(delivery_id: str) -> WebhookDelivery:
+    with SessionLocal() as session:
+        return session.get(WebhookDelivery, delivery_id)
+
+
+def make_due(delivery_id: str):
+    with SessionLocal() as session:
+        session.get(WebhookDelivery, delivery_id).next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        session.commit()
+
+
+def test_claim_leases_the_delivery():
+    delivery_id = WebhookService.enqueue("http://example.com/hook", {"status": 200})
+    delivery = claim(delivery_id)
+    assert delivery.attempts == 1
+    assert delivery.next_attempt_at > datetime.utcnow() + timedelta(seconds=VideoSettings.WEBHOOK_TIMEOUT)
+    # Leased rows are not handed out again
+    assert delivery_id not in [d.id for d in WebhookService.claim_due(100)]
+
+
+def test_failed_attempts_back_off_exponentially():
+    delivery_id = WebhookService.enqueue("http://example.com/hook", {"status": 200})
+    for attempt in range(1, 4):
+        delivery = claim(delivery_id)
+        assert delivery.attempts == attempt
+        before = datetime.utcnow()
+        WebhookService.mark_failed(delivery, "HTTP 503: unavailable")
+        row = load(delivery_id)
+        delay = min(VideoSettings.WEBHOOK_BACKOFF_MAX, VideoSettings.WEBHOOK_BACKOFF_BASE * 2 ** (attempt - 1))
+        wait = (row.next_attempt_at - before).total_seconds()
+        # Jitter keeps the wait between half and all of the delay
+        assert delay * 0.5 - 1 <= wait <= delay + 1
+        assert row.status == WebhookStatus.PENDING
+        assert row.last_error == "HTTP 503: unavailable"
+        make_due(delivery_id)
+
+
+def test_delivery_is_dead_lettered_after_the_last_attempt():
+    delivery_id = WebhookService.enqueue("http://example.com/hook", {"status": 200})
+    for _ in range(VideoSettings.WEBHOOK_MAX_ATTEMPTS):
+        delivery = claim(delivery_id)
+        WebhookService.mark_failed(delivery, "timeout")
+        make_due(delivery_id)
+    assert load(delivery_id).status == WebhookStatus.DEAD
+    assert delivery_id in [d.id for d in WebhookService.list_dead_letters()]
+
+    assert WebhookService.retry_dead_letter(delivery_id)
+    row = load(delivery_id)
+    assert (row.status, row.attempts) == (WebhookStatus.PENDING, 0)
+
+
+def test_client_errors_are_not_retried():
+    delivery_id = WebhookService.enqueue("http://example.com/hook", {"status": 200})
+    WebhookService.mark_failed(claim(delivery_id), "HTTP 404: not found", retryable=False)
+    assert load(delivery_id).status == WebhookStatus.DEAD
+
+
+def test_delivered():
+    delivery_id = WebhookService.enqueue("http://example.com/hook", {"status": 200})
+    assert WebhookService.mark_delivered(claim(delivery_id))
+    row = load(delivery_id)
+    assert row.status == WebhookStatus.DELIVERED
+    assert row.delivered_at is not None
+
+
+def test_result_of_an_expired_lease_is_dropped():
+    delivery_id = WebhookService.enqueue("http://example.com/hook", {"status": 200})
+    stale = claim(delivery_id)
+    # The send outlives its lease and another dispatcher takes the row over
+    make_due(delivery_id)
+    current = claim(delivery_id)
+
+    assert not WebhookService.mark_failed(stale, "timeout", retryable=False)
+    assert load(delivery_id).status == WebhookStatus.PENDING
+    assert WebhookService.mark_delivered(current)
+    assert not WebhookService.mark_delivered(current)
+    assert load(delivery_id).status == WebhookStatus.DELIVERED
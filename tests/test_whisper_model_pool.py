@@ -0,0 +1,104 @@
+import sys, threading, time, types
+import pytest
+
+# The pool only needs load_model, which every test replaces; the real package pulls in torch
+sys.modules.setdefault("whisper_timestamped", types.ModuleType("whisper_timestamped"))
+
+from app.services.whisper_model_pool import WhisperModelPool  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool(monkeypatch):
+    monkeypatch.setattr(WhisperModelPool, "_pools", {})
+    monkeypatch.setattr(WhisperModelPool, "_loaded", {})
+    monkeypatch.setattr(WhisperModelPool, "_stats", {"loads": 0, "hits": 0, "waits": 0})
+
+
+def stub_load(monkeypatch, load):
+    def _load(cls, key):
+        model = load(key)
+        with cls._lock:
+            cls._stats["loads"] += 1
+        return model
+    monkeypatch.setattr(WhisperModelPool, "_load", classmethod(_load))
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_models_are_reused_across_acquires(monkeypatch):
+    stub_load(monkeypatch, lambda key: object())
+    with WhisperModelPool.acquire("small", "cpu") as first:
+        pass
+    with WhisperModelPool.acquire("small", "cpu", language="fr") as second:
+        pass
+    assert first is second
+    assert WhisperModelPool.stats() == {"loads": 1, "hits": 1, "waits": 0, "instances": 1}
+
+
+def test_english_only_models_are_keyed_by_language():
+    assert WhisperModelPool.make_key("small", "cpu", "en") == WhisperModelPool.make_key("small", "cpu", "de")
+    assert WhisperModelPool.make_key("small.en", "cpu", "en") != WhisperModelPool.make_key("small.en", "cpu", None)
+
+
+def test_callers_wait_when_every_instance_is_busy(monkeypatch):
+    stub_load(monkeypatch, lambda key: object())
+    borrowed = []
+
+    def borrow():
+        with WhisperModelPool.acquire("small", "cpu", pool_size=1) as model:
+            borrowed.append(model)
+
+    with WhisperModelPool.acquire("small", "cpu", pool_size=1) as held:
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        wait_until(lambda: WhisperModelPool.stats()["waits"] == 1)
+        assert borrowed == []
+    thread.join(timeout=5)
+
+    assert borrowed == [held]
+    assert WhisperModelPool.stats()["loads"] == 1
+
+
+def test_failed_load_wakes_a_waiter_to_retry(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def load(key):
+        calls.append(key)
+        if len(calls) == 1:
+            # The first load holds the only slot until the waiter is queued, then fails
+            release.wait(timeout=5)
+            raise RuntimeError("CUDA out of memory")
+        return object()
+
+    stub_load(monkeypatch, load)
+    errors, borrowed = [], []
+
+    def first():
+        with pytest.raises(RuntimeError) as excinfo:
+            with WhisperModelPool.acquire("small", "cpu", pool_size=1):
+                pass
+        errors.append(excinfo.value)
+
+    def second():
+        with WhisperModelPool.acquire("small", "cpu", pool_size=1) as model:
+            borrowed.append(model)
+
+    loader = threading.Thread(target=first)
+    loader.start()
+    wait_until(lambda: len(calls) == 1)
+    waiter = threading.Thread(target=second)
+    waiter.start()
+    wait_until(lambda: WhisperModelPool.stats()["waits"] == 1)
+    release.set()
+    loader.join(timeout=5)
+    waiter.join(timeout=5)
+
+    assert not waiter.is_alive()
+    assert len(errors) == 1 and len(borrowed) == 1
+    assert WhisperModelPool.stats()["instances"] == 1